@@ -0,0 +1,214 @@
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import wave
+from math import gcd
+from typing import NamedTuple, Optional
+
+import numpy as np
+from scipy.signal import resample_poly
+
+from telemetry import traced
+
+TARGET_SAMPLE_RATE = 16_000
+FRAME_MS = 30
+
+# Energy-based VAD settings
+NOISE_FLOOR_PERCENTILE = 10     # frames quieter than this percentile are assumed to be background noise
+SPEECH_MARGIN_DB = 12.0         # speech must be this much louder than the noise floor...
+MIN_SPEECH_DB = -50.0           # ...and never quieter than this (dBFS)
+HANGOVER_MS = 150               # padding kept around speech so word onsets/endings are not clipped
+MAX_SILENCE_MS = 800            # internal pauses longer than this are shortened...
+KEEP_SILENCE_MS = 300           # ...down to this
+
+# Re-encoding: Opus is tiny for speech; falls back to 16 kHz PCM WAV without ffmpeg
+OPUS_BITRATE = os.getenv("AUDIO_OPUS_BITRATE", "24k")
+FFMPEG = shutil.which("ffmpeg")
+
+
+class PreprocessedAudio(NamedTuple):
+    audio: bytes            # encoded audio ready for upload
+    samples: np.ndarray     # trimmed 16 kHz mono float32 samples
+    stats: dict
+
+
+# --- Decoding ---
+def _read_wav(data: bytes) -> tuple[np.ndarray, int]:
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        rate = wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    elif width == 3:
+        padded = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        ints = (padded[:, 0].astype(np.int32) | (padded[:, 1].astype(np.int32) << 8) | (padded[:, 2].astype(np.int32) << 16))
+        samples = ((ints << 8) >> 8).astype(np.float32) / 8388608
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width}")
+
+    return samples.reshape(-1, channels), rate
+
+
+def _ffmpeg_to_wav(data: bytes) -> bytes:
+    if not FFMPEG:
+        raise RuntimeError("ffmpeg is required to decode non-WAV audio")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        src = os.path.join(tmp_dir, "input")
+        dst = os.path.join(tmp_dir, "decoded.wav")
+        with open(src, "wb") as f:
+            f.write(data)
+        subprocess.run(
+            [FFMPEG, "-hide_banner", "-loglevel", "error", "-y", "-i", src, "-vn", "-acodec", "pcm_s16le", dst],
+            check=True, capture_output=True,
+        )
+        with open(dst, "rb") as f:
+            return f.read()
+
+
+def decode_audio(data: bytes, sample_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Decodes any audio upload to mono float32 samples at `sample_rate`.
+
+    WAV is decoded natively; other containers (webm/opus, ogg, mp3, m4a) go through ffmpeg.
+    """
+    wav_bytes = data if data[:4] == b"RIFF" and data[8:12] == b"WAVE" else _ffmpeg_to_wav(data)
+    samples, rate = _read_wav(wav_bytes)
+
+    mono = samples.mean(axis=1)
+    if rate != sample_rate:
+        factor = gcd(rate, sample_rate)
+        mono = resample_poly(mono, sample_rate // factor, rate // factor)
+    return mono.astype(np.float32)
+
+
+# --- Voice activity detection ---
+def speech_mask(samples: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Per-frame (FRAME_MS) boolean mask of frames that contain speech.
+    """
+    frame = int(sample_rate * FRAME_MS / 1000)
+    n_frames = len(samples) // frame
+    if n_frames == 0:
+        return np.zeros(0, dtype=bool)
+
+    frames = samples[:n_frames * frame].reshape(n_frames, frame)
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    threshold = max(np.percentile(energy_db, NOISE_FLOOR_PERCENTILE) + SPEECH_MARGIN_DB, MIN_SPEECH_DB)
+    mask = energy_db > threshold
+
+    # Dilate speech regions by the hangover on both sides
+    hangover = HANGOVER_MS // FRAME_MS
+    if hangover and mask.any():
+        mask = np.convolve(mask, np.ones(2 * hangover + 1), mode="same") > 0
+    return mask
+
+
+def silence_runs(mask: np.ndarray) -> list[tuple[int, int]]:
+    """
+    (start, end) frame ranges of consecutive non-speech frames, end exclusive.
+    """
+    padded = np.concatenate(([True], mask, [True])).astype(np.int8)
+    edges = np.diff(padded)
+    return list(zip(np.flatnonzero(edges == -1), np.flatnonzero(edges == 1)))
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> np.ndarray:
+    """
+    Removes leading/trailing silence and shortens long internal pauses.
+    """
+    mask = speech_mask(samples, sample_rate)
+    if not mask.any():
+        return samples[:0]
+
+    frame = int(sample_rate * FRAME_MS / 1000)
+    keep = mask.copy()
+    max_silence = MAX_SILENCE_MS // FRAME_MS
+    half_keep = KEEP_SILENCE_MS // FRAME_MS // 2
+
+    for start, end in silence_runs(mask):
+        if start == 0 or end == len(mask):
+            continue  # leading/trailing silence: drop entirely
+        if end - start > max_silence:
+            keep[start:start + half_keep] = True
+            keep[end - half_keep:end] = True
+        else:
+            keep[start:end] = True
+
+    kept_frames = samples[:len(mask) * frame].reshape(len(mask), frame)[keep]
+    return kept_frames.reshape(-1)
+
+
+# --- Encoding ---
+def _encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def encode_audio(samples: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> tuple[bytes, str]:
+    """
+    Encodes mono samples compactly. Returns (bytes, codec name).
+    """
+    wav_bytes = _encode_wav(samples, sample_rate)
+    if not FFMPEG:
+        return wav_bytes, "pcm_s16le"
+
+    try:
+        result = subprocess.run(
+            [FFMPEG, "-hide_banner", "-loglevel", "error", "-f", "wav", "-i", "pipe:0",
+             "-c:a", "libopus", "-b:a", OPUS_BITRATE, "-application", "voip", "-f", "ogg", "pipe:1"],
+            input=wav_bytes, check=True, capture_output=True,
+        )
+        return result.stdout, "opus"
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"⚠️ Opus encoding failed, uploading WAV instead: {e}")
+        return wav_bytes, "pcm_s16le"
+
+
+@traced("audio.preprocess", kind="cpu")
+def preprocess_audio(data: bytes) -> Optional[PreprocessedAudio]:
+    """
+    Decodes, downmixes to 16 kHz mono, trims silences and re-encodes an answer recording.
+
+    Returns None when the audio cannot be decoded or contains no detectable
+    speech; callers should then upload the original bytes unchanged.
+    """
+    try:
+        samples = decode_audio(data)
+    except Exception as e:
+        print(f"⚠️ Audio preprocessing skipped, could not decode upload: {e}")
+        return None
+
+    trimmed = trim_silence(samples)
+    if trimmed.size == 0:
+        print("⚠️ Audio preprocessing skipped, no speech detected.")
+        return None
+
+    audio, codec = encode_audio(trimmed)
+    original_duration = len(samples) / TARGET_SAMPLE_RATE
+    processed_duration = len(trimmed) / TARGET_SAMPLE_RATE
+
+    stats = {
+        "codec": codec,
+        "original_bytes": len(data),
+        "processed_bytes": len(audio),
+        "bytes_saved": len(data) - len(audio),
+        "original_duration_s": round(original_duration, 2),
+        "processed_duration_s": round(processed_duration, 2),
+        "duration_removed_s": round(original_duration - processed_duration, 2),
+    }
+    return PreprocessedAudio(audio=audio, samples=trimmed, stats=stats)
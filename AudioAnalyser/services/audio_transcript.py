@@ -3,6 +3,9 @@ import time
 import os 
 from dotenv import load_dotenv
 
+from resilience import DeadlineExceeded, deadline_for, resilient_call
+from telemetry import traced
+
 load_dotenv()
 
 transcript_endpoint = 'https://api.assemblyai.com/v2/transcript'
@@ -11,9 +14,11 @@ headers = {
 }
 
 CHUNK_SIZE = 5_242_880  # 5MB
+REQUEST_TIMEOUT = (10, 120)  # (connect, read) seconds per HTTP request
+POLL_INTERVAL_S = 15
 
 
-def upload_to_assemblyai(file):
+def _upload(file):
     upload_endpoint = 'https://api.assemblyai.com/v2/upload'
 
     def read_file(file_obj):
@@ -23,24 +28,51 @@ def upload_to_assemblyai(file):
                 break
             yield data
 
-    response = requests.post(upload_endpoint, headers=headers, data=read_file(file))
+    response = requests.post(upload_endpoint, headers=headers, data=read_file(file), timeout=REQUEST_TIMEOUT)
     response.raise_for_status()
     return response.json()['upload_url']
 
 
-def transcribe_and_poll(audio_url):
+@traced("assemblyai.upload")
+def upload_to_assemblyai(file):
+    # Not hedged: the file stream can only be read once
+    return resilient_call("assemblyai", _upload, file, hedge=False)
+
+
+def _transcribe(audio_url, poll_interval=POLL_INTERVAL_S):
+    # Own deadline too, so an abandoned poll loop stops instead of running forever in the background
+    deadline = time.monotonic() + deadline_for("assemblyai")
+
     transcript_request = {'audio_url': audio_url}
-    transcript_response = requests.post(transcript_endpoint, json=transcript_request, headers=headers)
+    transcript_response = requests.post(transcript_endpoint, json=transcript_request, headers=headers, timeout=REQUEST_TIMEOUT)
     transcript_response.raise_for_status()
     transcript_id = transcript_response.json()['id']
 
     while True:
-        polling_response = requests.get(f'{transcript_endpoint}/{transcript_id}', headers=headers)
+        if time.monotonic() > deadline:
+            raise DeadlineExceeded(f"Transcript {transcript_id} not ready before the deadline")
+
+        polling_response = requests.get(f'{transcript_endpoint}/{transcript_id}', headers=headers, timeout=REQUEST_TIMEOUT)
         polling_response.raise_for_status()
         result = polling_response.json()
 
-        if result['status'] == 'completed':
-            return result['text']
-        elif result['status'] == 'error':
-            return f"Error: {result['error']}"
-        time.sleep(15)
\ No newline at end of file
+        if result['status'] in ('completed', 'error'):
+            return result
+        time.sleep(poll_interval)
+
+
+def transcribe_result(audio_url, poll_interval=POLL_INTERVAL_S):
+    """
+    Transcribes an uploaded file and returns the full AssemblyAI result,
+    including word-level timestamps ('words': [{'text', 'start', 'end'}] in ms).
+    """
+    # Not hedged: a duplicate would start (and bill) a second transcription job
+    return resilient_call("assemblyai", _transcribe, audio_url, poll_interval, hedge=False)
+
+
+@traced("assemblyai.transcribe")
+def transcribe_and_poll(audio_url):
+    result = transcribe_result(audio_url)
+    if result['status'] == 'error':
+        return f"Error: {result['error']}"
+    return result['text']
@@ -6,6 +6,10 @@ from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain.schema import SystemMessage, HumanMessage
 
+from outbound_scheduler import Priority, estimate_tokens
+from resilience import FALLBACK_CHAT_MODEL, resilient_call
+from telemetry import stage
+
 # Load environment variables
 load_dotenv()
 
@@ -59,6 +63,11 @@ def analyze_technical_answer(transcript_text: str) -> dict:
             model_name="groq/compound",
             groq_api_key=api_key
         )
+        fallback_model = ChatGroq(
+            temperature=0.4,
+            model_name=FALLBACK_CHAT_MODEL,
+            groq_api_key=api_key
+        ) if FALLBACK_CHAT_MODEL else None
 
         # Compose the message
         human_prompt = (
@@ -73,7 +82,15 @@ def analyze_technical_answer(transcript_text: str) -> dict:
             HumanMessage(content=human_prompt)
         ]
 
-        response = model.invoke(messages)
+        with stage("groq.evaluate_answer"):
+            response = resilient_call(
+                "groq", model.invoke, messages,
+                fallback=fallback_model.invoke if fallback_model else None,
+                priority=Priority.STANDARD,
+                rate_model=model.model_name,
+                fallback_rate_model=FALLBACK_CHAT_MODEL,
+                rate_tokens=estimate_tokens(messages) + 1024
+            )
         response_text = response.content.strip()
 
         # Clean up code fences if LLM includes them
@@ -0,0 +1,155 @@
+import io
+import os
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+
+import numpy as np
+
+from AudioAnalyser.services.audio_preprocessing import (
+    FRAME_MS, TARGET_SAMPLE_RATE, encode_audio, silence_runs, speech_mask,
+)
+from AudioAnalyser.services.audio_transcript import transcribe_and_poll, transcribe_result, upload_to_assemblyai
+from telemetry import traced
+
+# Answers at least this long (after silence trimming) are split; 0 disables segmentation
+SEGMENTED_MIN_DURATION_S = float(os.getenv("SEGMENTED_TRANSCRIPTION_MIN_S", "120"))
+SEGMENT_MAX_CONCURRENCY = int(os.getenv("SEGMENT_MAX_CONCURRENCY", "4"))
+
+SEGMENT_TARGET_S = 60
+SEGMENT_MIN_S = 20
+SEGMENT_MAX_S = 90
+# Audio shared by neighbouring segments, so a word cut at a boundary is heard whole by one of them
+EDGE_OVERLAP_S = 0.5
+# Short segments finish quickly; poll them more often than whole answers
+SEGMENT_POLL_INTERVAL_S = 3
+# A failed segment is sent again this many times before the whole answer is transcribed in one piece
+SEGMENT_RETRIES = 1
+
+
+class SegmentTranscriptionError(RuntimeError):
+    """A segment could not be transcribed, even after retrying."""
+
+
+def should_segment(duration_s: float) -> bool:
+    return SEGMENTED_MIN_DURATION_S > 0 and duration_s >= SEGMENTED_MIN_DURATION_S
+
+
+def split_points(samples: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> list[int]:
+    """
+    Sample offsets [0, ..., len(samples)] that split the audio into segments of
+    SEGMENT_MIN_S..SEGMENT_MAX_S seconds, cutting in the middle of pauses.
+
+    Falls back to a hard cut at SEGMENT_TARGET_S when a stretch has no pause;
+    the edge overlap then keeps the cut word intact in one segment.
+    """
+    frame = int(sample_rate * FRAME_MS / 1000)
+    mask = speech_mask(samples, sample_rate)
+    # Middle of every internal pause, in samples
+    candidates = [
+        int((start + end) // 2) * frame
+        for start, end in silence_runs(mask)
+        if start > 0 and end < len(mask)
+    ]
+
+    total = len(samples)
+    target, minimum, maximum = (int(s * sample_rate) for s in (SEGMENT_TARGET_S, SEGMENT_MIN_S, SEGMENT_MAX_S))
+
+    points = [0]
+    while total - points[-1] > maximum:
+        start = points[-1]
+        in_range = [c for c in candidates if start + minimum <= c <= start + maximum]
+        cut = min(in_range, key=lambda c: abs(c - (start + target))) if in_range else start + target
+        points.append(cut)
+    points.append(total)
+    return points
+
+
+def own_words(words: list, audio_start: int, start: int, end: int, total: int, sample_rate: int) -> list[str]:
+    """
+    Keeps only the words centred inside [start, end); the overlap region
+    belongs to the neighbouring segment, which also heard those words.
+
+    Args:
+        words (list): AssemblyAI words ({'text', 'start', 'end'} in ms, relative to `audio_start`).
+        audio_start (int): Sample offset the transcribed audio began at (segment start minus overlap).
+        start, end (int): The segment's own sample range.
+        total (int): Total number of samples; the last segment also keeps words past `end`.
+        sample_rate (int): Sample rate of the offsets.
+    """
+    offset_ms = audio_start * 1000 / sample_rate
+    own_start_ms = start * 1000 / sample_rate
+    own_end_ms = end * 1000 / sample_rate
+    is_last = end == total
+    kept = []
+    for word in words:
+        centre = offset_ms + (word['start'] + word['end']) / 2
+        if own_start_ms <= centre < own_end_ms or (is_last and centre >= own_end_ms):
+            kept.append(word['text'])
+    return kept
+
+
+def _transcribe_segment(samples: np.ndarray, start: int, end: int, sample_rate: int):
+    overlap = int(EDGE_OVERLAP_S * sample_rate)
+    audio_start = max(0, start - overlap)
+    audio_end = min(len(samples), end + overlap)
+    audio, _ = encode_audio(samples[audio_start:audio_end], sample_rate)
+    label = f"{start / sample_rate:.1f}s-{end / sample_rate:.1f}s"
+
+    for attempt in range(SEGMENT_RETRIES + 1):
+        try:
+            audio_url = upload_to_assemblyai(io.BytesIO(audio))
+            result = transcribe_result(audio_url, poll_interval=SEGMENT_POLL_INTERVAL_S)
+            error = result['error'] if result['status'] == 'error' else None
+        except Exception as e:
+            error = str(e)
+        if not error:
+            break
+        print(f"⚠️ Segment {label} failed (attempt {attempt + 1}): {error}")
+    else:
+        raise SegmentTranscriptionError(f"Segment {label} failed: {error}")
+
+    words = result.get('words')
+    if not words:
+        return [result.get('text') or ""]
+    return own_words(words, audio_start, start, end, len(samples), sample_rate)
+
+
+def _transcribe_whole(samples: np.ndarray, sample_rate: int) -> str:
+    audio, _ = encode_audio(samples, sample_rate)
+    return transcribe_and_poll(upload_to_assemblyai(io.BytesIO(audio)))
+
+
+@traced("assemblyai.transcribe_segmented")
+def transcribe_segmented(samples: np.ndarray, sample_rate: int = TARGET_SAMPLE_RATE) -> str:
+    """
+    Transcribes long audio as concurrently processed segments split at pauses.
+
+    Wall-clock time approaches that of the slowest segment instead of growing
+    with the answer length. A segment that still fails after a retry would leave
+    a hole in the transcript, so the whole audio is then transcribed in one piece.
+
+    Args:
+        samples (np.ndarray): Mono float32 samples (e.g. PreprocessedAudio.samples).
+        sample_rate (int): Sample rate of `samples`.
+
+    Returns:
+        str: The stitched transcript, in segment order.
+    """
+    points = split_points(samples, sample_rate)
+    ranges = list(zip(points[:-1], points[1:]))
+    print(f"🎙️ Transcribing {len(samples) / sample_rate:.0f}s of audio as {len(ranges)} segments")
+
+    # No context manager: on failure the fallback must not wait for segments still polling AssemblyAI
+    executor = ThreadPoolExecutor(max_workers=min(SEGMENT_MAX_CONCURRENCY, len(ranges)))
+    futures = [executor.submit(_transcribe_segment, samples, start, end, sample_rate) for start, end in ranges]
+    # Returns as soon as any segment fails for good, not when the slowest one finishes
+    wait(futures, return_when=FIRST_EXCEPTION)
+    failed = [future.exception() for future in futures if future.done() and future.exception() is not None]
+    # Segments still running finish in the background and their results are dropped
+    executor.shutdown(wait=False, cancel_futures=True)
+
+    if failed:
+        if not isinstance(failed[0], SegmentTranscriptionError):
+            raise failed[0]
+        print(f"⚠️ {failed[0]}; transcribing the whole answer instead.")
+        return _transcribe_whole(samples, sample_rate)
+    return " ".join(word for future in futures for word in future.result() if word)
@@ -0,0 +1,476 @@
+"""
+Offline micro-benchmarks for the local hot paths, with a committed baseline.
+
+Each component runs on synthetic inputs (generated video, PDF, DOCX and text)
+and reports throughput, per-operation latency and the peak Python heap
+allocated by one operation (tracemalloc: covers Python and NumPy buffers, not
+OpenCV/TensorFlow internals). Results are compared against
+Benchmarks/baselines/components.json and the run exits non-zero on a regression
+(1) or when there is no baseline to compare against (2).
+
+Usage (from the repository root):
+    python -m Benchmarks.components
+    python -m Benchmarks.components --only text --only report
+    python -m Benchmarks.components --threshold 0.3
+    python -m Benchmarks.components --update-baseline     # on the reference machine
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+from Benchmarks.load_test import RESULTS_DIR, RESUME_TEXT, make_interview_video, percentile
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "components.json")
+
+DEFAULT_THRESHOLD = 0.20        # allowed relative drop in throughput / rise in p50 latency
+DEFAULT_ALLOC_THRESHOLD = 0.25  # allowed relative rise in peak allocation
+ALLOC_NOISE_KB = 64             # smaller allocation changes are never reported
+
+WORDS = (
+    "interview candidate latency system design database index query cache python "
+    "distributed service behavioral feedback communication structure example tradeoff"
+).split()
+
+
+# --- Synthetic inputs ---
+def make_text(n_words: int, seed: int = 0) -> str:
+    rng = np.random.default_rng(seed)
+    words = rng.choice(WORDS, n_words)
+    sentences = [" ".join(words[i:i + 12]).capitalize() + "." for i in range(0, n_words, 12)]
+    return "\n".join(" ".join(sentences[i:i + 5]) for i in range(0, len(sentences), 5))
+
+
+def make_pdf(pages: int = 5, lines_per_page: int = 45) -> bytes:
+    """
+    Minimal multi-page PDF with real text operators, readable by PyPDF2/pypdf.
+    """
+    def escape(text):
+        return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in once the page ids are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids = []
+    for page in range(pages):
+        lines = make_text(lines_per_page * 12, seed=page).replace("\n", " ").split(". ")[:lines_per_page]
+        text = " T* ".join(f"({escape(line)}) Tj" for line in lines)
+        stream = f"BT /F1 10 Tf 14 TL 40 760 Td {text} ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids).encode()
+    objects[1] = b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % pages
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def make_docx(paragraphs: int = 200) -> bytes:
+    import docx
+
+    document = docx.Document()
+    for line in (RESUME_TEXT + make_text(paragraphs * 60)).splitlines()[:paragraphs]:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+# --- Components ---
+# name -> setup(); setup returns (operation, items per operation, unit). Setup
+# time (model loading, input generation) is not measured.
+COMPONENTS = {}
+
+
+def component(name: str):
+    def register(setup):
+        COMPONENTS[name] = setup
+        return setup
+    return register
+
+
+def _video_frames(n: int = 32):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, (480, 640, 3), dtype=np.uint8) for _ in range(n)]
+
+
+# The trained facialemotionmodel.h5 is not part of the repository, so the emotion
+# components run a small randomly initialised CNN with the same input and output
+# (48x48 grayscale in, one score per EMOTIONS label out). Inference cost depends
+# on the architecture, not on the weights; re-record the baseline if the real
+# model's architecture differs much from this one.
+EMOTION_LABELS = ['Angry', 'Disgust', 'Fear', 'Happy', 'Anxious', 'Surprise', 'Neutral', 'Confident']
+
+
+def synthetic_emotion_model():
+    from tensorflow import keras
+
+    keras.utils.set_random_seed(0)
+    return keras.Sequential([
+        keras.Input((48, 48, 1)),
+        keras.layers.Conv2D(32, 3, activation="relu"),
+        keras.layers.MaxPooling2D(),
+        keras.layers.Conv2D(64, 3, activation="relu"),
+        keras.layers.MaxPooling2D(),
+        keras.layers.Conv2D(128, 3, activation="relu"),
+        keras.layers.MaxPooling2D(),
+        keras.layers.Flatten(),
+        keras.layers.Dense(256, activation="relu"),
+        keras.layers.Dense(len(EMOTION_LABELS), activation="softmax"),
+    ])
+
+
+def use_synthetic_emotion_model():
+    """
+    Registers a stand-in for VideoAnalyser.test_emotion backed by synthetic_emotion_model(),
+    so predict_emotion and process_video (in-process inference) never load the .h5 file.
+    """
+    import sys
+    import types
+
+    from VideoAnalyser.inference_pool import FRAME_SIZE, to_model_input
+
+    module = sys.modules.get("VideoAnalyser.test_emotion")
+    if getattr(module, "SYNTHETIC", False):
+        return module
+
+    model = synthetic_emotion_model()
+
+    def preprocess_frame(frame):
+        if frame is None or frame.size == 0:
+            return None
+        return (to_model_input(frame) / 255.0).reshape(1, *FRAME_SIZE, 1)
+
+    def predict_emotion(frame):
+        processed = preprocess_frame(frame)
+        if processed is None:
+            return "No Face/Frame", 0.0
+        predictions = model.predict(processed, verbose=0)[0]
+        top_index = int(np.argmax(predictions))
+        return EMOTION_LABELS[top_index], float(predictions[top_index])
+
+    module = types.ModuleType("VideoAnalyser.test_emotion")
+    module.SYNTHETIC = True
+    module.EMOTIONS = EMOTION_LABELS
+    module.model = model
+    module.preprocess_frame = preprocess_frame
+    module.predict_emotion = predict_emotion
+    sys.modules[module.__name__] = module
+    return module
+
+
+@component("emotion.preprocess_frame")
+def _preprocess_frame():
+    from VideoAnalyser.inference_pool import to_model_input
+
+    frames = _video_frames()
+    return lambda: [to_model_input(frame) for frame in frames], len(frames), "frames"
+
+
+@component("emotion.predict_emotion")
+def _predict_emotion():
+    predict_emotion = use_synthetic_emotion_model().predict_emotion
+
+    frames = _video_frames(8)
+    return lambda: [predict_emotion(frame) for frame in frames], len(frames), "frames"
+
+
+@component("video.process_video")
+def _process_video():
+    from VideoAnalyser.inference_pool import EMOTION_WORKERS
+    from VideoAnalyser.video_processing import process_video
+
+    if EMOTION_WORKERS > 0:
+        raise RuntimeError("needs in-process inference; unset EMOTION_WORKERS")
+    use_synthetic_emotion_model()
+    video = make_interview_video(seconds=4)
+
+    def operation():
+        result = process_video(video, max_frames=10_000)
+        errors = [frame["error"] for frame in result.get("emotion_analysis", []) if "error" in frame]
+        if "error" in result or errors:
+            # Timing failed frames would report a broken pipeline as a fast one
+            raise RuntimeError(f"process_video failed: {result.get('error') or errors[0]}")
+        return result
+
+    return operation, operation()["frames_analyzed"], "frames"
+
+
+@component("text.split")
+def _text_split():
+    from langchain_core.documents import Document
+
+    from ReportGeneration.TextSpliter.spliter import text_spliting
+
+    # ~100 PDF pages of ~3,000 characters
+    pages = [Document(page_content=make_text(500, seed=i), metadata={"source": "synthetic.pdf", "page": i})
+             for i in range(100)]
+    return lambda: text_spliting(pages), len(pages), "pages"
+
+
+@component("resume.extract_pdf")
+def _extract_pdf():
+    from main import extract_text_from_pdf
+
+    pdf = make_pdf(pages=5)
+    return lambda: asyncio.run(extract_text_from_pdf(pdf)), 5, "pages"
+
+
+@component("resume.extract_docx")
+def _extract_docx():
+    from main import extract_text_from_docx
+
+    document = make_docx(paragraphs=200)
+    return lambda: asyncio.run(extract_text_from_docx(document)), 200, "paragraphs"
+
+
+@component("ingestion.dedup")
+def _dedup():
+    from ReportGeneration.Deduplication.minhash import MinHashDeduplicator
+
+    # Every chunk twice: half the stream is dropped
+    chunks = [make_text(350, seed=i % 100) for i in range(200)]
+    return lambda: list(MinHashDeduplicator().filter(chunks)), len(chunks), "chunks"
+
+
+@component("knowledge_base.load_pdf")
+def _load_pdf():
+    import tempfile
+
+    from ReportGeneration.DocumentLoader.loader import _load_file
+
+    # Removed once the operation (which holds the only reference) is dropped after measuring
+    directory = tempfile.TemporaryDirectory(prefix="nudge-bench-")
+    path = os.path.join(directory.name, "knowledge.pdf")
+    with open(path, "wb") as f:
+        f.write(make_pdf(pages=20))
+    return lambda: _load_file(path, root=directory.name), 20, "pages"
+
+
+@component("retriever.vector_literal")
+def _vector_literal():
+    from ReportGeneration.VectorStore.pgvector_store import to_vector_literal
+
+    vectors = np.random.default_rng(0).standard_normal((50, 768)).tolist()
+    return lambda: [to_vector_literal(v) for v in vectors], len(vectors), "vectors"
+
+
+@component("retriever.rows_to_results")
+def _rows_to_results():
+    from ReportGeneration.Retriever.retriever import rows_to_results
+
+    rows = [(i, make_text(300, seed=i), "synthetic.pdf", i % 40) for i in range(5)]
+    return lambda: [rows_to_results(rows) for _ in range(100)], 500, "rows"
+
+
+@component("report.format_context")
+def _format_context():
+    from ReportGeneration.connection import format_context_chunks
+
+    chunks = [{"source": "synthetic.pdf", "page": i, "text": make_text(300, seed=i)} for i in range(5)]
+    return lambda: [format_context_chunks(chunks) for _ in range(100)], 100, "prompts"
+
+
+@component("report.parse_json")
+def _parse_json():
+    from ReportGeneration.connection import parse_report_json
+
+    report = json.dumps({
+        "summary": make_text(120),
+        "technical_feedback": make_text(150, seed=1),
+        "behavioral_feedback": make_text(150, seed=2),
+        "communication_feedback": make_text(150, seed=3),
+        "suggestions": [make_text(20, seed=i) for i in range(5)],
+        "score": "7/10",
+    })
+    # Clean JSON, and JSON wrapped in prose (the fallback path)
+    outputs = [report, "Here is the report:\n" + report + "\nLet me know if you need more."] * 50
+    return lambda: [parse_report_json(text) for text in outputs], len(outputs), "reports"
+
+
+# --- Measurement ---
+def measure(operation, items: int, min_time: float, min_runs: int, warmup: int = 2) -> dict:
+    for _ in range(warmup):
+        operation()
+
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < min_runs or time.perf_counter() - started < min_time:
+        start = time.perf_counter()
+        operation()
+        latencies.append(time.perf_counter() - start)
+    elapsed = sum(latencies)
+
+    # Separate pass: tracemalloc slows everything down
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "runs": len(latencies),
+        "items_per_run": items,
+        "throughput_per_s": round(items * len(latencies) / elapsed, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 4),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 4),
+        "per_item_ms": round(elapsed / (items * len(latencies)) * 1000, 4),
+        "peak_alloc_kb": round((peak - before) / 1024, 1),
+    }
+
+
+def run(selected, min_time: float, min_runs: int) -> dict:
+    results, skipped = {}, {}
+    for name, setup in COMPONENTS.items():
+        if selected and not any(name.startswith(prefix) for prefix in selected):
+            continue
+        try:
+            operation, items, unit = setup()
+            measured = measure(operation, items, min_time, min_runs)
+        except Exception as e:
+            # e.g. TensorFlow or a document library not installed here, or failing frames
+            skipped[name] = f"{type(e).__name__}: {e}"
+            print(f"⚠️ Skipping {name}: {skipped[name]}")
+            continue
+        results[name] = {"unit": unit, **measured}
+        r = results[name]
+        print(f"{name:<28} {r['throughput_per_s']:>12.1f} {unit}/s  p50={r['p50_ms']:.3f} ms  "
+              f"p95={r['p95_ms']:.3f} ms  peak={r['peak_alloc_kb']:.1f} KB")
+    return {"components": results, "skipped": skipped}
+
+
+# --- Baseline comparison ---
+def load_baseline(path: str) -> dict:
+    if not os.path.exists(path):
+        return {"thresholds": {}, "components": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def find_regressions(current: dict, baseline: dict, threshold: float, alloc_threshold: float) -> list:
+    """
+    Compare measured components with the baseline; components missing on either side are ignored.
+
+    Per-component thresholds may be set in the baseline file under
+    "thresholds": {"components": {"video.process_video": 0.35}}.
+    """
+    overrides = baseline.get("thresholds", {}).get("components", {})
+    regressions = []
+    for name, base in baseline.get("components", {}).items():
+        now = current.get(name)
+        if not now:
+            continue
+        limit = overrides.get(name, threshold)
+        if now["throughput_per_s"] < base["throughput_per_s"] * (1 - limit):
+            regressions.append(f"{name}: throughput {now['throughput_per_s']} < {base['throughput_per_s']} "
+                               f"{now['unit']}/s (-{limit:.0%} allowed)")
+        if now["p50_ms"] > base["p50_ms"] * (1 + limit):
+            regressions.append(f"{name}: p50 {now['p50_ms']} ms > {base['p50_ms']} ms (+{limit:.0%} allowed)")
+        grown = now["peak_alloc_kb"] - base["peak_alloc_kb"]
+        if grown > ALLOC_NOISE_KB and now["peak_alloc_kb"] > base["peak_alloc_kb"] * (1 + alloc_threshold):
+            regressions.append(f"{name}: peak allocation {now['peak_alloc_kb']} KB > {base['peak_alloc_kb']} KB "
+                               f"(+{alloc_threshold:.0%} allowed)")
+    return regressions
+
+
+def machine_info() -> dict:
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "emotion_workers": int(os.getenv("EMOTION_WORKERS", "0")),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline component micro-benchmarks with baseline regression gates.")
+    parser.add_argument("--only", action="append", default=[], help="Component name prefix (repeatable).")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to time each component for.")
+    parser.add_argument("--min-runs", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, help=f"Throughput/latency tolerance (default {DEFAULT_THRESHOLD}).")
+    parser.add_argument("--alloc-threshold", type=float, help=f"Allocation tolerance (default {DEFAULT_ALLOC_THRESHOLD}).")
+    parser.add_argument("--update-baseline", action="store_true", help="Write the measured components into the baseline.")
+    parser.add_argument("--output", help="Results JSON path (default: Benchmarks/results/components-<timestamp>.json).")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    baseline = load_baseline(args.baseline)
+    thresholds = baseline.get("thresholds", {})
+    threshold = args.threshold if args.threshold is not None else thresholds.get("default", DEFAULT_THRESHOLD)
+    alloc_threshold = args.alloc_threshold if args.alloc_threshold is not None else thresholds.get("alloc", DEFAULT_ALLOC_THRESHOLD)
+
+    report = run(args.only, args.min_time, args.min_runs)
+    report["machine"] = machine_info()
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, f"components-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n📄 Results written to {output}")
+
+    if args.update_baseline:
+        baseline.setdefault("components", {}).update(report["components"])
+        baseline["machine"] = report["machine"]
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+            f.write("\n")
+        print(f"✅ Baseline updated: {args.baseline}")
+        return 0
+
+    if not baseline.get("components"):
+        print(f"❌ No baseline components in {args.baseline}; run with --update-baseline on the reference machine.")
+        return 2
+    gated = [name for name in report["components"] if name in baseline["components"]]
+    ungated = [name for name in report["components"] if name not in baseline["components"]]
+    if ungated:
+        print(f"⚠️ Not in the baseline, so not gated: {', '.join(ungated)}")
+    if not gated:
+        print("❌ None of the measured components has a baseline; nothing was checked.")
+        return 2
+    unmeasured = [name for name in report["skipped"] if name in baseline["components"]]
+    if baseline.get("machine") and baseline["machine"].get("platform") != report["machine"]["platform"]:
+        print(f"⚠️ Baseline was recorded on {baseline['machine']['platform']}; timings may not be comparable.")
+
+    regressions = find_regressions(report["components"], baseline, threshold, alloc_threshold)
+    # A baselined component that could not run is not a pass
+    regressions += [f"{name}: could not run ({report['skipped'][name]})" for name in unmeasured]
+    if regressions:
+        print("\n❌ Regressions against the baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print("\n✅ No regressions against the baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,352 @@
+"""
+In-process stand-ins for every external service the API talks to:
+Groq (ChatGroq), DuckDuckGo (DDGS), Gemini embeddings (google-genai),
+ElevenLabs TTS, AssemblyAI and the Neon/pgvector database.
+
+Each fake mimics only the client surface our call sites use and runs every
+call through a FaultProfile, so latency and failures can be injected per
+service without touching the network.
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import numpy as np
+
+EMBEDDING_DIM = 768
+
+
+class InjectedFault(RuntimeError):
+    """Raised by a fake service when its fault profile decides a call should fail."""
+
+
+@dataclass
+class FaultProfile:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    stall_rate: float = 0.0     # fraction of calls that hang for stall_ms (exercises deadlines and hedging)
+    stall_ms: float = 120_000.0
+
+    @classmethod
+    def parse(cls, spec: str, base: "FaultProfile" = None) -> "FaultProfile":
+        """
+        Parse a 'latency=800,jitter=200,error=0.02,stall=0.01' style spec on top of `base`.
+        """
+        profile = FaultProfile(**vars(base)) if base else FaultProfile()
+        keys = {
+            "latency": "latency_ms",
+            "jitter": "jitter_ms",
+            "error": "error_rate",
+            "stall": "stall_rate",
+            "stall_ms": "stall_ms",
+        }
+        for part in filter(None, spec.split(",")):
+            key, _, value = part.partition("=")
+            if key.strip() not in keys:
+                raise ValueError(f"Unknown fault setting '{key}' (expected one of {sorted(keys)})")
+            setattr(profile, keys[key.strip()], float(value))
+        return profile
+
+
+# Rough production latencies, used when the load test does not override them.
+DEFAULT_PROFILES = {
+    "groq": FaultProfile(latency_ms=900, jitter_ms=300),
+    "ddgs": FaultProfile(latency_ms=600, jitter_ms=200),
+    "gemini": FaultProfile(latency_ms=150, jitter_ms=50),
+    "elevenlabs": FaultProfile(latency_ms=700, jitter_ms=200),
+    "assemblyai": FaultProfile(latency_ms=300, jitter_ms=100),
+    "neon": FaultProfile(latency_ms=40, jitter_ms=10),
+}
+
+
+class FakeService:
+    """
+    Call counter + fault injector shared by all fakes of one external service.
+    """
+
+    def __init__(self, name: str, profile: FaultProfile):
+        self.name = name
+        self.profile = profile
+        self.calls = 0
+        self.injected_errors = 0
+        self._lock = threading.Lock()
+
+    def call(self):
+        with self._lock:
+            self.calls += 1
+        delay_ms = self.profile.latency_ms + random.uniform(-self.profile.jitter_ms, self.profile.jitter_ms)
+        if self.profile.stall_rate and random.random() < self.profile.stall_rate:
+            delay_ms = self.profile.stall_ms
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000.0)
+        if self.profile.error_rate and random.random() < self.profile.error_rate:
+            with self._lock:
+                self.injected_errors += 1
+            raise InjectedFault(f"Injected {self.name} failure")
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "injected_errors": self.injected_errors}
+
+
+def _prompt_text(messages) -> str:
+    if isinstance(messages, str):
+        return messages
+    return "\n".join(getattr(m, "content", str(m)) for m in messages)
+
+
+# --- Groq ---
+class FakeChatGroq:
+    service: FakeService = None
+
+    def __init__(self, *args, **kwargs):
+        self.model_name = kwargs.get("model_name") or kwargs.get("model")
+
+    def invoke(self, messages):
+        self.service.call()
+        prompt = _prompt_text(messages)
+
+        if "JSON report" in prompt:
+            payload = {
+                "summary": "Synthetic report summary.",
+                "technical_feedback": "Synthetic technical feedback.",
+                "behavioral_feedback": "Synthetic behavioral feedback.",
+                "communication_feedback": "Synthetic communication feedback.",
+                "suggestions": ["Practice system design.", "Slow down."],
+                "score": "7/10",
+            }
+        elif "Condense this interview answer" in prompt:
+            payload = {
+                "key_points": ["Synthetic key point."],
+                "strengths": ["Clear structure."],
+                "weaknesses": ["Missing edge cases."],
+                "score": round(random.uniform(5, 9), 1),
+            }
+        elif "evaluate the following technical answer" in prompt:
+            payload = {
+                "evaluation": [
+                    {"category": c, "score": round(random.uniform(5, 9), 1),
+                     "feedback": f"Synthetic {c.lower()} feedback.", "improvement_tip": "Be more specific."}
+                    for c in ("Correctness", "Clarity", "Depth", "Conciseness")
+                ],
+                "overall_summary": "Synthetic overall summary.",
+                "actionable_suggestions": ["Use concrete examples.", "Structure the answer."],
+            }
+        elif "interview questions" in prompt and '"questions"' in prompt:
+            payload = {
+                "questions": [f"Synthetic interview question {i + 1}?" for i in range(5)],
+                "summary": "Synthetic summary of the typical interview focus for this role.",
+            }
+        else:
+            return SimpleNamespace(content="• Expanded synthetic query about behavioral expectations and preparation strategies.")
+
+        return SimpleNamespace(content=json.dumps(payload))
+
+
+# --- DuckDuckGo ---
+class FakeDDGS:
+    service: FakeService = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def text(self, query, max_results=3):
+        self.service.call()
+        return [{"title": f"Result {i}", "body": f"Synthetic search snippet {i} for '{query}'."} for i in range(max_results)]
+
+
+# --- Gemini embeddings ---
+class _FakeGenAIModels:
+    def __init__(self, service: FakeService):
+        self._service = service
+
+    def embed_content(self, model, contents):
+        self._service.call()
+        seed = int.from_bytes(hashlib.sha1(str(contents).encode("utf-8")).digest()[:8], "little")
+        values = np.random.default_rng(seed).standard_normal(EMBEDDING_DIM).astype(float).tolist()
+        return SimpleNamespace(embeddings=[SimpleNamespace(values=values)])
+
+
+class FakeGenAIClient:
+    def __init__(self, service: FakeService):
+        self.models = _FakeGenAIModels(service)
+
+
+# --- ElevenLabs ---
+class _FakeTextToSpeech:
+    def __init__(self, service: FakeService):
+        self._service = service
+
+    def convert(self, text, voice_id=None, model_id=None, output_format=None):
+        self._service.call()
+        # ~1 KB of "mp3" per word, streamed in chunks like the real SDK
+        payload = random.randbytes(max(1, len(text.split())) * 1024)
+        return iter([payload[i:i + 4096] for i in range(0, len(payload), 4096)])
+
+
+class FakeElevenLabs:
+    def __init__(self, service: FakeService):
+        self.text_to_speech = _FakeTextToSpeech(service)
+
+
+# --- AssemblyAI (replaces the `requests` module inside audio_transcript) ---
+class _FakeResponse:
+    def __init__(self, payload: dict, status_code: int = 200):
+        self._payload = payload
+        self.status_code = status_code
+
+    def json(self):
+        return self._payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeAssemblyAI:
+    """
+    Stand-in for the `requests` module as used by audio_transcript.py.
+    """
+
+    def __init__(self, service: FakeService, words_per_second: float = 2.5):
+        import requests as _requests
+        self.exceptions = _requests.exceptions
+        self._service = service
+        self._words_per_second = words_per_second
+        self._uploads = {}
+        self._transcripts = {}
+        self._lock = threading.Lock()
+
+    def post(self, url, headers=None, data=None, json=None, timeout=None, **kwargs):
+        self._service.call()
+        if url.endswith("/upload"):
+            body = data if isinstance(data, (bytes, bytearray)) else b"".join(data or [])
+            upload_url = f"https://fake.assemblyai/upload/{uuid.uuid4().hex}"
+            with self._lock:
+                self._uploads[upload_url] = len(body)
+            return _FakeResponse({"upload_url": upload_url})
+
+        transcript_id = uuid.uuid4().hex
+        with self._lock:
+            self._transcripts[transcript_id] = self._uploads.get(json["audio_url"], 0)
+        return _FakeResponse({"id": transcript_id, "status": "queued"})
+
+    def get(self, url, headers=None, timeout=None, **kwargs):
+        self._service.call()
+        transcript_id = url.rstrip("/").rsplit("/", 1)[-1]
+        with self._lock:
+            size = self._transcripts.get(transcript_id)
+        if size is None:
+            return _FakeResponse({"error": "not found"}, status_code=404)
+        # Assume ~32 KB of upload per second of speech
+        n_words = max(1, int(size / 32_000 * self._words_per_second))
+        words = [
+            {"text": f"word{i}", "start": int(i * 1000 / self._words_per_second),
+             "end": int((i + 0.8) * 1000 / self._words_per_second)}
+            for i in range(n_words)
+        ]
+        return _FakeResponse({
+            "id": transcript_id,
+            "status": "completed",
+            "text": " ".join(w["text"] for w in words),
+            "words": words,
+        })
+
+
+# --- Neon / pgvector ---
+class _FakeCursor:
+    def __init__(self, service: FakeService):
+        self._service = service
+        self._rows = []
+
+    def execute(self, sql, params=None):
+        self._service.call()
+        top_k = params[-1] if params else 5
+        self._rows = [
+            (i, f"Synthetic knowledge base chunk {i}.", "synthetic.pdf", i)
+            for i in range(int(top_k) if isinstance(top_k, int) else 5)
+        ]
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+class _FakeConnection:
+    def __init__(self, service: FakeService):
+        self._service = service
+
+    def cursor(self):
+        return _FakeCursor(self._service)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakePsycopg2:
+    def __init__(self, service: FakeService):
+        self._service = service
+
+    def connect(self, **params):
+        return _FakeConnection(self._service)
+
+
+def install(profiles: dict = None) -> dict:
+    """
+    Patch every external client used by the app with its fake.
+
+    Must be called after the app modules are importable (API keys set) and
+    before any request is served.
+
+    Args:
+        profiles (dict[str, FaultProfile]): Per-service overrides of DEFAULT_PROFILES.
+
+    Returns:
+        dict[str, FakeService]: The services, for call/error accounting.
+    """
+    from AudioAnalyser.services import audio_transcript, evaluation
+    from QuestionGeneration import context_generation, question_audio
+    from ReportGeneration import answer_summary, connection
+    from ReportGeneration.Query import query_generation
+    from ReportGeneration.Retriever import retriever
+
+    merged = dict(DEFAULT_PROFILES)
+    merged.update(profiles or {})
+    services = {name: FakeService(name, profile) for name, profile in merged.items()}
+
+    FakeChatGroq.service = services["groq"]
+    FakeDDGS.service = services["ddgs"]
+
+    context_generation.ChatGroq = FakeChatGroq
+    context_generation.DDGS = FakeDDGS
+    evaluation.ChatGroq = FakeChatGroq
+    answer_summary.ChatGroq = FakeChatGroq
+    query_generation.ChatGroq = FakeChatGroq
+    connection.llm = FakeChatGroq(model="groq/compound")
+    if connection.fallback_llm:
+        connection.fallback_llm = FakeChatGroq(model=connection.fallback_llm.model_name)
+
+    retriever.client = FakeGenAIClient(services["gemini"])
+    retriever.psycopg2 = FakePsycopg2(services["neon"])
+
+    audio_transcript.requests = FakeAssemblyAI(services["assemblyai"])
+
+    question_audio.tts_client = FakeElevenLabs(services["elevenlabs"])
+
+    return services
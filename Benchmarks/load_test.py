@@ -0,0 +1,428 @@
+"""
+Offline end-to-end load test for the FastAPI app in main.py.
+
+Every external service is replaced by the in-process fakes in Benchmarks/fakes.py,
+then realistic interview sessions (start -> questions -> TTS -> answers -> video
+-> report) are driven through the ASGI app.
+
+The app keeps one interview's state in the module-level `shared_state`, so an
+app instance serves one session at a time. Concurrency therefore comes from
+--instances: each instance is a separate process with its own app, state and
+fakes, running its share of the sessions back to back.
+
+The fakes have no quota, so the outbound scheduler's rate limits are lifted by
+default; otherwise ten sessions of ~13 Groq calls each just measure the 30 rpm
+throttle. --rate-limits production keeps the configured limits (RATE_LIMIT_*
+env vars or the defaults) and warns when the offered load exceeds them.
+
+Usage (from the repository root):
+    python -m Benchmarks.load_test --sessions 20 --instances 4
+    python -m Benchmarks.load_test --service groq:latency=1500,error=0.05
+    python -m Benchmarks.load_test --service gemini:stall=0.05,stall_ms=60000   # deadlines / hedging
+    GROQ_FALLBACK_MODEL=llama-3.1-8b-instant python -m Benchmarks.load_test --service groq:error=0.5
+    python -m Benchmarks.load_test --compare Benchmarks/results/previous.json
+    RATE_LIMIT_GROQ_RPM=300 python -m Benchmarks.load_test --rate-limits production
+"""
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import wave
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+# The app refuses to import without API keys; the fakes never use them.
+for _key in ("GROQ_API_KEY", "GOOGLE_API_KEY", "ASSEMBLYAI_API_KEY", "ELEVENLABS_API_KEY"):
+    os.environ.setdefault(_key, "load-test")
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+# --- Synthetic inputs ---
+def make_answer_audio(seconds: float, sample_rate: int = 44_100) -> bytes:
+    """
+    Stereo 16-bit WAV alternating ~2 s "speech" tone bursts with pauses,
+    padded with leading/trailing silence like a browser recording.
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    envelope = ((t % 3.0) < 2.0).astype(np.float32)
+    envelope[t < 1.0] = 0.0
+    envelope[t > seconds - 1.0] = 0.0
+    signal = 0.3 * np.sin(2 * np.pi * 220 * t) * envelope + 0.002 * rng.standard_normal(t.size)
+    pcm = (np.clip(signal, -1, 1) * 32767).astype(np.int16)
+    stereo = np.repeat(pcm[:, None], 2, axis=1)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(stereo.tobytes())
+    return buffer.getvalue()
+
+
+def make_interview_video(seconds: float, fps: int = 15, size=(320, 240)) -> bytes:
+    """
+    Small mp4 with a moving bright ellipse over noise, decodable by OpenCV.
+    """
+    import cv2
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "interview.mp4")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+        for i in range(int(seconds * fps)):
+            frame = rng.integers(0, 60, (size[1], size[0], 3), dtype=np.uint8)
+            center = (size[0] // 2 + int(20 * np.sin(i / fps)), size[1] // 2)
+            cv2.ellipse(frame, center, (60, 80), 0, 0, 360, (200, 180, 160), -1)
+            writer.write(frame)
+        writer.release()
+        with open(path, "rb") as f:
+            return f.read()
+
+
+RESUME_TEXT = (
+    "Jane Doe\nSoftware Engineer\n\nSkills\nPython, FastAPI, PostgreSQL, Docker, Kubernetes\n\n"
+    "Experience\nBackend Engineer at Example Corp (2021-2024)\n"
+    "- Built REST APIs serving 2M requests/day\n- Reduced p95 latency by 40%\n\n"
+    "Projects\nVector search service on pgvector\n"
+) * 3
+
+
+# --- Measurement ---
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, endpoint: str, seconds: float, ok: bool):
+        self.latencies[endpoint].append(seconds)
+        if not ok:
+            self.errors[endpoint] += 1
+
+
+def percentile(values, q: float) -> float:
+    """
+    Linear-interpolated percentile of `values` for q in [0, 100].
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100.0
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class PeakRSSSampler:
+    """
+    Samples this process's RSS in a background thread and keeps the maximum.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        import psutil
+        self._process = psutil.Process()
+        self._interval = interval
+        self._stop = threading.Event()
+        self.peak_bytes = self._process.memory_info().rss
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak_bytes = max(self.peak_bytes, self._process.memory_info().rss)
+            self._stop.wait(self._interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+# --- Session driver ---
+async def _timed(client, recorder, label, method, url, **kwargs):
+    start = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+        ok = response.status_code < 400
+    except Exception:
+        response, ok = None, False
+    recorder.record(label, time.perf_counter() - start, ok)
+    return response if ok else None
+
+
+async def run_session(client, recorder, session_id: int, answers: int, audio_bytes: bytes, video_bytes: bytes,
+                      video_mode: str = "segments") -> bool:
+    started = await _timed(
+        client, recorder, "POST /start-interview", "POST", "/start-interview",
+        data={
+            "candidate_name": f"Candidate {session_id}",
+            "job_role": "Backend Engineer",
+            "company_name": "Example Corp",
+            "job_description": "Design and operate Python services on PostgreSQL. " * 5,
+        },
+        files={"resume_file": ("resume.txt", RESUME_TEXT.encode("utf-8"), "text/plain")},
+    )
+    if started is None:
+        return False
+
+    problems = await _timed(client, recorder, "GET /generate-problems", "GET", "/generate-problems")
+    if problems is None:
+        return False
+    n_questions = len(problems.json().get("questions", [])) or 5
+
+    for question_id in range(1, min(answers, n_questions) + 1):
+        await _timed(client, recorder, "GET /question-tts/{question_id}", "GET", f"/question-tts/{question_id}")
+        await _timed(
+            client, recorder, "POST /upload", "POST", "/upload",
+            data={"question_id": str(question_id)},
+            files={"audio": (f"answer_{question_id}.wav", audio_bytes, "audio/wav")},
+        )
+        if video_mode == "segments":
+            await _timed(
+                client, recorder, "POST /analyze-video-segment", "POST", "/analyze-video-segment",
+                data={"question_id": str(question_id), "segment_index": str(question_id - 1)},
+                files={"video": (f"segment_{question_id}.mp4", video_bytes, "video/mp4")},
+            )
+
+    if video_mode == "full":
+        await _timed(
+            client, recorder, "POST /analyze-video", "POST", "/analyze-video",
+            files={"video": ("interview.mp4", video_bytes, "video/mp4")},
+        )
+    report = await _timed(client, recorder, "POST /generate-report", "POST", "/generate-report")
+    return report is not None
+
+
+async def run_load(app, session_ids, answers: int, audio_bytes: bytes, video_bytes: bytes,
+                   video_mode: str = "segments"):
+    """
+    Runs the sessions one after another against a single app instance
+    (sessions would overwrite each other's shared_state if interleaved).
+    """
+    import httpx
+
+    recorder = Recorder()
+    results = []
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+        for session_id in session_ids:
+            results.append(await run_session(
+                client, recorder, session_id, answers, audio_bytes, video_bytes, video_mode
+            ))
+
+    return recorder, results
+
+
+def run_instance(session_ids, answers: int, answer_seconds: float, video_seconds: float, video_mode: str,
+                 profiles: dict, rate_limits: str = "off") -> dict:
+    """
+    One app instance: imports the app, installs the fakes and runs its sessions.
+    Runs in its own process (when there are several) so every instance has its own shared_state.
+    """
+    import outbound_scheduler
+    from Benchmarks import fakes
+
+    if rate_limits == "off":
+        # No limits at all: buckets are only created for providers listed here
+        outbound_scheduler.scheduler.limits = {}
+
+    import main as api
+    services = fakes.install(profiles)
+
+    audio_bytes = make_answer_audio(answer_seconds)
+    video_bytes = make_interview_video(video_seconds)
+
+    with PeakRSSSampler() as rss:
+        start = time.perf_counter()
+        recorder, results = asyncio.run(
+            run_load(api.app, session_ids, answers, audio_bytes, video_bytes, video_mode)
+        )
+        elapsed = time.perf_counter() - start
+
+    return {
+        "elapsed": elapsed,
+        "latencies": dict(recorder.latencies),
+        "errors": dict(recorder.errors),
+        "results": results,
+        "peak_rss_bytes": rss.peak_bytes,
+        "services": {name: service.stats() for name, service in services.items()},
+        "profiles": {name: vars(service.profile) for name, service in services.items()},
+        "rate_limits": outbound_scheduler.scheduler.limits,
+    }
+
+
+def summarize(recorder: Recorder, results, elapsed: float) -> dict:
+    endpoints = {}
+    total_requests = 0
+    for label, values in sorted(recorder.latencies.items()):
+        total_requests += len(values)
+        endpoints[label] = {
+            "count": len(values),
+            "errors": recorder.errors[label],
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "mean_ms": round(sum(values) / len(values) * 1000, 2),
+            "max_ms": round(max(values) * 1000, 2),
+        }
+    return {
+        "sessions": len(results),
+        "failed_sessions": results.count(False),
+        "duration_s": round(elapsed, 3),
+        "throughput": {
+            "sessions_per_s": round(len(results) / elapsed, 4) if elapsed else 0.0,
+            "requests_per_s": round(total_requests / elapsed, 4) if elapsed else 0.0,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def warn_if_throttled(report: dict, limits: dict, instances: int):
+    """
+    Warns for every provider whose offered request rate per instance exceeds its rpm limit.
+    """
+    minutes = report["duration_s"] / 60
+    for name, limit in limits.items():
+        calls = report["services"].get(name, {}).get("calls", 0)
+        if not limit.get("rpm") or not calls or not minutes:
+            continue
+        offered = calls / instances / minutes
+        if offered > limit["rpm"]:
+            print(f"⚠️ {name}: ~{offered:.0f} requests/min per instance against a {limit['rpm']:.0f} rpm limit; "
+                  f"latencies include rate-limit queueing (raise RATE_LIMIT_{name.upper()}_RPM or use --rate-limits off).")
+
+
+def compare(current: dict, previous: dict):
+    print(f"\n{'endpoint':<34}{'p95 before':>12}{'p95 now':>12}{'delta':>10}")
+    for label, stats in current["endpoints"].items():
+        before = previous.get("endpoints", {}).get(label)
+        if not before or not before["p95_ms"]:
+            print(f"{label:<34}{'-':>12}{stats['p95_ms']:>12.1f}{'new':>10}")
+            continue
+        delta = (stats["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100
+        print(f"{label:<34}{before['p95_ms']:>12.1f}{stats['p95_ms']:>12.1f}{delta:>+9.1f}%")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline end-to-end load test with fake external services.")
+    parser.add_argument("--sessions", type=int, default=10, help="Total interview sessions to run.")
+    parser.add_argument(
+        "--instances", type=int, default=1,
+        help="App instances (processes) running sessions in parallel; each serves one session at a time.",
+    )
+    parser.add_argument("--answers", type=int, default=5, help="Answers uploaded per session.")
+    parser.add_argument("--answer-seconds", type=float, default=30.0, help="Length of each synthetic answer.")
+    parser.add_argument(
+        "--video-mode", choices=["segments", "full"], default="segments",
+        help="Upload one video segment per answer, or one full recording before the report.",
+    )
+    parser.add_argument("--video-seconds", type=float, default=20.0, help="Length of each synthetic video upload.")
+    parser.add_argument(
+        "--service", action="append", default=[], metavar="NAME:SPEC",
+        help="Fault profile override, e.g. groq:latency=1500,jitter=300,error=0.05,stall=0.01 (repeatable).",
+    )
+    parser.add_argument(
+        "--rate-limits", choices=["off", "production"], default="off",
+        help="Lift the outbound scheduler's limits (default), or keep the configured production limits.",
+    )
+    parser.add_argument("--output", help="Where to write the JSON results (default: Benchmarks/results/).")
+    parser.add_argument("--compare", help="Previous results JSON to print p95 deltas against.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    from Benchmarks import fakes
+
+    profiles = {}
+    for override in args.service:
+        name, _, spec = override.partition(":")
+        if name not in fakes.DEFAULT_PROFILES:
+            raise SystemExit(f"Unknown service '{name}' (expected one of {sorted(fakes.DEFAULT_PROFILES)})")
+        profiles[name] = fakes.FaultProfile.parse(spec, fakes.DEFAULT_PROFILES[name])
+
+    instances = max(1, min(args.instances, args.sessions))
+    # Round-robin the session ids over the instances
+    shares = [list(range(args.sessions))[i::instances] for i in range(instances)]
+    instance_args = [
+        (share, args.answers, args.answer_seconds, args.video_seconds, args.video_mode, profiles, args.rate_limits)
+        for share in shares
+    ]
+
+    print(f"--- Load test: {args.sessions} sessions on {instances} app instance(s) ---")
+    if instances == 1:
+        outcomes = [run_instance(*instance_args[0])]
+    else:
+        # spawn: each instance imports its own copy of the app and shared_state
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(instances) as pool:
+            outcomes = pool.starmap(run_instance, instance_args)
+    # Wall time of the slowest instance, excluding app import and input generation
+    elapsed = max(outcome["elapsed"] for outcome in outcomes)
+
+    recorder = Recorder()
+    results = []
+    services = defaultdict(lambda: defaultdict(int))
+    for outcome in outcomes:
+        for label, values in outcome["latencies"].items():
+            recorder.latencies[label].extend(values)
+        for label, count in outcome["errors"].items():
+            recorder.errors[label] += count
+        results.extend(outcome["results"])
+        for name, stats in outcome["services"].items():
+            for key, value in stats.items():
+                services[name][key] += value
+
+    report = summarize(recorder, results, elapsed)
+    # Instances are separate processes: their peaks add up
+    report["peak_rss_mb"] = round(sum(o["peak_rss_bytes"] for o in outcomes) / 2**20, 1)
+    report["services"] = {name: dict(stats) for name, stats in services.items()}
+    report["config"] = {
+        "sessions": args.sessions,
+        "instances": instances,
+        "answers": args.answers,
+        "answer_seconds": args.answer_seconds,
+        "video_mode": args.video_mode,
+        "video_seconds": args.video_seconds,
+        "profiles": outcomes[0]["profiles"],
+        "rate_limits": args.rate_limits,
+    }
+    report["timestamp"] = datetime.utcnow().isoformat()
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"load_test_{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for label, stats in report["endpoints"].items():
+        print(f"{label:<34} n={stats['count']:<4} err={stats['errors']:<3} "
+              f"p50={stats['p50_ms']:.0f}ms p95={stats['p95_ms']:.0f}ms p99={stats['p99_ms']:.0f}ms")
+    print(f"Throughput: {report['throughput']['sessions_per_s']} sessions/s, "
+          f"{report['throughput']['requests_per_s']} requests/s")
+    print(f"Peak RSS: {report['peak_rss_mb']} MB")
+    warn_if_throttled(report, outcomes[0]["rate_limits"], instances)
+    print(f"✅ Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
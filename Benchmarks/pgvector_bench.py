@@ -0,0 +1,151 @@
+"""
+Load-time and query-latency benchmark for PgVectorStore against a local Postgres
+with the pgvector extension.
+
+Uses a scratch table (dropped afterwards unless --keep) and synthetic vectors,
+and compares:
+  - row-by-row INSERT vs. binary COPY load throughput
+  - exact (sequential scan) vs. ANN index query latency, plus ANN recall@k
+
+Usage (from the repository root):
+    python -m Benchmarks.pgvector_bench --dsn postgresql://postgres@localhost/postgres --rows 50000
+    python -m Benchmarks.pgvector_bench --index ivfflat --rows 200000
+"""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from Benchmarks.load_test import RESULTS_DIR, percentile
+from ReportGeneration.VectorStore import pgvector_store
+from ReportGeneration.VectorStore.pgvector_store import PgVectorStore, to_vector_literal
+
+
+def _timed_queries(cursor, table, queries, top_k):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        cursor.execute(
+            f"SELECT id FROM {table} ORDER BY embedding <-> %s::vector LIMIT %s;",
+            (to_vector_literal(query), top_k),
+        )
+        results.append([row[0] for row in cursor.fetchall()])
+        latencies.append(time.perf_counter() - start)
+    return latencies, results
+
+
+def _latency_stats(latencies):
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark pgvector bulk loading and ANN queries.")
+    parser.add_argument("--dsn", help="libpq connection string (default: PG_* environment variables).")
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--dimensions", type=int, default=768)
+    parser.add_argument("--batch-size", type=int, default=1_000)
+    parser.add_argument("--insert-rows", type=int, default=2_000, help="Rows for the row-by-row INSERT baseline.")
+    parser.add_argument("--index", choices=["hnsw", "ivfflat"], default=pgvector_store.INDEX_METHOD)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--table", default="pdf_embeddings_bench")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch table afterwards.")
+    parser.add_argument("--output", help="Where to write the JSON results (default: Benchmarks/results/).")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((args.rows, args.dimensions)).astype(np.float32)
+    queries = rng.standard_normal((args.queries, args.dimensions)).astype(np.float32)
+    ids = [f"bench_{i}" for i in range(args.rows)]
+    texts = [f"Synthetic chunk {i} " * 40 for i in range(args.rows)]
+    metadatas = [{"source": f"doc_{i // 50}.pdf", "page": i % 50} for i in range(args.rows)]
+
+    db_params = {"dsn": args.dsn} if args.dsn else None
+    results = {"config": vars(args), "timestamp": datetime.utcnow().isoformat()}
+
+    with PgVectorStore(dimensions=args.dimensions, table=args.table, db_params=db_params) as store:
+        cursor = store.conn.cursor()
+        cursor.execute(f"DROP TABLE IF EXISTS {args.table};")
+        store.conn.commit()
+        store.ensure_schema()
+
+        # Baseline: one INSERT per row with a text vector literal
+        n_insert = min(args.insert_rows, args.rows)
+        start = time.perf_counter()
+        for i in range(n_insert):
+            cursor.execute(
+                f"INSERT INTO {args.table} (id, text, source, page, embedding) VALUES (%s, %s, %s, %s, %s::vector) "
+                "ON CONFLICT (id) DO NOTHING;",
+                (ids[i], texts[i], metadatas[i]["source"], metadatas[i]["page"], to_vector_literal(vectors[i])),
+            )
+        store.conn.commit()
+        insert_elapsed = time.perf_counter() - start
+        cursor.execute(f"TRUNCATE {args.table};")
+        store.conn.commit()
+
+        # Binary COPY + upsert in batches
+        start = time.perf_counter()
+        for offset in range(0, args.rows, args.batch_size):
+            end = offset + args.batch_size
+            store.write_batch(ids[offset:end], texts[offset:end], metadatas[offset:end], vectors[offset:end])
+        copy_elapsed = time.perf_counter() - start
+
+        results["load"] = {
+            "insert_rows_per_s": round(n_insert / insert_elapsed, 1),
+            "copy_rows_per_s": round(args.rows / copy_elapsed, 1),
+            "copy_total_s": round(copy_elapsed, 3),
+            "speedup": round((args.rows / copy_elapsed) / (n_insert / insert_elapsed), 2),
+        }
+
+        cursor.execute(f"ANALYZE {args.table};")
+        exact_latencies, exact_results = _timed_queries(cursor, args.table, queries, args.top_k)
+        results["exact_query"] = _latency_stats(exact_latencies)
+
+        start = time.perf_counter()
+        store.ensure_index(args.index)
+        results["index_build_s"] = round(time.perf_counter() - start, 3)
+
+        if os.getenv("PGVECTOR_HNSW_EF_SEARCH"):
+            cursor.execute("SET hnsw.ef_search = %s;", (int(os.getenv("PGVECTOR_HNSW_EF_SEARCH")),))
+        if os.getenv("PGVECTOR_IVFFLAT_PROBES"):
+            cursor.execute("SET ivfflat.probes = %s;", (int(os.getenv("PGVECTOR_IVFFLAT_PROBES")),))
+
+        ann_latencies, ann_results = _timed_queries(cursor, args.table, queries, args.top_k)
+        recall = np.mean([
+            len(set(ann) & set(exact)) / len(exact) for ann, exact in zip(ann_results, exact_results) if exact
+        ])
+        results["ann_query"] = {**_latency_stats(ann_latencies), "recall_at_k": round(float(recall), 4)}
+
+        if not args.keep:
+            cursor.execute(f"DROP TABLE IF EXISTS {args.table};")
+            store.conn.commit()
+        cursor.close()
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"pgvector_{args.index}_{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"Load: INSERT {results['load']['insert_rows_per_s']} rows/s, "
+          f"COPY {results['load']['copy_rows_per_s']} rows/s ({results['load']['speedup']}x)")
+    print(f"Index build ({args.index}): {results['index_build_s']} s")
+    print(f"Exact query: p50={results['exact_query']['p50_ms']}ms p95={results['exact_query']['p95_ms']}ms")
+    print(f"ANN query:   p50={results['ann_query']['p50_ms']}ms p95={results['ann_query']['p95_ms']}ms "
+          f"recall@{args.top_k}={results['ann_query']['recall_at_k']}")
+    print(f"✅ Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,11 @@ from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain.schema import SystemMessage, HumanMessage
 
+from outbound_scheduler import Priority, estimate_tokens
+from QuestionGeneration.resume_digest import build_resume_digest, compress_job_description
+from resilience import FALLBACK_CHAT_MODEL, resilient_call
+from telemetry import stage
+
 # Load environment variables
 load_dotenv()
 api_key = os.getenv("GROQ_API_KEY")
@@ -42,6 +47,11 @@ FALLBACK_QUESTIONS = {
 }
 
 
+def _web_search(query: str) -> list:
+    with DDGS() as ddgs:
+        return ddgs.text(query, max_results=3)
+
+
 def generate_interview_questions(
     job_role: str,
     company_name: str,
@@ -63,25 +73,39 @@ def generate_interview_questions(
 
         search_context = ""
         if not job_description or len(job_description) < 100 or not resume_text:
-            with DDGS() as ddgs:
-                search_results_raw = ddgs.text(query, max_results=3)
+            try:
+                with stage("ddgs.search"):
+                    search_results_raw = resilient_call(
+                        "ddgs", _web_search, query, hedge=True, priority=Priority.INTERACTIVE
+                    )
+            except Exception as e:
+                # Web context is optional: carry on with the provided details
+                print(f"⚠️ Web search failed: {e}")
+                search_results_raw = []
             search_context = "\n".join([item.get("body", "") for item in search_results_raw if item.get("body")])
             if not search_context.strip():
                 search_context = "No significant online information found. Rely on provided details."
         else:
             search_context = "Detailed job description and/or resume provided. Focusing on internal context."
 
-        # Step 2: Build prompt
+        # Step 2: Build prompt from budgeted digests of the job description and resume
+        with stage("resume.digest", kind="cpu"):
+            job_description_digest = compress_job_description(
+                job_description if job_description != "No description provided" else ""
+            )
+            resume_digest = build_resume_digest(
+                resume_text, job_description_digest, other_details, job_role
+            ) if resume_text else ""
+
         prompt = (
             f"Job Role: {job_role}\n"
             f"Company: {company_name}\n"
-            f"Job Description: {job_description if job_description != 'No description provided' else ''}\n"
+            f"Job Description: {job_description_digest}\n"
             f"Additional Info (Skills, Experience, Interview Type etc.): {other_details if other_details else ''}\n"
         )
 
-        if resume_text and resume_text.strip():
-            truncated_resume_text = resume_text[:min(len(resume_text), 3000)]
-            prompt += f"Candidate's Resume Content:\n{truncated_resume_text}\n\n"
+        if resume_digest:
+            prompt += f"Candidate's Resume Content:\n{resume_digest}\n\n"
             prompt += "Please generate questions that are specifically tailored to the candidate's skills, projects, and experience.\n"
 
         prompt += (
@@ -107,6 +131,11 @@ def generate_interview_questions(
             model_name="groq/compound",
             groq_api_key=api_key
         )
+        fallback_model = ChatGroq(
+            temperature=0.7,
+            model_name=FALLBACK_CHAT_MODEL,
+            groq_api_key=api_key
+        ) if FALLBACK_CHAT_MODEL else None
 
         messages = [
             SystemMessage(content=system_instruction_text),
@@ -114,7 +143,15 @@ def generate_interview_questions(
         ]
 
         # Step 4: Groq call
-        response = model.invoke(messages)
+        with stage("groq.generate_questions"):
+            response = resilient_call(
+                "groq", model.invoke, messages,
+                fallback=fallback_model.invoke if fallback_model else None,
+                priority=Priority.INTERACTIVE,
+                rate_model=model.model_name,
+                fallback_rate_model=FALLBACK_CHAT_MODEL,
+                rate_tokens=estimate_tokens(messages) + 1024
+            )
         response_text = response.content.strip()
 
         # Remove code fences if any
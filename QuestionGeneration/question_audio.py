@@ -0,0 +1,88 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+from elevenlabs import ElevenLabs
+
+import shared_state
+from outbound_scheduler import Priority
+from resilience import resilient_call
+from telemetry import stage
+
+# Load environment variables
+load_dotenv()
+
+# Initialize ElevenLabs client
+tts_client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
+
+# Bounded so pre-synthesis stays within the ElevenLabs concurrency limit
+TTS_MAX_CONCURRENCY = int(os.getenv("TTS_MAX_CONCURRENCY", "3"))
+_executor = ThreadPoolExecutor(max_workers=TTS_MAX_CONCURRENCY, thread_name_prefix="tts")
+
+
+def generate_tts_audio(question_text: str, voice: str = "Rachel", priority: Priority = Priority.INTERACTIVE) -> bytes:
+    """
+    Generate ElevenLabs TTS audio and return it as bytes (no file saving required).
+    """
+    if not question_text:
+        raise ValueError("Question text cannot be empty.")
+
+    try:
+        def synthesize():
+            audio_bytes = tts_client.text_to_speech.convert(
+                text=question_text,
+                voice_id="JBFqnCBsd6RMkjVDRZzb",  # Replace with desired voice ID
+                model_id="eleven_multilingual_v2",
+                output_format="mp3_44100_128"
+            )
+            # Ensure we have bytes (the SDK streams, so this is where the audio arrives)
+            if hasattr(audio_bytes, "__iter__") and not isinstance(audio_bytes, bytes):
+                audio_bytes = b"".join(audio_bytes)
+            return audio_bytes
+
+        with stage("elevenlabs.tts"):
+            return resilient_call("elevenlabs", synthesize, priority=priority)
+    except Exception as e:
+        raise RuntimeError(f"TTS generation failed: {e}")
+
+
+def presynthesize_questions(questions: dict):
+    """
+    Queues TTS for every generated question, in question order, into the
+    session audio store (shared_state.question_audio: question text -> Future[bytes]).
+
+    Audio already synthesized for an unchanged question is reused; pending
+    jobs for questions that are no longer current are cancelled.
+    """
+    previous = shared_state.question_audio
+    store = {}
+    for question_text in questions.get("questions", []):
+        if question_text in store:
+            continue
+        store[question_text] = previous.get(question_text) or _executor.submit(
+            # Behind on-demand requests for the question being read right now
+            generate_tts_audio, question_text, priority=Priority.STANDARD
+        )
+
+    for question_text, future in previous.items():
+        if question_text not in store:
+            future.cancel()
+
+    shared_state.question_audio = store
+
+
+async def get_question_audio(question_text: str, voice: str = "Rachel") -> bytes:
+    """
+    Returns pre-synthesized audio for a question, waiting on its job if still
+    in flight, or synthesizes it on demand if it was never queued or failed.
+    """
+    future = shared_state.question_audio.get(question_text)
+    if future is not None and not future.cancelled():
+        try:
+            # Shielded: a client that disconnects must not cancel the shared synthesis job
+            return await asyncio.shield(asyncio.wrap_future(future))
+        except Exception as e:
+            print(f"⚠️ Pre-synthesized TTS failed, retrying on demand: {e}")
+
+    return await asyncio.to_thread(generate_tts_audio, question_text, voice)
@@ -0,0 +1,257 @@
+"""
+LLM-free compression of the resume and job description for the question prompt.
+
+The resume is split into sections (skills, experience, projects, ...), every
+line is scored by its keyword overlap with the job description, and the best
+lines are packed into a token budget, so the prompt keeps what matters for the
+role instead of whatever happens to come first. The job description loses its
+boilerplate (benefits, EEO statements, company blurbs) the same way.
+"""
+import math
+import os
+import re
+from collections import Counter
+
+from outbound_scheduler import estimate_tokens
+
+RESUME_DIGEST_TOKENS = int(os.getenv("RESUME_DIGEST_TOKENS", "600"))
+JOB_DESCRIPTION_TOKENS = int(os.getenv("JOB_DESCRIPTION_TOKENS", "500"))
+
+# Heading keyword -> section; a bare line must match exactly, "Heading...: text" by prefix
+SECTION_HEADINGS = {
+    "summary": ("summary", "profile", "objective", "about me", "professional summary"),
+    "skills": ("skills", "technical skills", "core competencies", "technologies", "tech stack", "tools"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "work history", "internships", "internship"),
+    "projects": ("projects", "personal projects", "academic projects", "key projects"),
+    "education": ("education", "academic background", "qualifications"),
+    "achievements": ("achievements", "awards", "certifications", "certificates", "honors", "publications", "activities"),
+}
+SECTION_ORDER = ("summary", "skills", "experience", "projects", "achievements", "education", "other")
+# Prior relevance of a section, used on top of job-description overlap
+SECTION_WEIGHT = {
+    "skills": 1.2, "experience": 1.0, "projects": 1.0, "summary": 0.8,
+    "achievements": 0.6, "education": 0.4, "other": 0.3,
+}
+
+# Job description sections that never help write interview questions
+JD_BOILERPLATE_HEADINGS = (
+    "about us", "about the company", "who we are", "our mission", "benefits", "perks",
+    "what we offer", "why join", "why you'll love", "compensation", "equal opportunity",
+    "eeo", "how to apply", "location", "salary",
+)
+JD_FOCUS_HEADINGS = ("requirements", "responsibilities", "qualifications", "what you'll do", "what you will do", "must have", "skills")
+JD_BOILERPLATE_LINE = re.compile(
+    r"equal opportunity|regardless of (race|gender)|401\(?k\)?|health insurance|paid time off|"
+    r"\bpto\b|parental leave|visa sponsorship|apply (now|today)|competitive (salary|compensation)",
+    re.IGNORECASE,
+)
+
+CONTACT_LINE = re.compile(r"@|https?://|www\.|linkedin|github\.com|\+?\d[\d\s().-]{7,}\d", re.IGNORECASE)
+BULLET = re.compile(r"^\s*(?:[-*•●▪◦·➢>]|\d+[.)])\s*")
+TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[.\-][a-z0-9+#]+)*")
+SKILL_SEPARATORS = re.compile(r"\s*[,|;•·/]\s*")
+
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could did do does
+doing for from had has have having he her here his how i if in into is it its itself just me more
+most my no nor not of off on once only or other our out over own same she should so some such than
+that the their them then there these they this those through to too under until up very was we
+were what when where which while who whom why will with would you your yours
+ability able across candidate candidates company etc experience experienced familiarity good
+great ideal including join knowledge looking must new plus preferred strong team teams using
+work working year years role responsibilities requirements
+""".split())
+
+
+def _tokens(text: str) -> list:
+    return [t for t in TOKEN.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+
+def _heading(line: str, headings: dict):
+    """
+    Splits off a section heading: "Skills" -> ("skills", ""), "Skills: Python, Go"
+    -> ("skills", "Python, Go"), anything else -> (None, line).
+
+    Without a colon the line has to be the heading itself, so prose such as
+    "Experience with Python" or "Projects using React" stays a content line.
+    """
+    head, colon, rest = line.partition(":")
+    cleaned = re.sub(r"[^a-z'& ]", "", head.lower()).strip()
+    if not cleaned or len(cleaned.split()) > 4 or len(head) > 40:
+        return None, line
+    for section, names in headings.items():
+        if any(cleaned == name or (colon and cleaned.startswith(name + " ")) for name in names):
+            return section, rest.strip()
+    return None, line
+
+
+def _lines(text: str) -> list:
+    return [re.sub(r"\s+", " ", line).strip() for line in text.splitlines() if line.strip()]
+
+
+def split_sections(resume_text: str) -> dict:
+    """
+    Groups resume lines by section. Lines before the first heading (name,
+    contact details) go to "header"; a resume without any recognisable
+    heading becomes a single "other" section.
+    """
+    sections = {"header": []}
+    current = "header"
+    for line in _lines(resume_text):
+        section, line = _heading(line, SECTION_HEADINGS)
+        if section:
+            current = section
+            sections.setdefault(current, [])
+        if line:
+            sections.setdefault(current, []).append(line)
+    if not any(sections.get(s) for s in SECTION_HEADINGS):
+        # No recognisable headings: treat the whole resume as one block
+        sections = {"other": [line for line in sections["header"] if not CONTACT_LINE.search(line)]}
+    return sections
+
+
+def keyword_weights(*texts: str) -> dict:
+    """
+    Job-description vocabulary weighted by sub-linear term frequency.
+    """
+    counts = Counter(t for text in texts if text for t in _tokens(text))
+    return {term: 1.0 + math.log(count) for term, count in counts.items()}
+
+
+def _score(text: str, weights: dict) -> float:
+    terms = set(_tokens(text))
+    if not terms:
+        return 0.0
+    overlap = sum(weights.get(t, 0.0) for t in terms)
+    # Long lines should not win just by mentioning more words
+    return overlap / math.sqrt(len(terms))
+
+
+def _rank_skills(lines: list, weights: dict) -> list:
+    skills = []
+    seen = set()
+    for line in lines:
+        # "Languages: Python, Go" -> "Python", "Go"
+        line = BULLET.sub("", line)
+        if ":" in line and len(line.split(":", 1)[0].split()) <= 3:
+            line = line.split(":", 1)[1]
+        for skill in SKILL_SEPARATORS.split(line):
+            skill = skill.strip(" .")
+            if skill and skill.lower() not in seen:
+                seen.add(skill.lower())
+                skills.append(skill)
+    # Stable sort: matched skills first, everything else keeps the resume's order
+    return sorted(skills, key=lambda s: -sum(weights.get(t, 0.0) for t in _tokens(s)))
+
+
+def build_resume_digest(resume_text: str, job_description: str = None, other_details: str = None,
+                        job_role: str = None, max_tokens: int = RESUME_DIGEST_TOKENS) -> str:
+    """
+    Token-budgeted digest of the resume, keeping the lines most relevant to the job.
+
+    Args:
+        resume_text (str): Extracted resume text.
+        job_description, other_details, job_role (str, optional): Text whose vocabulary defines relevance.
+        max_tokens (int): Budget for the digest (estimated, ~4 characters per token).
+
+    Returns:
+        str: The digest; the resume itself (minus blank lines) if it already fits.
+    """
+    if not resume_text or not resume_text.strip():
+        return ""
+    if estimate_tokens(resume_text) <= max_tokens:
+        return "\n".join(_lines(resume_text))
+
+    weights = keyword_weights(job_description, other_details, job_role)
+    sections = split_sections(resume_text)
+
+    parts = {}
+    budget = max_tokens
+
+    # Skills: one comma-separated line, at most a quarter of the budget
+    skills = _rank_skills(sections.get("skills", []), weights)
+    if skills:
+        kept = []
+        for skill in skills:
+            if estimate_tokens(", ".join(kept + [skill])) > max_tokens // 4:
+                break
+            kept.append(skill)
+        parts["skills"] = {0: ", ".join(kept)}
+        budget -= estimate_tokens(parts["skills"][0]) + 2
+
+    # Every other line competes on overlap x section weight. A bullet from a
+    # job or project brings its title line (the last non-bullet line above it).
+    candidates = []
+    for section, lines in sections.items():
+        if section in ("header", "skills"):
+            continue
+        anchor = None
+        for index, line in enumerate(lines):
+            is_bullet = bool(BULLET.match(line))
+            if not is_bullet and section in ("experience", "projects"):
+                anchor = index
+            relevance = _score(line, weights) + 0.1  # small base so ties follow section weight
+            candidates.append((relevance * SECTION_WEIGHT.get(section, 0.3), section, index,
+                               anchor if is_bullet else None))
+
+    for _, section, index, anchor in sorted(candidates, key=lambda c: -c[0]):
+        chosen = parts.setdefault(section, {})
+        if index in chosen:
+            continue
+        needed = [i for i in (anchor, index) if i is not None and i not in chosen]
+        cost = sum(estimate_tokens(sections[section][i]) + 1 for i in needed)
+        if cost > budget:
+            continue
+        for i in needed:
+            chosen[i] = sections[section][i]
+        budget -= cost
+
+    digest = []
+    for section in SECTION_ORDER:
+        chosen = parts.get(section)
+        if not chosen:
+            continue
+        body = [chosen[i] for i in sorted(chosen)]
+        if section == "skills":
+            digest.append(f"Skills: {body[0]}")
+        else:
+            digest.append(f"{section.capitalize()}:\n" + "\n".join(body))
+    return "\n".join(digest)
+
+
+def compress_job_description(job_description: str, max_tokens: int = JOB_DESCRIPTION_TOKENS) -> str:
+    """
+    Drops boilerplate sections and lines from a job description and fits it to a budget,
+    preferring requirement/responsibility lines over the rest.
+    """
+    if not job_description or not job_description.strip():
+        return ""
+
+    kept = []  # (priority, index, line)
+    seen = set()
+    section = None
+    headings = {"boilerplate": JD_BOILERPLATE_HEADINGS, "focus": JD_FOCUS_HEADINGS}
+    for index, line in enumerate(_lines(job_description)):
+        heading, rest = _heading(line, headings)
+        if heading and not rest:
+            section = heading
+            if heading == "focus":
+                kept.append((0, index, line))
+            continue
+        # "Location: Remote" style lines are dropped on their own, without hiding what follows
+        line_section = heading or section
+        if line_section == "boilerplate" or JD_BOILERPLATE_LINE.search(line) or line.lower() in seen:
+            continue
+        seen.add(line.lower())
+        kept.append((0 if line_section == "focus" else 1, index, line))
+
+    if estimate_tokens("\n".join(line for _, _, line in kept)) > max_tokens:
+        budget = max_tokens
+        chosen = []
+        for priority, index, line in sorted(kept):
+            cost = estimate_tokens(line) + 1
+            if cost <= budget:
+                chosen.append((priority, index, line))
+                budget -= cost
+        kept = chosen
+    return "\n".join(line for _, _, line in sorted(kept, key=lambda k: k[1]))
@@ -0,0 +1,81 @@
+import asyncio
+
+import shared_state
+from QuestionGeneration.context_generation import generate_interview_questions
+from QuestionGeneration.question_audio import presynthesize_questions
+
+# Job info fields that change the generated questions
+_KEY_FIELDS = ("job_role", "company_name", "job_description", "other_details", "resume_text_content")
+
+
+def _job_key(job_info: dict) -> tuple:
+    return tuple(job_info.get(field) for field in _KEY_FIELDS)
+
+
+def _is_reusable(task: asyncio.Task) -> bool:
+    if not task.done():
+        return True
+    if task.cancelled() or task.exception():
+        return False
+    # Retry instead of serving a cached failure
+    return "error" not in task.result()
+
+
+async def _generate_and_presynthesize(job_info: dict) -> dict:
+    questions = await asyncio.to_thread(
+        generate_interview_questions,
+        job_role=job_info.get("job_role"),
+        company_name=job_info.get("company_name"),
+        job_description=job_info.get("job_description"),
+        other_details=job_info.get("other_details"),
+        resume_text=job_info.get("resume_text_content"),
+    )
+    # Read-aloud audio for every question starts as soon as the text exists
+    if "questions" in questions:
+        presynthesize_questions(questions)
+    return questions
+
+
+def start_question_generation(job_info: dict) -> asyncio.Task:
+    """
+    Starts generating questions for `job_info` in the background, or returns
+    the in-flight / finished task if one already exists for the same inputs.
+
+    Different inputs cancel the previous speculative task. The worker thread
+    itself cannot be interrupted, but its result is discarded.
+
+    Must be called from the event loop.
+    """
+    key = _job_key(job_info)
+    task = shared_state.question_generation_task
+
+    if task and shared_state.question_generation_key == key and _is_reusable(task):
+        return task
+
+    if task and not task.done():
+        task.cancel()
+
+    task = asyncio.create_task(_generate_and_presynthesize(job_info))
+    shared_state.question_generation_task = task
+    shared_state.question_generation_key = key
+    return task
+
+
+async def get_generated_questions(job_info: dict) -> dict:
+    """
+    Attaches to the speculative generation for `job_info`, starting it if needed.
+
+    If a new /start-interview replaces the task while we wait, follows the
+    replacement so the caller gets questions for the current inputs.
+    """
+    task = start_question_generation(job_info)
+    while True:
+        try:
+            # Shield so a client disconnect does not cancel work other requests may attach to
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Our own request being cancelled leaves the shielded task running
+            current = shared_state.question_generation_task
+            if asyncio.current_task().cancelling() or not task.cancelled() or current is None or current is task:
+                raise
+            task = current
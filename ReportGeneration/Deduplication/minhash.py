@@ -0,0 +1,118 @@
+import os
+import re
+from collections import defaultdict
+from typing import Iterable, Iterator
+
+import mmh3
+import numpy as np
+
+# Estimated Jaccard similarity (of word shingles) above which a chunk counts as a duplicate; 0 disables
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.85"))
+DEDUP_NUM_PERM = int(os.getenv("DEDUP_NUM_PERM", "128"))
+DEDUP_SHINGLE_WORDS = int(os.getenv("DEDUP_SHINGLE_WORDS", "5"))
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_WORD = re.compile(r"\w+")
+
+
+def optimal_bands(threshold: float, num_perm: int) -> tuple[int, int]:
+    """
+    Picks (bands, rows) with bands * rows <= num_perm so that the LSH
+    S-curve turning point (1 / bands) ** (1 / rows) sits just below `threshold`:
+    pairs near the threshold still become candidates, and every candidate is
+    then checked against the full signature.
+    """
+    target = max(threshold - 0.1, 0.05)
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1 / bands) ** (1 / rows) - target)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHashDeduplicator:
+    """
+    Streaming near-duplicate filter: MinHash signatures over word shingles,
+    bucketed with banded LSH. The first chunk of a group is kept; later chunks
+    whose estimated similarity to a kept one reaches the threshold are dropped.
+    """
+
+    def __init__(self, threshold: float = DEDUP_THRESHOLD, num_perm: int = DEDUP_NUM_PERM,
+                 shingle_words: int = DEDUP_SHINGLE_WORDS, seed: int = 1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+
+        # h(x) = ((a * x + b) mod p) with a, b drawn below p; the uint64 product wraps, as in
+        # common MinHash implementations. A small `a` would keep h monotonic in x and correlate the permutations.
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_MERSENNE_PRIME), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE_PRIME), num_perm, dtype=np.uint64)
+
+        self._buckets = [defaultdict(list) for _ in range(self.bands)]
+        self._signatures = []  # kept chunks only
+        self.seen = 0
+        self.dropped = 0
+
+    def _shingles(self, text: str) -> set:
+        words = _WORD.findall(text.lower())
+        if len(words) <= self.shingle_words:
+            return {" ".join(words)}
+        return {" ".join(words[i:i + self.shingle_words]) for i in range(len(words) - self.shingle_words + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (mmh3.hash(shingle, signed=False) for shingle in self._shingles(text)),
+            dtype=np.uint64,
+        )
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        # 32 bits per value is plenty for equality tests and halves the memory held per chunk
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def is_duplicate(self, text: str) -> bool:
+        """
+        Checks `text` against every kept chunk and, if it is new, keeps it.
+        """
+        self.seen += 1
+        signature = self.signature(text)
+        keys = [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+        candidates = set()
+        for band, key in enumerate(keys):
+            candidates.update(self._buckets[band].get(key, ()))
+        for candidate in candidates:
+            if np.mean(self._signatures[candidate] == signature) >= self.threshold:
+                self.dropped += 1
+                return True
+
+        index = len(self._signatures)
+        self._signatures.append(signature)
+        for band, key in enumerate(keys):
+            self._buckets[band][key].append(index)
+        return False
+
+    def filter(self, chunks: Iterable) -> Iterator:
+        """
+        Yields the chunks (Documents or strings) that are not near-duplicates of an earlier one.
+        """
+        for chunk in chunks:
+            text = getattr(chunk, "page_content", chunk)
+            if not self.is_duplicate(text):
+                yield chunk
+
+
+def deduplicate_chunks(chunks: Iterable, threshold: float = DEDUP_THRESHOLD):
+    """
+    Wraps a chunk stream with a MinHashDeduplicator.
+
+    Returns:
+        (Iterator, MinHashDeduplicator | None): The filtered stream and the
+        deduplicator (for its seen/dropped counts); None when the threshold is 0.
+    """
+    if threshold <= 0:
+        return iter(chunks), None
+    deduplicator = MinHashDeduplicator(threshold)
+    return deduplicator.filter(chunks), deduplicator
@@ -1,13 +1,98 @@
-from langchain_community.document_loaders import DirectoryLoader, PyPDFLoader
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterator, Optional
 
-def document_loader():
-    loader = DirectoryLoader(
-        path='ReportGeneration\KnowledgeBase',
-        glob='*.pdf',
-        loader_cls=PyPDFLoader
-    )
+from langchain_community.document_loaders import Docx2txtLoader, PyPDFLoader, TextLoader
+from langchain_core.documents import Document
+
+# Resolve the knowledge base next to this package so it works from any working directory and OS
+KNOWLEDGE_BASE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'KnowledgeBase'
+)
+
+LOADERS = {
+    '.pdf': PyPDFLoader,
+    '.docx': Docx2txtLoader,
+    '.txt': lambda path: TextLoader(path, autodetect_encoding=True),
+}
+
+
+def find_documents(path: str = KNOWLEDGE_BASE_DIR) -> list[str]:
+    """
+    Recursively lists every supported file under `path`, in a stable order.
+    """
+    found = []
+    for root, _, files in os.walk(path):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in LOADERS:
+                found.append(os.path.join(root, name))
+    return sorted(found)
 
-    docs = loader.load()
 
+def relative_source(file_path: str, root: str = KNOWLEDGE_BASE_DIR) -> str:
+    """
+    `file_path` relative to the knowledge base root, with "/" separators, so the
+    same file gets the same source (and chunk IDs) on every checkout and OS.
+    """
+    return os.path.relpath(os.path.abspath(file_path), os.path.abspath(root)).replace(os.sep, "/")
+
+
+def _load_file(file_path: str, root: str = KNOWLEDGE_BASE_DIR) -> list[Document]:
+    # Runs in a worker process: must stay a picklable module-level function
+    loader_cls = LOADERS[os.path.splitext(file_path)[1].lower()]
+    docs = loader_cls(file_path).load()
+    source = relative_source(file_path, root)
+    for doc in docs:
+        doc.metadata["source"] = source
     return docs
 
+
+def iter_documents(path: str = KNOWLEDGE_BASE_DIR, max_workers: Optional[int] = None) -> Iterator[Document]:
+    """
+    Loads PDF, DOCX and TXT files in parallel across a process pool.
+
+    Documents are yielded as soon as their file finishes, and at most
+    2 * max_workers files are in flight, so memory stays bounded however
+    large the knowledge base is.
+
+    Args:
+        path (str): Directory to walk recursively.
+        max_workers (int, optional): Worker processes (defaults to the CPU count).
+
+    Yields:
+        Document: One Document per PDF page, or per DOCX/TXT file, whose
+            'source' is the file's path relative to `path`.
+    """
+    files = find_documents(path)
+    if not files:
+        print(f"⚠️ No supported documents found in {path}")
+        return
+
+    max_workers = max_workers or os.cpu_count() or 1
+    pending_files = iter(files)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = {}
+        for file_path in pending_files:
+            in_flight[executor.submit(_load_file, file_path, path)] = file_path
+            if len(in_flight) >= 2 * max_workers:
+                break
+
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                file_path = in_flight.pop(future)
+                try:
+                    yield from future.result()
+                except Exception as e:
+                    print(f"⚠️ Error loading {file_path}: {e}")
+
+                next_file = next(pending_files, None)
+                if next_file:
+                    in_flight[executor.submit(_load_file, next_file, path)] = next_file
+
+
+def document_loader():
+    docs = list(iter_documents())
+
+    return docs
@@ -3,6 +3,9 @@ import chromadb
 from dotenv import load_dotenv
 from google import genai  # ✅ Using Google’s official genai client
 
+from outbound_scheduler import Priority
+from resilience import resilient_call
+
 # Load environment variables
 load_dotenv()
 
@@ -13,6 +16,9 @@ if not api_key:
 # Initialize Google GenAI client
 client = genai.Client(api_key=api_key)
 
+# ChromaDB collections, opened once per (db_path, collection_name) and reused across batches
+_collections = {}
+
 def embedding_generation(chunks):
     """
     Generates embeddings for a list of text chunks using Google Gemini Embedding API.
@@ -30,7 +36,10 @@ def embedding_generation(chunks):
     embeddings = []
     for chunk in chunks:
         try:
-            result = client.models.embed_content(
+            result = resilient_call(
+                "gemini", client.models.embed_content,
+                hedge=True,  # embeddings are deterministic and cheap to duplicate
+                priority=Priority.BATCH,
                 model="models/embedding-001",
                 contents=chunk
             )
@@ -46,19 +55,35 @@ def embedding_generation(chunks):
     return embeddings
 
 
+def _get_collection(collection_name, db_path):
+    key = (db_path, collection_name)
+    if key not in _collections:
+        # Initialize persistent ChromaDB client and get or create collection
+        chroma_client = chromadb.PersistentClient(path=db_path)
+        _collections[key] = chroma_client.get_or_create_collection(name=collection_name)
+    return _collections[key]
+
+
 def store_embeddings_in_chromadb(
     embeddings, chunks,
     collection_name="my_document_embeddings",
-    db_path="./chroma_db"
+    db_path="./chroma_db",
+    metadatas=None,
+    ids=None
 ):
     """
     Stores text chunks and their embeddings in a ChromaDB collection.
 
+    Can be called once per batch: when `ids` are given, chunks are upserted,
+    so re-running ingestion updates existing entries instead of duplicating them.
+
     Args:
         embeddings (list[list[float]]): List of embedding vectors.
         chunks (list[str]): List of corresponding text chunks.
         collection_name (str): ChromaDB collection name.
         db_path (str): Directory path to store ChromaDB data.
+        metadatas (list[dict], optional): Per-chunk metadata such as 'source' and 'page'.
+        ids (list[str], optional): Stable per-chunk IDs.
     """
     if not embeddings or not chunks:
         print("⚠️ No embeddings or chunks to store.")
@@ -68,24 +93,27 @@ def store_embeddings_in_chromadb(
         raise ValueError("❌ Number of embeddings must match number of chunks.")
 
     try:
-        # Initialize persistent ChromaDB client
-        client = chromadb.PersistentClient(path=db_path)
+        collection = _get_collection(collection_name, db_path)
 
-        # Get or create collection
-        collection = client.get_or_create_collection(name=collection_name)
+        if ids is None:
+            # No stable IDs supplied: fall back to positional ones
+            ids = [f"chunk_{i}" for i in range(len(chunks))]
 
-        # Generate unique IDs for each chunk
-        ids = [f"chunk_{i}" for i in range(len(chunks))]
+        if metadatas is not None:
+            # ChromaDB only accepts scalar, non-null metadata values
+            metadatas = [
+                {k: v for k, v in metadata.items() if isinstance(v, (str, int, float, bool))}
+                for metadata in metadatas
+            ]
 
-        # Add to ChromaDB
-        collection.add(
+        collection.upsert(
             embeddings=embeddings,
             documents=chunks,
+            metadatas=metadatas,
             ids=ids
         )
 
         print(f"✅ Successfully stored {len(chunks)} chunks in ChromaDB collection '{collection_name}'.")
-        print(f"📂 Database path: {db_path}")
 
     except Exception as e:
         print(f"❌ Error storing embeddings in ChromaDB: {e}")
@@ -3,6 +3,10 @@ from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 from langchain.schema import HumanMessage, SystemMessage
 
+from outbound_scheduler import Priority, estimate_tokens
+from resilience import FALLBACK_CHAT_MODEL, resilient_call
+from telemetry import stage
+
 # Load environment variables
 load_dotenv()
 
@@ -20,6 +24,11 @@ class QueryGenerator:
             model_name="groq/compound",  # or "mixtral-8x7b" if you prefer
             api_key=groq_api_key
         )
+        self.fallback_model = ChatGroq(
+            temperature=0.7,
+            model_name=FALLBACK_CHAT_MODEL,
+            api_key=groq_api_key
+        ) if FALLBACK_CHAT_MODEL else None
 
     def generate(self, short_prompt: str) -> str:
         """
@@ -60,7 +69,16 @@ Requirements:
 """
 
         try:
-            response = self.model.invoke([system_message, HumanMessage(content=user_prompt)])
+            with stage("groq.expand_query"):
+                messages = [system_message, HumanMessage(content=user_prompt)]
+                response = resilient_call(
+                    "groq", self.model.invoke, messages,
+                    fallback=self.fallback_model.invoke if self.fallback_model else None,
+                    priority=Priority.REPORT,
+                    rate_model=self.model.model_name,
+                    fallback_rate_model=FALLBACK_CHAT_MODEL,
+                    rate_tokens=estimate_tokens(messages) + 512
+                )
             return response.content.strip()
         except Exception as e:
             print(f"❌ Error generating query with ChatGroq: {e}")
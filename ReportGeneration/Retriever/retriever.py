@@ -3,6 +3,11 @@ import psycopg2
 from dotenv import load_dotenv
 from google import genai  # ✅ use Google GenAI for embeddings
 
+from ReportGeneration.VectorStore.pgvector_store import to_vector_literal
+from outbound_scheduler import Priority
+from resilience import resilient_call
+from telemetry import stage
+
 # Load environment variables
 load_dotenv()
 
@@ -14,6 +19,24 @@ if not api_key:
 # Initialize Google GenAI client
 client = genai.Client(api_key=api_key)
 
+# Optional ANN search-time knobs (recall vs. latency) for the index built by PgVectorStore
+hnsw_ef_search = os.getenv("PGVECTOR_HNSW_EF_SEARCH")
+ivfflat_probes = os.getenv("PGVECTOR_IVFFLAT_PROBES")
+
+def rows_to_results(rows) -> list[dict]:
+    """
+    Convert (id, text, source, page) rows into result dicts.
+    """
+    return [
+        {
+            "id": row[0],
+            "text": row[1],
+            "source": row[2],
+            "page": row[3],
+        }
+        for row in rows
+    ]
+
 class ContextRetriever:
     def __init__(self):
         self.db_params = {
@@ -29,10 +52,14 @@ class ContextRetriever:
         Generate embedding for a query using Google Gemini Embedding API.
         """
         try:
-            result = client.models.embed_content(
-                model="models/embedding-001",
-                contents=query
-            )
+            with stage("gemini.embed_query"):
+                result = resilient_call(
+                    "gemini", client.models.embed_content,
+                    hedge=True,  # embeddings are deterministic and cheap to duplicate
+                    priority=Priority.REPORT,
+                    model="models/embedding-001",
+                    contents=query
+                )
             if result and hasattr(result, "embeddings"):
                 return result.embeddings[0].values
             print("⚠️ Unexpected embedding format from Gemini API.")
@@ -46,7 +73,8 @@ class ContextRetriever:
         Establish connection to Neon PostgreSQL database.
         """
         try:
-            return psycopg2.connect(**self.db_params)
+            with stage("pgvector.connect"):
+                return psycopg2.connect(**self.db_params)
         except Exception as e:
             print(f"❌ Error connecting to Neon DB: {e}")
             return None
@@ -68,28 +96,26 @@ class ContextRetriever:
             cursor = conn.cursor()
 
             # Convert vector to pgvector-compatible string
-            vector_str = "[" + ", ".join(f"{x:.6f}" for x in query_vector) + "]"
+            vector_str = to_vector_literal(query_vector)
+
+            if hnsw_ef_search:
+                cursor.execute("SET hnsw.ef_search = %s;", (int(hnsw_ef_search),))
+            if ivfflat_probes:
+                cursor.execute("SET ivfflat.probes = %s;", (int(ivfflat_probes),))
 
-            cursor.execute("""
-                SELECT id, text, source, page
-                FROM pdf_embeddings
-                ORDER BY embedding <-> %s::vector
-                LIMIT %s;
-            """, (vector_str, top_k))
+            with stage("pgvector.query", top_k=top_k):
+                cursor.execute("""
+                    SELECT id, text, source, page
+                    FROM pdf_embeddings
+                    ORDER BY embedding <-> %s::vector
+                    LIMIT %s;
+                """, (vector_str, top_k))
 
-            rows = cursor.fetchall()
+                rows = cursor.fetchall()
             cursor.close()
             conn.close()
 
-            results = [
-                {
-                    "id": row[0],
-                    "text": row[1],
-                    "source": row[2],
-                    "page": row[3],
-                }
-                for row in rows
-            ]
+            results = rows_to_results(rows)
 
             print(f"✅ Retrieved {len(results)} relevant results from Neon DB.")
             return results
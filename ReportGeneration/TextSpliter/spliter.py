@@ -1,10 +1,81 @@
+import hashlib
+from itertools import islice
+from typing import Iterable, Iterator
+
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document # Import Document type for clarity
 
+CHUNK_SIZE = 2048
+CHUNK_OVERLAP = 512
+
+
+def chunk_id(source: str, page, index: int) -> str:
+    """
+    Stable ID for a chunk, so re-ingesting the same file overwrites instead of duplicating.
+
+    `source` should be machine-independent (the loader gives paths relative to
+    the knowledge base); separators are normalized so Windows and Linux agree.
+    """
+    source = str(source).replace("\\", "/")
+    return hashlib.sha1(f"{source}|{page}|{index}".encode("utf-8")).hexdigest()
+
+
+def split_documents_stream(
+    docs: Iterable[Document],
+    chunk_size: int = CHUNK_SIZE,
+    chunk_overlap: int = CHUNK_OVERLAP,
+) -> Iterator[Document]:
+    """
+    Lazily splits Documents one at a time, keeping each chunk's source and page.
+
+    Only the current document is held in memory, so `docs` can be a generator
+    over an arbitrarily large knowledge base.
+
+    Args:
+        docs (Iterable[Document]): Documents with a 'page_content' attribute and
+            optional 'source' / 'page' metadata (as set by DocumentLoader.loader).
+        chunk_size (int): Maximum characters per chunk.
+        chunk_overlap (int): Characters shared between neighbouring chunks.
+
+    Yields:
+        Document: A chunk whose metadata holds 'source', 'page', 'chunk_index' and 'id'.
+    """
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+    )
+
+    for doc in docs:
+        source = doc.metadata.get("source", "unknown")
+        page = doc.metadata.get("page")
+        for index, text in enumerate(splitter.split_text(doc.page_content)):
+            metadata = {
+                **doc.metadata,
+                "source": source,
+                "page": page,
+                "chunk_index": index,
+                "id": chunk_id(source, page, index),
+            }
+            yield Document(page_content=text, metadata=metadata)
+
+
+def batched(iterable: Iterable, size: int) -> Iterator[list]:
+    """
+    Groups an iterable into lists of at most `size` items.
+    """
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
 def text_spliting(docs: list[Document]) -> list[str]:
     """
     Splits a list of Langchain Document objects into smaller text chunks.
 
+    Kept for callers that only need the text; new code should prefer
+    `split_documents_stream`, which keeps metadata and does not materialize
+    the whole corpus.
+
     Args:
         docs (list[Document]): A list of Langchain Document objects, each with a 'page_content' attribute.
 
@@ -15,16 +86,4 @@ def text_spliting(docs: list[Document]) -> list[str]:
         print("No documents provided for splitting.")
         return []
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=2048,
-        chunk_overlap=512,
-    )
-
-    # Extract page_content from each Document object and join them into a single string
-    # before passing to split_text. Use a suitable separator like double newline.
-    all_text = "\n\n".join([doc.page_content for doc in docs])
-
-    # Perform the split on the combined text
-    chunks = splitter.split_text(all_text)
-
-    return chunks
\ No newline at end of file
+    return [chunk.page_content for chunk in split_documents_stream(docs)]
@@ -0,0 +1,269 @@
+import io
+import os
+import re
+import struct
+
+import numpy as np
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Index configuration (see pgvector docs for tuning guidance)
+INDEX_METHOD = os.getenv("PGVECTOR_INDEX", "hnsw")  # hnsw | ivfflat | none
+HNSW_M = int(os.getenv("PGVECTOR_HNSW_M", "16"))
+HNSW_EF_CONSTRUCTION = int(os.getenv("PGVECTOR_HNSW_EF_CONSTRUCTION", "64"))
+IVFFLAT_LISTS = os.getenv("PGVECTOR_IVFFLAT_LISTS")  # unset: rows / 1000, at least 10
+MAINTENANCE_WORK_MEM = os.getenv("PGVECTOR_MAINTENANCE_WORK_MEM")  # e.g. "1GB" to speed up index builds
+
+# ContextRetriever orders by `embedding <-> query`, i.e. L2 distance
+DISTANCE_OPCLASS = "vector_l2_ops"
+
+_COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+_COPY_TRAILER = struct.pack("!h", -1)
+_NULL = struct.pack("!i", -1)
+
+
+def _text_field(value) -> bytes:
+    if value is None:
+        return _NULL
+    # Postgres text cannot contain NUL bytes, which PDF extraction sometimes produces
+    data = str(value).replace("\x00", "").encode("utf-8")
+    return struct.pack("!i", len(data)) + data
+
+
+def _int_field(value) -> bytes:
+    if value is None:
+        return _NULL
+    return struct.pack("!ii", 4, int(value))
+
+
+def _vector_field(values) -> bytes:
+    # pgvector binary format: int16 dimensions, int16 unused, float4[dimensions] (all big-endian)
+    array = np.asarray(values, dtype=">f4")
+    data = struct.pack("!hh", array.size, 0) + array.tobytes()
+    return struct.pack("!i", len(data)) + data
+
+
+def to_vector_literal(vector) -> str:
+    """
+    Convert an embedding to a pgvector-compatible string, e.g. "[0.100000, -0.200000]".
+    """
+    return "[" + ", ".join(f"{x:.6f}" for x in vector) + "]"
+
+
+def _index_definition(indexdef: str) -> dict:
+    """
+    Method, operator class and WITH parameters of an index, parsed from pg_indexes.indexdef.
+    """
+    method = re.search(r"USING\s+(\w+)", indexdef or "", re.IGNORECASE)
+    opclass = re.search(r"\(\s*\w+\s+(\w+)\s*\)", indexdef or "")
+    params = re.search(r"WITH\s*\((.*)\)", indexdef or "", re.IGNORECASE)
+    return {
+        "method": method.group(1).lower() if method else None,
+        "opclass": opclass.group(1) if opclass else None,
+        "params": {
+            key.lower(): int(value)
+            for key, value in re.findall(r"(\w+)\s*=\s*'?(\d+)'?", params.group(1) if params else "")
+        },
+    }
+
+
+def encode_copy_rows(rows) -> io.BytesIO:
+    """
+    Encodes (id, text, source, page, embedding) tuples as a binary COPY stream.
+    """
+    buffer = io.BytesIO()
+    buffer.write(_COPY_HEADER)
+    for row_id, text, source, page, embedding in rows:
+        buffer.write(struct.pack("!h", 5))
+        buffer.write(_text_field(row_id))
+        buffer.write(_text_field(text))
+        buffer.write(_text_field(source))
+        buffer.write(_int_field(page))
+        buffer.write(_vector_field(embedding))
+    buffer.write(_COPY_TRAILER)
+    buffer.seek(0)
+    return buffer
+
+
+class PgVectorStore:
+    """
+    Bulk ingestion sink for the pgvector table read by ContextRetriever.
+    """
+
+    def __init__(self, dimensions: int = 768, table: str = "pdf_embeddings", db_params: dict = None):
+        if not re.fullmatch(r"[A-Za-z_][A-Za-z0-9_]*", table):
+            raise ValueError(f"❌ Invalid table name: {table}")
+
+        self.dimensions = dimensions
+        self.table = table
+        self.db_params = db_params or {
+            "dbname": os.getenv("PG_DB"),
+            "user": os.getenv("PG_USER"),
+            "password": os.getenv("PG_PASSWORD"),
+            "host": os.getenv("PG_HOST"),
+            "port": os.getenv("PG_PORT"),
+        }
+        self.conn = None
+
+    def __enter__(self):
+        self.conn = psycopg2.connect(**self.db_params)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.conn:
+            if exc_type:
+                self.conn.rollback()
+            self.conn.close()
+            self.conn = None
+        return False
+
+    def ensure_schema(self):
+        """
+        Creates the pgvector extension and the embeddings table if missing.
+        """
+        with self.conn.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+            cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    id TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    source TEXT,
+                    page INTEGER,
+                    embedding vector({self.dimensions}) NOT NULL
+                );
+            """)
+        self.conn.commit()
+
+    def write_batch(self, ids, texts, metadatas, embeddings) -> int:
+        """
+        Bulk-loads a batch with binary COPY into a staging table, then upserts by ID.
+
+        Args:
+            ids (list[str]): Stable chunk IDs.
+            texts (list[str]): Chunk texts.
+            metadatas (list[dict]): Per-chunk metadata with 'source' and 'page'.
+            embeddings (list[list[float]]): Embedding vectors.
+
+        Returns:
+            int: Number of rows written (vectors with the wrong dimension are skipped).
+        """
+        rows = {}
+        for row_id, text, metadata, embedding in zip(ids, texts, metadatas, embeddings):
+            if embedding is None or len(embedding) != self.dimensions:
+                print(f"⚠️ Skipping chunk {row_id}: expected {self.dimensions} dimensions.")
+                continue
+            # Last write wins if the same ID appears twice in one batch
+            rows[row_id] = (row_id, text, metadata.get("source"), metadata.get("page"), embedding)
+
+        if not rows:
+            return 0
+
+        stage = f"{self.table}_stage"
+        with self.conn.cursor() as cursor:
+            cursor.execute(f"""
+                CREATE TEMP TABLE IF NOT EXISTS {stage} (
+                    id TEXT, text TEXT, source TEXT, page INTEGER, embedding vector({self.dimensions})
+                ) ON COMMIT DELETE ROWS;
+            """)
+            cursor.copy_expert(
+                f"COPY {stage} (id, text, source, page, embedding) FROM STDIN WITH (FORMAT binary)",
+                encode_copy_rows(rows.values()),
+            )
+            cursor.execute(f"""
+                INSERT INTO {self.table} (id, text, source, page, embedding)
+                SELECT id, text, source, page, embedding FROM {stage}
+                ON CONFLICT (id) DO UPDATE SET
+                    text = EXCLUDED.text,
+                    source = EXCLUDED.source,
+                    page = EXCLUDED.page,
+                    embedding = EXCLUDED.embedding;
+            """)
+        self.conn.commit()
+        return len(rows)
+
+    def _row_count(self, cursor) -> int:
+        cursor.execute(f"SELECT count(*) FROM {self.table};")
+        return cursor.fetchone()[0]
+
+    def _existing_indexes(self, cursor) -> dict:
+        cursor.execute(
+            "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s AND indexdef ~* 'USING (hnsw|ivfflat)';",
+            (self.table,),
+        )
+        return dict(cursor.fetchall())
+
+    def ensure_index(self, method: str = INDEX_METHOD):
+        """
+        Creates or refreshes the ANN index on the embedding column and analyzes the table.
+
+        - hnsw: built with HNSW_M / HNSW_EF_CONSTRUCTION and rebuilt only when those
+          settings change; pgvector keeps it up to date on insert.
+        - ivfflat: lists come from PGVECTOR_IVFFLAT_LISTS (rebuilt whenever it differs
+          from the index) or from the row count (rebuilt once the table has grown or
+          shrunk enough for the current lists to be off by 2x).
+        - none: drops any ANN index (exact sequential scan).
+
+        An existing index with the wrong method or operator class is rebuilt as well.
+
+        Call this after bulk loading: building once is much faster than
+        maintaining the index row by row.
+        """
+        method = (method or "none").lower()
+        if method not in ("hnsw", "ivfflat", "none"):
+            raise ValueError(f"❌ Unknown index method: {method}")
+
+        index_name = f"{self.table}_embedding_{method}_idx"
+
+        with self.conn.cursor() as cursor:
+            if MAINTENANCE_WORK_MEM:
+                cursor.execute("SET maintenance_work_mem = %s;", (MAINTENANCE_WORK_MEM,))
+
+            existing = self._existing_indexes(cursor)
+            for name in existing:
+                if name != index_name:
+                    # Switching methods (or disabling the index)
+                    cursor.execute(f"DROP INDEX IF EXISTS {name};")
+
+            current = _index_definition(existing.get(index_name))
+            if index_name in existing and (current["method"] != method or current["opclass"] != DISTANCE_OPCLASS):
+                print(f"🔧 Index {index_name} is not {method} with {DISTANCE_OPCLASS}; rebuilding.")
+                cursor.execute(f"DROP INDEX IF EXISTS {index_name};")
+                existing.pop(index_name)
+                current = _index_definition(None)
+
+            wanted_hnsw = {"m": HNSW_M, "ef_construction": HNSW_EF_CONSTRUCTION}
+            if method == "hnsw" and (
+                index_name not in existing
+                or any(current["params"].get(key) != value for key, value in wanted_hnsw.items())
+            ):
+                print(f"🔧 Building HNSW index (m={HNSW_M}, ef_construction={HNSW_EF_CONSTRUCTION})...")
+                cursor.execute(f"DROP INDEX IF EXISTS {index_name};")
+                cursor.execute(f"""
+                    CREATE INDEX {index_name} ON {self.table}
+                    USING hnsw (embedding {DISTANCE_OPCLASS})
+                    WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION});
+                """)
+
+            elif method == "ivfflat":
+                lists = int(IVFFLAT_LISTS) if IVFFLAT_LISTS else max(10, self._row_count(cursor) // 1000)
+                current_lists = current["params"].get("lists")
+                # The 2x slack only absorbs row-count drift; an explicit setting is exact
+                if IVFFLAT_LISTS:
+                    stale = current_lists != lists
+                else:
+                    stale = current_lists is None or not (lists / 2 <= current_lists <= lists * 2)
+
+                if stale:
+                    print(f"🔧 Building IVFFlat index (lists={lists})...")
+                    cursor.execute(f"DROP INDEX IF EXISTS {index_name};")
+                    cursor.execute(f"""
+                        CREATE INDEX {index_name} ON {self.table}
+                        USING ivfflat (embedding {DISTANCE_OPCLASS})
+                        WITH (lists = {lists});
+                    """)
+
+            cursor.execute(f"ANALYZE {self.table};")
+        self.conn.commit()
@@ -0,0 +1,148 @@
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import List, Optional
+
+from dotenv import load_dotenv
+from langchain_groq import ChatGroq
+from langchain.schema import HumanMessage, SystemMessage
+from pydantic import BaseModel
+
+import shared_state
+from outbound_scheduler import Priority, estimate_tokens
+from resilience import FALLBACK_CHAT_MODEL, resilient_call
+from telemetry import stage
+
+# Load environment variables
+load_dotenv()
+
+groq_api_key = os.getenv("GROQ_API_KEY")
+ANSWER_SUMMARY_MODEL = os.getenv("ANSWER_SUMMARY_MODEL", "groq/compound")
+# How long /generate-report waits for summaries still in flight before condensing locally
+SUMMARY_WAIT_S = float(os.getenv("ANSWER_SUMMARY_WAIT_S", "30"))
+# Length of the transcript excerpt kept by the local fallback summary
+LOCAL_KEY_POINT_CHARS = 300
+
+SENTENCE_END = re.compile(r"[.!?](?=\s|$)")
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("ANSWER_SUMMARY_WORKERS", "2")), thread_name_prefix="answer-summary")
+
+
+# Pydantic Schema
+class AnswerSummary(BaseModel):
+    question: Optional[str] = None
+    key_points: List[str]
+    strengths: List[str]
+    weaknesses: List[str]
+    score: Optional[float] = None
+
+
+system_instruction_text = (
+    "You condense one answer from a mock technical interview into a short structured summary "
+    "that a later step will combine with the other answers into a final report. "
+    "Be factual and brief: at most 3 items per list, each under 20 words. "
+    "Return only JSON in this schema:\n"
+    "{'key_points': [str], 'strengths': [str], 'weaknesses': [str], 'score': float (0-10)}"
+)
+
+
+def _average_score(analysis: dict) -> Optional[float]:
+    scores = [item.get("score") for item in (analysis or {}).get("evaluation", []) if isinstance(item.get("score"), (int, float))]
+    return round(sum(scores) / len(scores), 1) if scores else None
+
+
+def trim_to_sentence(text: str, limit: int = LOCAL_KEY_POINT_CHARS) -> str:
+    """
+    Cuts `text` to at most `limit` characters at the last sentence end, or at the
+    last word boundary (with an ellipsis) when no sentence ends early enough.
+    """
+    text = (text or "").strip()
+    if len(text) <= limit:
+        return text
+    head = text[:limit + 1]
+    ends = [m.end() for m in SENTENCE_END.finditer(head)]
+    if ends and ends[-1] >= limit // 3:
+        return head[:ends[-1]]
+    cut = head[:limit].rsplit(" ", 1)[0] if " " in head[:limit] else head[:limit - 1]
+    return cut.rstrip(" ,;:") + "…"
+
+
+def condense_locally(question: Optional[str], transcript: str, analysis: dict) -> dict:
+    """
+    LLM-free summary built from the per-answer evaluation, used when the LLM summary is unavailable.
+    """
+    analysis = analysis or {}
+    return AnswerSummary(
+        question=question,
+        key_points=[trim_to_sentence(transcript)],
+        strengths=[analysis["overall_summary"]] if analysis.get("overall_summary") else [],
+        weaknesses=list(analysis.get("actionable_suggestions", []))[:3],
+        score=_average_score(analysis),
+    ).model_dump()
+
+
+def summarize_answer(question: Optional[str], transcript: str, analysis: dict) -> dict:
+    """
+    Map step: condenses one answer (transcript + evaluation) into an AnswerSummary dict.
+    """
+    model = ChatGroq(temperature=0.2, model_name=ANSWER_SUMMARY_MODEL, groq_api_key=groq_api_key, max_tokens=400)
+    fallback_model = ChatGroq(
+        temperature=0.2, model_name=FALLBACK_CHAT_MODEL, groq_api_key=groq_api_key, max_tokens=400
+    ) if FALLBACK_CHAT_MODEL else None
+
+    human_prompt = (
+        f"Condense this interview answer.\n\n"
+        f"Question: {question or 'Unknown'}\n\n"
+        f"Transcript:\n{transcript}\n\n"
+        f"Evaluation:\n{json.dumps(analysis, ensure_ascii=False)}"
+    )
+    messages = [SystemMessage(content=system_instruction_text), HumanMessage(content=human_prompt)]
+
+    try:
+        with stage("groq.summarize_answer"):
+            response = resilient_call(
+                "groq", model.invoke, messages,
+                fallback=fallback_model.invoke if fallback_model else None,
+                priority=Priority.REPORT,
+                rate_model=ANSWER_SUMMARY_MODEL,
+                fallback_rate_model=FALLBACK_CHAT_MODEL,
+                rate_tokens=estimate_tokens(messages) + 400
+            )
+        text_output = response.content.strip()
+        json_str = text_output[text_output.find("{"): text_output.rfind("}") + 1]
+        summary = AnswerSummary(**json.loads(json_str))
+        summary.question = question
+        return summary.model_dump()
+    except Exception as e:
+        print(f"⚠️ Answer summary failed, condensing locally: {e}")
+        return condense_locally(question, transcript, analysis)
+
+
+def schedule_answer_summary(answer_id: str, question: Optional[str], transcript: str, analysis: dict):
+    """
+    Starts summarizing an evaluated answer in the background, keyed by `answer_id`.
+    """
+    future = _executor.submit(summarize_answer, question, transcript, analysis)
+    shared_state.answer_summaries[answer_id] = future
+
+
+def collect_answer_summaries(timeout: float = SUMMARY_WAIT_S) -> list:
+    """
+    Reduce-step input: every answer's summary, in answer order.
+
+    Answers whose summary is not ready within `timeout` are condensed locally
+    from their stored transcript and evaluation instead.
+    """
+    futures = dict(shared_state.answer_summaries)
+    wait(futures.values(), timeout=timeout)
+
+    summaries = []
+    for answer_id in sorted(shared_state.stored_audio_transcripts):
+        entry = shared_state.stored_audio_transcripts[answer_id]
+        future = futures.get(answer_id)
+        if future is not None and future.done() and not future.exception():
+            summaries.append(future.result())
+        else:
+            summaries.append(condense_locally(entry.get("question"), entry.get("transcription"), entry.get("analysis")))
+    return summaries
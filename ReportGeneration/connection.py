@@ -5,7 +5,11 @@ from langchain_groq import ChatGroq
 
 from ReportGeneration.Retriever.retriever import ContextRetriever
 from ReportGeneration.Query.query_generation import QueryGenerator
-from shared_state import stored_job_info, stored_audio_transcripts, stored_video_analysis, questions_generated
+from ReportGeneration.answer_summary import collect_answer_summaries
+import shared_state
+from outbound_scheduler import Priority, estimate_tokens
+from resilience import FALLBACK_CHAT_MODEL, resilient_call
+from telemetry import stage
 
 # Load environment variables
 load_dotenv()
@@ -18,6 +22,14 @@ llm = ChatGroq(
     max_tokens=2048
 )
 
+# Used when the primary model times out, errors, or its circuit breaker is open
+fallback_llm = ChatGroq(
+    model=FALLBACK_CHAT_MODEL,
+    api_key=os.getenv("GROQ_API_KEY"),
+    temperature=0.4,
+    max_tokens=2048
+) if FALLBACK_CHAT_MODEL else None
+
 # --- Main System Instruction ---
 system_instruction_text = """
 You are an expert interview analyst AI.
@@ -27,7 +39,7 @@ You will use:
 - Retrieved knowledge base context (technical and behavioral interview insights)
 - Job information
 - Questions asked
-- Audio transcript analysis
+- Per-answer summaries (key points, strengths, weaknesses, score), condensed from each transcript and its evaluation
 - Video emotion analysis
 
 Output Format (strict JSON):
@@ -46,6 +58,22 @@ Rules:
 - Return JSON only, no extra text.
 """
 
+def format_context_chunks(context_chunks: list[dict]) -> str:
+    return "\n\n".join(
+        [f"Source: {chunk['source']} | Page: {chunk['page']}\n{chunk['text']}" for chunk in context_chunks]
+    )
+
+def parse_report_json(text_output: str) -> dict:
+    """
+    Parse the model's JSON report, tolerating extra text around the JSON object.
+    """
+    try:
+        return json.loads(text_output)
+    except json.JSONDecodeError:
+        # Handle cases where model adds extra text
+        json_str = text_output[text_output.find("{"): text_output.rfind("}") + 1]
+        return json.loads(json_str)
+
 # --- Function to Generate Interview Report ---
 def generate_interview_report():
     try:
@@ -57,11 +85,16 @@ def generate_interview_report():
         retriever = ContextRetriever()
         context_chunks = retriever.retrieve(expanded_query)
 
-        formatted_chunks = "\n\n".join(
-            [f"Source: {chunk['source']} | Page: {chunk['page']}\n{chunk['text']}" for chunk in context_chunks]
-        )
+        formatted_chunks = format_context_chunks(context_chunks)
+
+        # Step 3: Reduce over the per-answer summaries precomputed after each /upload,
+        # so the prompt stays roughly the same size however many answers there were
+        answer_summaries = collect_answer_summaries()
+
+        # The resume was only needed for question generation
+        job_info = {k: v for k, v in shared_state.stored_job_info.items() if k != "resume_text_content"}
 
-        # Step 3: Construct final prompt
+        # Step 4: Construct final prompt
         prompt = f"""
 {system_instruction_text}
 
@@ -69,31 +102,34 @@ def generate_interview_report():
 {formatted_chunks}
 
 === Job Info ===
-{stored_job_info}
+{json.dumps(job_info, ensure_ascii=False)}
 
 === Questions Asked ===
-{questions_generated}
+{json.dumps(shared_state.questions_generated.get("questions", []), ensure_ascii=False)}
 
-=== Audio Transcript ===
-{stored_audio_transcripts}
+=== Answer Summaries ===
+{json.dumps(answer_summaries, ensure_ascii=False)}
 
 === Video Emotion Analysis ===
-{stored_video_analysis}
+{json.dumps(shared_state.stored_video_analysis, ensure_ascii=False)}
 
 Now generate the full JSON report strictly following the schema above.
 """
 
-        # Step 4: Generate response using ChatGroq
-        response = llm.invoke(prompt)
+        # Step 5: Generate response using ChatGroq
+        with stage("groq.generate_report", prompt_chars=len(prompt)):
+            response = resilient_call(
+                "groq", llm.invoke, prompt,
+                fallback=fallback_llm.invoke if fallback_llm else None,
+                priority=Priority.REPORT,
+                rate_model=llm.model_name,
+                fallback_rate_model=FALLBACK_CHAT_MODEL,
+                rate_tokens=estimate_tokens(prompt) + 2048
+            )
         text_output = response.content.strip()
 
-        # Step 5: Try to parse JSON
-        try:
-            return json.loads(text_output)
-        except json.JSONDecodeError:
-            # Handle cases where model adds extra text
-            json_str = text_output[text_output.find("{"): text_output.rfind("}") + 1]
-            return json.loads(json_str)
+        # Step 6: Try to parse JSON
+        return parse_report_json(text_output)
 
     except Exception as e:
         print(f"❌ Error generating interview report: {e}")
@@ -1,35 +1,82 @@
+import os
+import sys
+
+# Make the repository root importable (shared resilience/telemetry modules) when run as a script
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 # Import functions from individual modules
-from DocumentLoader.loader import document_loader
-from TextSpliter.spliter import text_spliting
+from DocumentLoader.loader import iter_documents
+from TextSpliter.spliter import split_documents_stream, batched
 from EmbeddingGeneration.generator import embedding_generation,store_embeddings_in_chromadb
+from VectorStore.pgvector_store import PgVectorStore
+from Deduplication.minhash import deduplicate_chunks
+
+# Chunks embedded and stored per round trip; peak memory is bounded by this, not the corpus size
+BATCH_SIZE = 64
+
+# "pgvector" fills the pdf_embeddings table read by ContextRetriever; "chroma" keeps the local ChromaDB store
+INGESTION_SINK = os.getenv("INGESTION_SINK", "pgvector")
 
 
 def main():
     
     print("--- Starting Document Processing Pipeline ---")
 
-    # Step 1: Load documents
-    loaded_documents = document_loader()
-    if not loaded_documents:
-        print("No documents loaded. Pipeline halted.")
-        return
+    if INGESTION_SINK == "pgvector":
+        with PgVectorStore() as store:
+            store.ensure_schema()
+            total_chunks = run_pipeline(store)
+            if total_chunks:
+                # Build or refresh the ANN index once, after the bulk load
+                store.ensure_index()
+    else:
+        total_chunks = run_pipeline()
 
-    # Step 2: Split documents into chunks
-    text_chunks = text_spliting(loaded_documents)
-    if not text_chunks:
+    if not total_chunks:
         print("No text chunks generated. Pipeline halted.")
         return
 
-    # Step 3: Generate embeddings for chunks
-    generated_embeddings = embedding_generation(text_chunks)
-    if not generated_embeddings:
-        print("No embeddings generated. Pipeline halted.")
-        return
+    print(f"--- Document Processing Pipeline Completed ({total_chunks} chunks) ---")
+
+
+def run_pipeline(store=None):
+    """
+    Streams documents through splitting and embedding into `store` (or ChromaDB), one batch at a time.
+    """
+
+    # Step 1: Load documents in parallel, streaming them out as each file finishes
+    loaded_documents = iter_documents()
+
+    # Step 2: Split documents into chunks, one document at a time
+    chunk_stream = split_documents_stream(loaded_documents)
+
+    # Step 2b: Drop near-duplicate chunks before paying to embed and index them
+    chunk_stream, deduplicator = deduplicate_chunks(chunk_stream)
+
+    total_chunks = 0
+    for batch in batched(chunk_stream, BATCH_SIZE):
+        texts = [chunk.page_content for chunk in batch]
+
+        # Step 3: Generate embeddings for this batch
+        generated_embeddings = embedding_generation(texts)
+        if not generated_embeddings:
+            print("No embeddings generated for batch. Skipping.")
+            continue
+
+        metadatas = [chunk.metadata for chunk in batch]
+        ids = [chunk.metadata["id"] for chunk in batch]
 
-    # Step 4: Store embeddings and chunks in ChromaDB
-    store_embeddings_in_chromadb(generated_embeddings, text_chunks)
+        # Step 4: Store embeddings, chunks and their metadata
+        if store:
+            total_chunks += store.write_batch(ids, texts, metadatas, generated_embeddings)
+        else:
+            store_embeddings_in_chromadb(generated_embeddings, texts, metadatas=metadatas, ids=ids)
+            total_chunks += len(batch)
 
-    print("--- Document Processing Pipeline Completed ---")
+    if deduplicator:
+        print(f"🧹 Dropped {deduplicator.dropped} of {deduplicator.seen} chunks as near-duplicates "
+              f"(threshold {deduplicator.threshold}).")
+    return total_chunks
 
 # Entry point for the script
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+import threading
+from collections import Counter, defaultdict
+from typing import Optional
+
+
+class EmotionAggregate:
+    """
+    Running per-session emotion statistics, folded in one video segment at a time.
+
+    Segments identified by (question_id, segment_index) are counted once: a
+    retried upload replaces the earlier result for that segment. A full
+    recording (see use_full_recording) replaces everything instead.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.segments = 0
+        self.total_frames = 0
+        self.frames_analyzed = 0
+        self.counts = Counter()
+        self.confidence_sums = defaultdict(float)
+        self.per_question = defaultdict(Counter)
+        self._folded = {}  # (question_id, segment_index) -> (total_frames, counts, confidence_sums)
+        self.full_recording = False
+
+    @staticmethod
+    def _tally(analysis: dict):
+        total_frames = analysis.get("total_frames") or 0
+        counts = Counter()
+        confidence_sums = defaultdict(float)
+        for frame in analysis.get("emotion_analysis") or []:
+            emotion = frame.get("emotion")
+            if not emotion:
+                continue  # frame-level error
+            counts[emotion] += 1
+            confidence_sums[emotion] += frame.get("confidence", 0.0)
+        return total_frames, counts, confidence_sums
+
+    def use_full_recording(self, analysis: dict):
+        """
+        Replaces all folded segments (and any earlier full recording) with one
+        process_video() result for the whole interview, which already contains
+        them. Segments uploaded afterwards are ignored by add().
+        """
+        tally = self._tally(analysis)
+        with self._lock:
+            self._reset()
+            self.full_recording = True
+            self.segments = 1
+            self._apply(None, *tally)
+
+    def add(self, analysis: dict, question_id: Optional[int] = None, segment_index: Optional[int] = None):
+        """
+        Folds one process_video() result into the running totals.
+
+        Args:
+            analysis (dict): The process_video() result.
+            question_id (int, optional): Question the segment was recorded for.
+            segment_index (int, optional): Position of the segment within the question;
+                when given, a repeat of the same segment replaces its earlier result.
+
+        Returns:
+            bool: False when the segment was ignored because a full recording is in use.
+        """
+        total_frames, counts, confidence_sums = self._tally(analysis)
+
+        key = (question_id, segment_index) if segment_index is not None else None
+        with self._lock:
+            if self.full_recording:
+                return False
+            previous = self._folded.pop(key, None) if key else None
+            if previous:
+                self._apply(question_id, *previous, sign=-1)
+            else:
+                self.segments += 1
+            self._apply(question_id, total_frames, counts, confidence_sums)
+            if key:
+                self._folded[key] = (total_frames, counts, confidence_sums)
+        return True
+
+    def _apply(self, question_id, total_frames: int, counts: Counter, confidence_sums: dict, sign: int = 1):
+        self.total_frames += sign * total_frames
+        self.frames_analyzed += sign * sum(counts.values())
+        for emotion, count in counts.items():
+            self.counts[emotion] += sign * count
+            self.confidence_sums[emotion] += sign * confidence_sums[emotion]
+            if question_id is not None:
+                self.per_question[question_id][emotion] += sign * count
+            if self.counts[emotion] <= 0:
+                del self.counts[emotion]
+                self.confidence_sums.pop(emotion, None)
+        if question_id is not None:
+            self.per_question[question_id] = +self.per_question[question_id]  # drop zero counts
+            if not self.per_question[question_id]:
+                del self.per_question[question_id]
+
+    def summary(self) -> dict:
+        with self._lock:
+            analyzed = self.frames_analyzed
+            distribution = {
+                emotion: {
+                    "share": round(count / analyzed, 3),
+                    "mean_confidence": round(self.confidence_sums[emotion] / count, 3),
+                }
+                for emotion, count in self.counts.most_common()
+            }
+            return {
+                "segments_analyzed": self.segments,
+                "total_frames": self.total_frames,
+                "frames_analyzed": analyzed,
+                "dominant_emotion": self.counts.most_common(1)[0][0] if self.counts else None,
+                "emotion_distribution": distribution,
+                "per_question_dominant_emotion": {
+                    question_id: counts.most_common(1)[0][0]
+                    for question_id, counts in sorted(self.per_question.items())
+                },
+            }
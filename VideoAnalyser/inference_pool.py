@@ -0,0 +1,382 @@
+"""
+Pool of emotion-inference worker processes.
+
+Each worker loads the Keras model once and owns a ring of frame slots in a
+`multiprocessing.shared_memory` block. The API process only converts frames
+to the model's 48x48 grayscale input, writes them into a free slot and sends
+the slot number over a pipe; the worker batches whatever is queued, runs the
+model and sends back (slot, label, confidence). No frame is ever pickled.
+
+A worker that dies fails only its in-flight frames (WorkerCrashedError) and is
+respawned; the API process never imports TensorFlow while the pool is enabled.
+If every worker keeps failing to start, frames are analysed in-process instead.
+
+    EMOTION_WORKERS=4               # 0 (default) keeps inference in-process
+    EMOTION_RING_SLOTS=32           # frames in flight per worker
+    EMOTION_MAX_BATCH=16            # frames per model.predict call
+    EMOTION_WORKER_THREADS=1        # TensorFlow threads per worker
+"""
+import atexit
+import multiprocessing as mp
+import os
+import signal
+import threading
+from concurrent.futures import Future
+from multiprocessing import connection
+from multiprocessing.shared_memory import SharedMemory
+
+import cv2
+import numpy as np
+
+from telemetry import counter, gauge
+
+EMOTION_WORKERS = int(os.getenv("EMOTION_WORKERS", "0"))
+EMOTION_RING_SLOTS = int(os.getenv("EMOTION_RING_SLOTS", "32"))
+EMOTION_MAX_BATCH = int(os.getenv("EMOTION_MAX_BATCH", "16"))
+EMOTION_WORKER_THREADS = int(os.getenv("EMOTION_WORKER_THREADS", "1"))
+
+FRAME_SIZE = (48, 48)
+FRAME_BYTES = FRAME_SIZE[0] * FRAME_SIZE[1]
+
+# A worker that dies this many times without ever loading the model is not restarted
+MAX_STARTUP_FAILURES = 3
+
+worker_restarts = counter("nudge_emotion_worker_restarts_total", "Emotion workers respawned after a crash.")
+frames_in_flight = gauge("nudge_emotion_frames_in_flight", "Frames sitting in the inference ring buffers.")
+
+
+class WorkerCrashedError(RuntimeError):
+    """The worker holding this frame died before answering."""
+
+
+def to_model_input(frame) -> np.ndarray:
+    """
+    BGR frame -> 48x48 grayscale uint8 (the same steps as test_emotion.preprocess_frame, minus scaling).
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, FRAME_SIZE)
+
+
+# --- Worker process ---
+def _worker_main(shm_name: str, slots: int, tasks, results, max_batch: int, threads: int):
+    # Ctrl+C is for the API process; workers stop when it closes the pool or their pipe
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    # Keep N workers from oversubscribing the cores
+    os.environ["TF_NUM_INTRAOP_THREADS"] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = str(threads)
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+
+    from VideoAnalyser.test_emotion import EMOTIONS, model
+
+    shm = SharedMemory(name=shm_name)
+    ring = np.ndarray((slots, *FRAME_SIZE), dtype=np.uint8, buffer=shm.buf)
+    results.send("ready")
+
+    try:
+        while True:
+            try:
+                batch = [tasks.recv()]
+                while len(batch) < max_batch and tasks.poll():
+                    batch.append(tasks.recv())
+            except EOFError:
+                break
+            if None in batch:
+                break
+
+            try:
+                inputs = ring[batch].astype(np.float32) / 255.0
+                predictions = model.predict(inputs[..., np.newaxis], verbose=0)
+                top = predictions.argmax(axis=1)
+                answer = [
+                    (slot, EMOTIONS[index], float(scores[index]), None)
+                    for slot, index, scores in zip(batch, top, predictions)
+                ]
+            except Exception as e:
+                answer = [(slot, None, 0.0, str(e)) for slot in batch]
+            results.send(answer)
+    finally:
+        del ring
+        shm.close()
+
+
+# --- API process side ---
+class _Worker:
+    def __init__(self, index: int, context, slots: int, target=_worker_main):
+        self.index = index
+        self.context = context
+        self.slots = slots
+        self.target = target
+        self.shm = SharedMemory(create=True, size=slots * FRAME_BYTES)
+        self.ring = np.ndarray((slots, *FRAME_SIZE), dtype=np.uint8, buffer=self.shm.buf)
+        self.free = list(range(slots))
+        self.in_flight = {}  # slot -> Future
+        self.ready = False
+        self.startup_failures = 0
+        self.process = None
+        self.tasks = None
+        self.results = None
+
+    def spawn(self):
+        task_reader, self.tasks = self.context.Pipe(duplex=False)
+        self.results, result_writer = self.context.Pipe(duplex=False)
+        self.process = self.context.Process(
+            target=self.target,
+            args=(self.shm.name, self.slots, task_reader, result_writer, EMOTION_MAX_BATCH, EMOTION_WORKER_THREADS),
+            name=f"emotion-worker-{self.index}",
+            daemon=True,
+        )
+        self.process.start()
+        # The child holds its own copies of these ends
+        task_reader.close()
+        result_writer.close()
+        self.ready = False
+
+    def close_pipes(self):
+        for conn in (self.tasks, self.results):
+            if conn is None:
+                continue
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+
+class EmotionInferencePool:
+    def __init__(self, workers: int = EMOTION_WORKERS, slots_per_worker: int = EMOTION_RING_SLOTS,
+                 target=_worker_main):
+        # spawn: never fork a process that may already have TensorFlow or threads loaded
+        self._context = mp.get_context("spawn")
+        self._workers = [_Worker(i, self._context, slots_per_worker, target) for i in range(workers)]
+        self._condition = threading.Condition()
+        self._closing = False
+        self._collector = None
+        self._respawn_timers = set()
+
+    def start(self):
+        for worker in self._workers:
+            worker.spawn()
+        self._collector = threading.Thread(target=self._collect, name="emotion-collector", daemon=True)
+        self._collector.start()
+        print(f"✅ Started {len(self._workers)} emotion inference workers.")
+        return self
+
+    def submit(self, frame) -> Future:
+        """
+        Queues one BGR frame; the Future resolves to (emotion_label, confidence).
+        Blocks while every ring slot is in use. Runs in this process once every
+        worker has been given up on.
+        """
+        future = Future()
+        if frame is None or frame.size == 0:
+            future.set_result(("No Face/Frame", 0.0))
+            return future
+        pixels = to_model_input(frame)
+
+        with self._condition:
+            while True:
+                if self._closing:
+                    raise RuntimeError("Emotion inference pool is closed")
+                alive = [w for w in self._workers if w.process is not None]
+                candidates = [w for w in alive if w.tasks is not None and w.free]
+                if candidates or not alive:
+                    break
+                self._condition.wait()
+
+            if candidates:
+                # A freshly respawned worker is still loading the model; prefer ready ones
+                worker = max(candidates, key=lambda w: (w.ready, len(w.free)))
+                slot = worker.free.pop()
+                worker.ring[slot] = pixels
+                worker.in_flight[slot] = future
+                frames_in_flight.inc()
+                try:
+                    worker.tasks.send(slot)
+                except OSError:
+                    # The worker is dying; the collector fails this frame with the others
+                    pass
+                return future
+
+        # Every worker was given up on: keep analysing, just without the pool
+        return predict_in_process(frame)
+
+    def _collect(self):
+        while not self._closing:
+            with self._condition:
+                waitables = {}
+                for worker in self._workers:
+                    if worker.tasks is not None:  # skips workers waiting to be respawned
+                        waitables[worker.results] = worker
+                        waitables[worker.process.sentinel] = worker
+                if not waitables:
+                    if not any(w.process is not None for w in self._workers):
+                        return
+                    self._condition.wait(timeout=1.0)
+                    continue
+
+            try:
+                ready_list = connection.wait(list(waitables), timeout=1.0)
+            except OSError:
+                continue  # a pipe was closed under us (shutdown or restart)
+
+            for ready in ready_list:
+                worker = waitables[ready]
+                if ready is worker.results:
+                    try:
+                        message = worker.results.recv()
+                    except (EOFError, OSError):
+                        self._restart(worker)
+                        continue
+                    self._resolve(worker, message)
+                elif worker.process is not None and not worker.process.is_alive():
+                    self._restart(worker)
+
+    def _resolve(self, worker: _Worker, message):
+        with self._condition:
+            if message == "ready":
+                # submit() reads this to prefer workers that have the model loaded
+                worker.ready = True
+                worker.startup_failures = 0
+                return
+            for slot, label, confidence, error in message:
+                future = worker.in_flight.pop(slot, None)
+                worker.free.append(slot)
+                frames_in_flight.dec()
+                if future is None or future.done():
+                    continue
+                if error:
+                    future.set_exception(RuntimeError(error))
+                else:
+                    future.set_result((label, confidence))
+            self._condition.notify_all()
+
+    def _restart(self, worker: _Worker):
+        with self._condition:
+            if worker.process is None or worker.tasks is None or self._closing:
+                return  # given up, already restarting (pipe and sentinel both fired), or shutting down
+            process = worker.process
+            worker.close_pipes()
+            worker.tasks = None  # marks it restarting: no new frames until the replacement is up
+
+            failed = list(worker.in_flight.values())
+            worker.in_flight.clear()
+            worker.free = list(range(worker.slots))
+            for future in failed:
+                if not future.done():
+                    future.set_exception(WorkerCrashedError(f"Emotion worker {worker.index} died"))
+                frames_in_flight.dec()
+            self._condition.notify_all()
+
+        # Joining a hung worker can take a while; submit() and _resolve() must not wait on it
+        process.join(timeout=1.0)
+        if process.is_alive():
+            process.terminate()  # its pipe broke but the process hung on
+            process.join()
+        exitcode = process.exitcode
+
+        with self._condition:
+            if self._closing:
+                return
+            if not worker.ready:
+                worker.startup_failures += 1
+            if worker.startup_failures >= MAX_STARTUP_FAILURES:
+                print(f"❌ Emotion worker {worker.index} keeps failing to start (exit code {exitcode}); giving up on it.")
+                worker.process = None
+                self._condition.notify_all()
+                return
+            print(f"⚠️ Emotion worker {worker.index} exited with code {exitcode}; restarting.")
+            worker_restarts.inc()
+            backoff = 0.0 if worker.ready else min(5.0, 0.5 * 2 ** worker.startup_failures)
+
+            # Respawn from a timer so the backoff never stalls the collector (and the other workers' results)
+            timer = threading.Timer(backoff, self._respawn, args=(worker,))
+            timer.daemon = True
+            self._respawn_timers.add(timer)
+            timer.start()
+
+    def _respawn(self, worker: _Worker):
+        with self._condition:
+            self._respawn_timers.discard(threading.current_thread())
+            if not self._closing and worker.process is not None:
+                worker.spawn()
+            self._condition.notify_all()
+
+    def close(self):
+        with self._condition:
+            self._closing = True
+            for timer in self._respawn_timers:
+                timer.cancel()
+            self._respawn_timers.clear()
+            self._condition.notify_all()
+        for worker in self._workers:
+            if worker.process is None:
+                continue
+            try:
+                if worker.tasks is not None:
+                    worker.tasks.send(None)
+            except OSError:
+                pass
+            worker.process.join(timeout=5.0)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.close_pipes()
+        if self._collector is not None:
+            self._collector.join(timeout=2.0)
+        for worker in self._workers:
+            for future in worker.in_flight.values():
+                future.cancel()
+            del worker.ring
+            worker.shm.close()
+            worker.shm.unlink()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    The shared pool, started on first use. None when EMOTION_WORKERS is 0.
+    """
+    global _pool
+    if EMOTION_WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = EmotionInferencePool().start()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            atexit.unregister(_pool.close)
+            _pool = None
+
+
+def submit_frame(frame) -> Future:
+    """
+    Emotion prediction for one frame: on the worker pool when enabled, otherwise
+    in this process (loading the model on first use).
+    """
+    pool = get_pool()
+    if pool is not None:
+        return pool.submit(frame)
+    return predict_in_process(frame)
+
+
+def predict_in_process(frame) -> Future:
+    """
+    Runs predict_emotion in this process and wraps the outcome in a resolved Future.
+    """
+    from VideoAnalyser.test_emotion import predict_emotion
+
+    future = Future()
+    try:
+        future.set_result(predict_emotion(frame))
+    except Exception as e:
+        future.set_exception(e)
+    return future
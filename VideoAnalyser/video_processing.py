@@ -1,44 +1,87 @@
+import os
 import cv2
 import tempfile
 import numpy as np
-from VideoAnalyser.test_emotion import predict_emotion  # Import the real model
+from VideoAnalyser.inference_pool import submit_frame  # worker pool, or the in-process model
+from telemetry import stage
 
-def process_video(video_bytes):
+# Per-frame wait for the inference workers (covers a worker restart)
+EMOTION_TIMEOUT_S = float(os.getenv("EMOTION_TIMEOUT_S", "30"))
+
+def process_video(video_bytes, max_frames=5, sample_every_s=None):
+    """
+    Run emotion detection on frames of an encoded video.
+
+    Args:
+        video_bytes (bytes): The uploaded video file.
+        max_frames (int): Stop after analyzing this many frames.
+        sample_every_s (float, optional): Analyze one frame per this many seconds
+            instead of consecutive frames. Skipped frames are grabbed but not decoded.
+    """
     # Save the incoming video bytes to a temporary file
     with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as tmp:
         tmp.write(video_bytes)
         tmp_path = tmp.name
 
-    cap = cv2.VideoCapture(tmp_path)
+    try:
+        cap = cv2.VideoCapture(tmp_path)
 
-    if not cap.isOpened():
-        return {"error": "❌ Failed to open video file"}
+        if not cap.isOpened():
+            return {"error": "❌ Failed to open video file"}
 
-    frame_count = 0
-    emotions_detected = []
+        stride = 1
+        if sample_every_s:
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            # Browser webm often reports no/absurd FPS; assume 30 then
+            fps = fps if 0 < fps <= 120 else 30
+            stride = max(1, round(fps * sample_every_s))
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+        frame_count = 0
+        pending = []  # one Future per analyzed frame, in frame order
 
-        frame_count += 1
+        while True:
+            with stage("video.decode", kind="cpu"):
+                ret = cap.grab()
+                if ret and frame_count % stride == 0:
+                    ret, frame = cap.retrieve()
+                else:
+                    frame = None
+            if not ret:
+                break
 
-        # ✅ Real emotion detection using the imported model
-        try:
-            emotion_label, confidence = predict_emotion(frame)
-            emotions_detected.append({
-                "emotion": emotion_label,
-                "confidence": round(confidence, 2)
-            })
-        except Exception as e:
-            emotions_detected.append({"error": str(e)})
+            frame_count += 1
+            if frame is None:
+                continue
 
-        # Optional: Limit number of analyzed frames (for speed)
-        if frame_count >= 5:
-            break
+            # ✅ Real emotion detection; with EMOTION_WORKERS set, decoding keeps
+            # going while the workers predict earlier frames
+            try:
+                with stage("emotion.submit", kind="cpu"):
+                    pending.append(submit_frame(frame))
+            except Exception as e:
+                pending.append(e)
 
-    cap.release()
+            # Optional: Limit number of analyzed frames (for speed)
+            if len(pending) >= max_frames:
+                break
+
+        cap.release()
+    finally:
+        os.remove(tmp_path)
+
+    emotions_detected = []
+    with stage("emotion.predict", kind="cpu", frames=len(pending)):
+        for future in pending:
+            try:
+                if isinstance(future, Exception):
+                    raise future
+                emotion_label, confidence = future.result(timeout=EMOTION_TIMEOUT_S)
+                emotions_detected.append({
+                    "emotion": emotion_label,
+                    "confidence": round(confidence, 2)
+                })
+            except Exception as e:
+                emotions_detected.append({"error": str(e) or type(e).__name__})
 
     return {
         "total_frames": frame_count,
@@ -1,7 +1,8 @@
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional
+import asyncio
 import os
 import io
 import docx
@@ -10,20 +11,23 @@ from datetime import datetime
 
 # --- Internal imports ---
 from AudioAnalyser.services.audio_transcript import upload_to_assemblyai, transcribe_and_poll
+from AudioAnalyser.services.audio_preprocessing import preprocess_audio
+from AudioAnalyser.services.segmented_transcription import should_segment, transcribe_segmented
 from AudioAnalyser.services.evaluation import analyze_technical_answer
 from VideoAnalyser.video_processing import process_video
+from VideoAnalyser.inference_pool import get_pool, shutdown_pool
+from VideoAnalyser.aggregation import EmotionAggregate
 from ReportGeneration.connection import generate_interview_report
-from QuestionGeneration.context_generation import generate_interview_questions
+from ReportGeneration.answer_summary import schedule_answer_summary
+from QuestionGeneration.speculative import start_question_generation, get_generated_questions
+from QuestionGeneration.question_audio import get_question_audio
 import shared_state
-
-# --- ElevenLabs TTS ---
-from elevenlabs import ElevenLabs
+import telemetry
+from telemetry import stage
 
 # Initialize FastAPI
 app = FastAPI()
-
-# Initialize ElevenLabs client
-tts_client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"))
+telemetry.instrument_app(app)
 
 # Allow all origins (adjust for production)
 app.add_middleware(
@@ -34,19 +38,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Start the emotion inference workers (if EMOTION_WORKERS > 0) before the first video arrives
+@app.on_event("startup")
+async def start_emotion_workers():
+    await asyncio.to_thread(get_pool)
+
+@app.on_event("shutdown")
+async def stop_emotion_workers():
+    await asyncio.to_thread(shutdown_pool)
+
+# Per-segment video sampling: one frame every N seconds, capped per segment
+VIDEO_SEGMENT_SAMPLE_EVERY_S = float(os.getenv("VIDEO_SEGMENT_SAMPLE_EVERY_S", "0.5"))
+VIDEO_SEGMENT_MAX_FRAMES = int(os.getenv("VIDEO_SEGMENT_MAX_FRAMES", "60"))
+
 # --- Resume Parsing Helpers ---
 async def extract_text_from_docx(file_content: bytes) -> str:
     try:
-        doc = docx.Document(io.BytesIO(file_content))
-        return "\n".join([para.text for para in doc.paragraphs])
+        with stage("resume.extract_docx", kind="cpu"):
+            doc = docx.Document(io.BytesIO(file_content))
+            return "\n".join([para.text for para in doc.paragraphs])
     except Exception as e:
         print(f"Error extracting DOCX: {e}")
         return ""
 
 async def extract_text_from_pdf(file_content: bytes) -> str:
     try:
-        reader = PdfReader(io.BytesIO(file_content))
-        return "\n".join([page.extract_text() for page in reader.pages if page.extract_text()])
+        with stage("resume.extract_pdf", kind="cpu"):
+            reader = PdfReader(io.BytesIO(file_content))
+            return "\n".join([page.extract_text() for page in reader.pages if page.extract_text()])
     except Exception as e:
         print(f"Error extracting PDF: {e}")
         return ""
@@ -56,6 +75,11 @@ async def extract_text_from_pdf(file_content: bytes) -> str:
 def healthy():
     return {"healthy": "API working ✅"}
 
+# --- Metrics (Prometheus text format) ---
+@app.get("/metrics")
+def metrics():
+    return Response(telemetry.render_metrics(), media_type=telemetry.METRICS_CONTENT_TYPE)
+
 # --- Start Interview ---
 @app.post("/start-interview")
 async def start_interview(
@@ -90,6 +114,16 @@ async def start_interview(
         "resume_text_content": resume_text_content,
     }
 
+    # New session: reset questions, answers and running video aggregates
+    shared_state.questions_generated = {}
+    shared_state.stored_audio_transcripts = {}
+    shared_state.answer_summaries = {}
+    shared_state.video_aggregate = EmotionAggregate()
+    shared_state.stored_video_analysis = {}
+
+    # Start generating questions now so /generate-problems can attach to the result
+    start_question_generation(shared_state.stored_job_info)
+
     return {"message": "✅ Interview setup details saved", "data": shared_state.stored_job_info}
 
 # --- Retrieve Saved Job Info ---
@@ -106,35 +140,49 @@ async def generate_problems_endpoint():
     if not details:
         raise HTTPException(status_code=400, detail="Job info not set. Please use /start-interview first.")
 
-    questions = generate_interview_questions(
-        job_role=details.get("job_role"),
-        company_name=details.get("company_name"),
-        job_description=details.get("job_description"),
-        other_details=details.get("other_details"),
-        resume_text=details.get("resume_text_content"),
-    )
+    # Usually already in flight (or done) since /start-interview
+    questions = await get_generated_questions(details)
 
     shared_state.questions_generated = questions
     return questions
 
 # --- Upload and Analyze Audio ---
 @app.post("/upload")
-async def upload_audio(audio: UploadFile = File(...)):
+async def upload_audio(audio: UploadFile = File(...), question_id: Optional[int] = Form(None)):
     try:
-        audio_url = upload_to_assemblyai(audio.file)
-        transcript_text = transcribe_and_poll(audio_url)
-        analysis_result = analyze_technical_answer(transcript_text)
+        raw_audio = await audio.read()
+
+        # Downmix, resample, trim silences and compress before uploading.
+        # Everything below blocks (CPU or HTTP polling), so it runs in worker threads.
+        preprocessed = await asyncio.to_thread(preprocess_audio, raw_audio)
+        if preprocessed and should_segment(preprocessed.stats["processed_duration_s"]):
+            # Long answer: transcribe pause-delimited segments in parallel
+            transcript_text = await asyncio.to_thread(transcribe_segmented, preprocessed.samples)
+        else:
+            upload_bytes = preprocessed.audio if preprocessed else raw_audio
+            audio_url = await asyncio.to_thread(upload_to_assemblyai, io.BytesIO(upload_bytes))
+            transcript_text = await asyncio.to_thread(transcribe_and_poll, audio_url)
+        analysis_result = await asyncio.to_thread(analyze_technical_answer, transcript_text)
+
+        questions_list = (shared_state.questions_generated or {}).get("questions", [])
+        question_text = questions_list[question_id - 1] if question_id and 0 < question_id <= len(questions_list) else None
 
         timestamp = datetime.utcnow().isoformat()
         shared_state.stored_audio_transcripts[timestamp] = {
+            "question_id": question_id,
+            "question": question_text,
             "transcription": transcript_text,
             "analysis": analysis_result,
         }
 
+        # Condense this answer now so the final report only has to combine summaries
+        schedule_answer_summary(timestamp, question_text, transcript_text, analysis_result)
+
         return {
             "timestamp": timestamp,
             "transcription": transcript_text,
             "analysis": analysis_result,
+            "preprocessing": preprocessed.stats if preprocessed else None,
             "job_info_used": shared_state.stored_job_info,
         }
 
@@ -146,7 +194,9 @@ async def upload_audio(audio: UploadFile = File(...)):
 async def analyze_video(video: UploadFile = File(...)):
     try:
         video_bytes = await video.read()
-        analysis_result = process_video(video_bytes)
+        analysis_result = await asyncio.to_thread(process_video, video_bytes)
+        if "error" not in analysis_result:
+            fold_video_analysis(analysis_result, full_recording=True)
         return {
             "message": "✅ Video processed successfully",
             "total_frames": analysis_result.get("total_frames"),
@@ -156,40 +206,71 @@ async def analyze_video(video: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def fold_video_analysis(analysis_result: dict, question_id: Optional[int] = None, segment_index: Optional[int] = None,
+                        full_recording: bool = False) -> dict:
+    if shared_state.video_aggregate is None:
+        shared_state.video_aggregate = EmotionAggregate()
+    if full_recording:
+        # The whole interview already contains every segment; never count frames twice
+        shared_state.video_aggregate.use_full_recording(analysis_result)
+    else:
+        shared_state.video_aggregate.add(analysis_result, question_id=question_id, segment_index=segment_index)
+
+    # Keep the report input current so nothing is left to do at report time
+    shared_state.stored_video_analysis = shared_state.video_aggregate.summary()
+    return shared_state.stored_video_analysis
+
+# --- Analyze Video Segment (incremental, during the interview) ---
+@app.post("/analyze-video-segment")
+async def analyze_video_segment(
+    video: UploadFile = File(...),
+    question_id: Optional[int] = Form(None),
+    segment_index: Optional[int] = Form(None),
+):
+    try:
+        video_bytes = await video.read()
+        analysis_result = await asyncio.to_thread(
+            process_video,
+            video_bytes,
+            max_frames=VIDEO_SEGMENT_MAX_FRAMES,
+            sample_every_s=VIDEO_SEGMENT_SAMPLE_EVERY_S,
+        )
+        if "error" in analysis_result:
+            raise HTTPException(status_code=400, detail=analysis_result["error"])
+
+        # A retried upload of the same segment replaces its earlier result
+        running_summary = fold_video_analysis(analysis_result, question_id, segment_index)
+        return {
+            "message": "✅ Video segment processed",
+            "question_id": question_id,
+            "segment_index": segment_index,
+            "frames_analyzed": analysis_result.get("frames_analyzed"),
+            "emotions": analysis_result.get("emotion_analysis"),
+            "running_summary": running_summary,
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/video-summary")
+async def video_summary():
+    if shared_state.video_aggregate is None:
+        return {"message": "❌ No video analyzed yet."}
+    return {"video_summary": shared_state.video_aggregate.summary()}
+
 # --- Generate Final Report ---
 @app.post("/generate-report")
 async def generate_report():
     try:
-        report = generate_interview_report()
+        # Waits on in-flight answer summaries and the LLM; keep it off the event loop
+        report = await asyncio.to_thread(generate_interview_report)
         if report:
             return {"message": "✅ Report generated successfully", "report": report}
         raise HTTPException(status_code=500, detail="❌ Failed to generate report")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-# --- ElevenLabs TTS ---
-def generate_tts_audio(question_text: str, voice: str = "Rachel") -> bytes:
-    """
-    Generate ElevenLabs TTS audio and return it as bytes (no file saving required).
-    """
-    if not question_text:
-        raise ValueError("Question text cannot be empty.")
-
-    try:
-        # convert() returns bytes
-        audio_bytes = tts_client.text_to_speech.convert(
-            text=question_text,
-            voice_id="JBFqnCBsd6RMkjVDRZzb",  # Replace with desired voice ID
-            model_id="eleven_multilingual_v2",
-            output_format="mp3_44100_128"
-        )
-        # Ensure we have bytes
-        if hasattr(audio_bytes, "__iter__") and not isinstance(audio_bytes, bytes):
-            audio_bytes = b"".join(audio_bytes)
-        return audio_bytes
-    except Exception as e:
-        raise RuntimeError(f"TTS generation failed: {e}")
-
 # --- Question TTS Endpoint ---
 @app.get("/question-tts/{question_id}")
 async def question_tts(question_id: int, voice: str = "Rachel"):
@@ -204,7 +285,8 @@ async def question_tts(question_id: int, voice: str = "Rachel"):
     question_text = questions_list[question_id - 1]
 
     try:
-        audio_bytes = generate_tts_audio(question_text, voice)
+        # Served from the pre-synthesized store when generation has already run
+        audio_bytes = await get_question_audio(question_text, voice)
         return StreamingResponse(io.BytesIO(audio_bytes), media_type="audio/mpeg")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,216 @@
+"""
+Central scheduler for outbound calls to rate-limited providers.
+
+Every provider (and optionally each of its models) gets token buckets for
+requests per minute and, for LLMs, estimated tokens per minute. Callers wait
+in a per-provider priority queue until both the provider and model buckets
+have room, so interactive work (question generation, TTS) always goes ahead
+of report generation and batch ingestion instead of all of them racing into 429s.
+
+Default limits (free-tier quotas; 0 = unlimited):
+    groq        30 rpm, 60,000 tpm
+    gemini      1,500 rpm
+    elevenlabs  120 rpm
+    assemblyai  300 rpm
+    ddgs        20 rpm
+One interview makes roughly a dozen Groq calls, so a handful of concurrent
+sessions already queues behind the 30 rpm default.
+
+Limits come from RATE_LIMIT_<PROVIDER>_RPM / RATE_LIMIT_<PROVIDER>_TPM, plus
+RATE_LIMITS_JSON for per-model overrides, e.g.
+    RATE_LIMITS_JSON='{"groq:llama-3.1-8b-instant": {"rpm": 30, "tpm": 6000}}'
+"""
+import heapq
+import itertools
+import json
+import math
+import os
+import threading
+import time
+from enum import IntEnum
+
+from telemetry import counter, gauge, histogram
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0   # a user is waiting on this right now
+    STANDARD = 1      # user-facing, but already behind a slower step
+    REPORT = 2        # report pipeline and its background preparation
+    BATCH = 3         # offline ingestion
+
+
+# rpm: requests per minute, tpm: estimated tokens per minute (0 = unlimited)
+DEFAULT_LIMITS = {
+    "groq": {"rpm": 30, "tpm": 60_000},
+    "gemini": {"rpm": 1_500, "tpm": 0},
+    "elevenlabs": {"rpm": 120, "tpm": 0},
+    "assemblyai": {"rpm": 300, "tpm": 0},
+    "ddgs": {"rpm": 20, "tpm": 0},
+}
+
+queue_depth = gauge("nudge_outbound_queue_depth", "Outbound calls waiting for a rate-limit slot.")
+queue_wait = histogram("nudge_outbound_wait_seconds", "Time spent waiting for a rate-limit slot.")
+throttled = counter("nudge_outbound_throttled_total", "Outbound calls that had to wait for a slot.")
+
+
+class RateLimitTimeout(TimeoutError):
+    """No rate-limit slot became free before the caller's timeout."""
+
+
+def estimate_tokens(payload) -> int:
+    """
+    Rough token estimate (~4 characters per token) for a prompt string or a list of messages.
+    """
+    if payload is None:
+        return 0
+    if isinstance(payload, str):
+        text = payload
+    else:
+        text = "".join(getattr(message, "content", str(message)) for message in payload)
+    return math.ceil(len(text) / 4)
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `per_minute / 60` per second.
+    Not thread-safe on its own; the scheduler serializes access.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """
+        Seconds until `amount` is available (requests larger than the bucket only wait for a full bucket).
+        """
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+def _load_limits() -> dict:
+    limits = {}
+    for provider, defaults in DEFAULT_LIMITS.items():
+        limits[provider] = {
+            "rpm": float(os.getenv(f"RATE_LIMIT_{provider.upper()}_RPM", defaults["rpm"])),
+            "tpm": float(os.getenv(f"RATE_LIMIT_{provider.upper()}_TPM", defaults["tpm"])),
+        }
+    limits.update(json.loads(os.getenv("RATE_LIMITS_JSON", "{}")))
+    return limits
+
+
+class OutboundScheduler:
+    def __init__(self, limits: dict = None):
+        self.limits = limits if limits is not None else _load_limits()
+        self._buckets = {}  # key -> (request bucket or None, token bucket or None)
+        self._queues = {}   # provider -> heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def _buckets_for(self, key: str):
+        if key not in self._buckets:
+            limit = self.limits.get(key)
+            if not limit:
+                self._buckets[key] = (None, None)
+            else:
+                self._buckets[key] = (
+                    TokenBucket(limit["rpm"]) if limit.get("rpm") else None,
+                    TokenBucket(limit["tpm"]) if limit.get("tpm") else None,
+                )
+        return self._buckets[key]
+
+    def _take(self, provider: str, model: str, tokens: int) -> float:
+        """
+        Consumes from every applicable bucket if all have room, else returns the wait in seconds.
+        """
+        now = time.monotonic()
+        keys = [provider] + ([f"{provider}:{model}"] if model else [])
+        needs = []
+        wait = 0.0
+        for key in keys:
+            request_bucket, token_bucket = self._buckets_for(key)
+            if request_bucket:
+                needs.append((request_bucket, 1))
+                wait = max(wait, request_bucket.wait_time(1, now))
+            if token_bucket and tokens:
+                needs.append((token_bucket, tokens))
+                wait = max(wait, token_bucket.wait_time(tokens, now))
+        if wait == 0.0:
+            for bucket, amount in needs:
+                bucket.consume(amount)
+        return wait
+
+    def _set_depth(self, provider: str):
+        counts = {p: 0 for p in Priority}
+        for priority, _ in self._queues[provider]:
+            counts[Priority(priority)] += 1
+        for priority, count in counts.items():
+            queue_depth.set(count, provider=provider, priority=priority.name.lower())
+
+    def acquire(self, provider: str, model: str = None, tokens: int = 0,
+                priority: Priority = Priority.STANDARD, timeout: float = None):
+        """
+        Blocks until a slot is free for `provider` (and `model`), serving higher priorities first.
+
+        Raises:
+            RateLimitTimeout: if no slot frees up within `timeout` seconds.
+        """
+        ticket = (int(priority), next(self._sequence))
+        start = time.monotonic()
+        waited = False
+
+        with self._condition:
+            queue = self._queues.setdefault(provider, [])
+            heapq.heappush(queue, ticket)
+            self._set_depth(provider)
+            try:
+                while True:
+                    wait = None
+                    if queue[0] == ticket:
+                        wait = self._take(provider, model, tokens)
+                        if wait == 0.0:
+                            heapq.heappop(queue)
+                            break
+
+                    if timeout is not None:
+                        remaining = timeout - (time.monotonic() - start)
+                        if remaining <= 0:
+                            raise RateLimitTimeout(f"No {provider} rate-limit slot within {timeout:.1f}s")
+                        wait = remaining if wait is None else min(wait, remaining)
+
+                    if not waited:
+                        waited = True
+                        throttled.inc(provider=provider, priority=Priority(priority).name.lower())
+                    self._condition.wait(wait)
+            except BaseException:
+                queue.remove(ticket)
+                heapq.heapify(queue)
+                raise
+            finally:
+                self._set_depth(provider)
+                # The head changed (or a slot was taken): let the next waiter re-check
+                self._condition.notify_all()
+
+        queue_wait.observe(time.monotonic() - start, provider=provider, priority=Priority(priority).name.lower())
+
+    def try_acquire(self, provider: str, model: str = None, tokens: int = 0) -> bool:
+        """
+        Takes a slot only if one is free right now and nobody is queued (used for hedged duplicates).
+        """
+        with self._condition:
+            if self._queues.get(provider):
+                return False
+            return self._take(provider, model, tokens) == 0.0
+
+
+scheduler = OutboundScheduler()
@@ -0,0 +1,286 @@
+"""
+Deadlines, hedged requests and circuit breakers for calls to external AI providers.
+
+    response = resilient_call("groq", model.invoke, messages, fallback=fallback_model.invoke)
+
+- Deadline: the caller gets DeadlineExceeded once the provider's deadline
+  passes, even if the underlying client has no timeout of its own.
+- Hedging (opt-in with hedge=True): if the first attempt is still running after
+  the provider's observed p95 latency, an identical second attempt is started and
+  whichever finishes first wins. Only for idempotent, cheap calls (embeddings,
+  search), never for billed or non-deterministic generations.
+- Circuit breaker: after CIRCUIT_FAILURE_THRESHOLD consecutive failures the
+  provider is skipped for CIRCUIT_RESET_S seconds (then one probe is let
+  through); calls fail fast or go straight to the fallback.
+
+Before the first attempt the call waits for a rate-limit slot from
+outbound_scheduler (in priority order); hedges only fire if a slot is free
+immediately. Attempts run on a shared thread pool. An attempt that misses its deadline
+cannot be interrupted, so it finishes in the background and its result is dropped.
+"""
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from outbound_scheduler import Priority, RateLimitTimeout, scheduler
+from telemetry import counter, gauge
+
+# Per-provider deadlines in seconds, overridable with e.g. GROQ_DEADLINE_S=30
+DEFAULT_DEADLINES = {
+    "groq": 60.0,
+    "gemini": 15.0,
+    "elevenlabs": 30.0,
+    "assemblyai": 600.0,
+    "ddgs": 10.0,
+}
+DEFAULT_DEADLINE = 60.0
+
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_S = float(os.getenv("CIRCUIT_RESET_S", "30"))
+
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_SAMPLES = 20     # no hedging until the latency estimate is meaningful
+HEDGE_MIN_DELAY_S = 0.05
+
+# Secondary Groq model used when the primary one fails or its circuit is open
+FALLBACK_CHAT_MODEL = os.getenv("GROQ_FALLBACK_MODEL")
+
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("RESILIENCE_MAX_WORKERS", "64")),
+    thread_name_prefix="resilience",
+)
+
+hedges_started = counter("nudge_resilience_hedges_total", "Hedged duplicate requests started.")
+hedges_won = counter("nudge_resilience_hedge_wins_total", "Hedged requests that finished first.")
+deadlines_exceeded = counter("nudge_resilience_deadline_exceeded_total", "Calls that missed their deadline.")
+fallbacks_used = counter("nudge_resilience_fallbacks_total", "Calls answered by the fallback.")
+circuit_open = gauge("nudge_circuit_open", "1 while a provider's circuit breaker is open.")
+
+
+class DeadlineExceeded(TimeoutError):
+    """The provider did not answer within its deadline."""
+
+
+class CircuitOpenError(RuntimeError):
+    """The provider's circuit breaker is open and no fallback was given."""
+
+
+def deadline_for(provider: str) -> float:
+    override = os.getenv(f"{provider.upper().replace('-', '_')}_DEADLINE_S")
+    return float(override) if override else DEFAULT_DEADLINES.get(provider.split("-")[0], DEFAULT_DEADLINE)
+
+
+class LatencyTracker:
+    """
+    Rolling window of successful call latencies for one provider.
+    """
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float):
+        with self._lock:
+            if len(self._samples) < HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with a single half-open probe.
+    """
+
+    def __init__(self, provider: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_s: float = CIRCUIT_RESET_S):
+        self.provider = provider
+        self.failure_threshold = failure_threshold
+        self.reset_s = reset_s
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_s and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def release_probe(self):
+        """
+        Gives back a half-open probe that never reached the provider.
+        """
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probe_in_flight = False
+        circuit_open.set(0, provider=self.provider)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.failures < self.failure_threshold and self.opened_at is None:
+                return
+            self.opened_at = time.monotonic()
+        print(f"⚠️ Circuit open for {self.provider} after {self.failures} consecutive failures.")
+        circuit_open.set(1, provider=self.provider)
+
+
+_breakers = {}
+_trackers = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    with _registry_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+        return _breakers[provider]
+
+
+def get_tracker(provider: str) -> LatencyTracker:
+    with _registry_lock:
+        if provider not in _trackers:
+            _trackers[provider] = LatencyTracker()
+        return _trackers[provider]
+
+
+def _submit(fn, args, kwargs):
+    # Carry the caller's context (e.g. the current trace span) into the worker thread
+    context = contextvars.copy_context()
+    return _executor.submit(context.run, fn, *args, **kwargs)
+
+
+def _scheduler_provider(provider: str) -> str:
+    # "groq-fallback" shares Groq's rate limits
+    return provider.split("-")[0]
+
+
+def _attempt(provider: str, fn, args, kwargs, deadline: float, hedge: bool, model: str, tokens: int):
+    tracker = get_tracker(provider)
+    hedge_delay = tracker.percentile(HEDGE_PERCENTILE) if hedge else None
+    if hedge_delay is not None:
+        hedge_delay = max(hedge_delay, HEDGE_MIN_DELAY_S)
+
+    start = time.monotonic()
+    primary = _submit(fn, args, kwargs)
+    pending = {primary}
+    last_error = None
+
+    while pending:
+        elapsed = time.monotonic() - start
+        remaining = deadline - elapsed
+        if remaining <= 0:
+            break
+
+        timeout = remaining
+        if hedge_delay is not None and hedge_delay > elapsed:
+            timeout = min(timeout, hedge_delay - elapsed)
+
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                result = future.result()
+            except Exception as e:
+                last_error = e
+                continue
+            tracker.record(time.monotonic() - start)
+            if future is not primary:
+                hedges_won.inc(provider=provider)
+            return result
+
+        if hedge_delay is not None and time.monotonic() - start >= hedge_delay:
+            # A hedge is only worth it if it does not have to queue for the rate limiter
+            if scheduler.try_acquire(_scheduler_provider(provider), model, tokens):
+                hedges_started.inc(provider=provider)
+                pending.add(_submit(fn, args, kwargs))
+            hedge_delay = None
+
+    if pending:
+        deadlines_exceeded.inc(provider=provider)
+        raise DeadlineExceeded(f"{provider} did not respond within {deadline:.1f}s")
+    raise last_error
+
+
+def resilient_call(provider: str, fn, *args, deadline: float = None, hedge: bool = False, fallback=None,
+                   priority: Priority = Priority.STANDARD, rate_model: str = None, rate_tokens: int = 0,
+                   fallback_rate_model: str = None, **kwargs):
+    """
+    Calls `fn(*args, **kwargs)` with rate limiting, a deadline, optional hedging and a circuit breaker.
+
+    Args:
+        provider (str): Breaker/latency bucket, e.g. "groq" or "gemini".
+        fn (callable): The blocking client call.
+        deadline (float, optional): Seconds before giving up (default: per-provider).
+        hedge (bool): Start a duplicate attempt after the p95 delay. Off by default; only for
+            idempotent, cheap calls.
+        fallback (callable, optional): Called with the same arguments, under its own
+            "<provider>-fallback" breaker, when the primary fails or its circuit is open.
+        priority (Priority): Queue class for the provider's rate limiter.
+        rate_model (str, optional): Model name, for per-model rate limits.
+        rate_tokens (int): Estimated tokens for the call (see outbound_scheduler.estimate_tokens).
+        fallback_rate_model (str, optional): Model name the fallback is rate-limited under.
+
+    Raises:
+        DeadlineExceeded, RateLimitTimeout, CircuitOpenError, or the provider's own
+        exception when there is no fallback (or the fallback fails too).
+
+    Time spent queueing for a rate-limit slot counts against the deadline, and the
+    fallback only gets what is left of it.
+    """
+    breaker = get_breaker(provider)
+    deadline = deadline or deadline_for(provider)
+    started = time.monotonic()
+
+    if breaker.allow():
+        queued_at = time.monotonic()
+        try:
+            # Queueing for a slot is local back-pressure, not a provider failure
+            scheduler.acquire(_scheduler_provider(provider), rate_model, rate_tokens, priority, timeout=deadline)
+        except RateLimitTimeout:
+            breaker.release_probe()
+            raise
+        remaining = deadline - (time.monotonic() - queued_at)
+        if remaining <= 0:
+            breaker.release_probe()
+            deadlines_exceeded.inc(provider=provider)
+            raise DeadlineExceeded(f"{provider} rate-limit queue used up the {deadline:.1f}s deadline")
+
+        try:
+            result = _attempt(provider, fn, args, kwargs, remaining, hedge, rate_model, rate_tokens)
+            breaker.record_success()
+            return result
+        except Exception as e:
+            breaker.record_failure()
+            if fallback is None:
+                raise
+            print(f"⚠️ {provider} failed ({e}); using fallback.")
+    elif fallback is None:
+        raise CircuitOpenError(f"Circuit open for {provider}; failing fast.")
+
+    remaining = deadline - (time.monotonic() - started)
+    if remaining <= 0:
+        deadlines_exceeded.inc(provider=provider)
+        raise DeadlineExceeded(f"{provider} used up the {deadline:.1f}s deadline before the fallback")
+    fallbacks_used.inc(provider=provider)
+    return resilient_call(
+        f"{provider}-fallback", fallback, *args,
+        deadline=remaining, hedge=hedge, priority=priority,
+        rate_model=fallback_rate_model, rate_tokens=rate_tokens, **kwargs
+    )
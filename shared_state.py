@@ -2,3 +2,8 @@ stored_job_info = {}
 questions_generated = {}
 stored_audio_transcripts = {}    # 🆕 Store audio transcripts by timestamp
 stored_video_analysis = {}       # Already added for video analysis
+question_generation_task = None  # 🆕 Speculative question generation started by /start-interview
+question_generation_key = None   # Job inputs the speculative task was started with
+question_audio = {}              # 🆕 Pre-synthesized question TTS: question text -> Future[bytes]
+video_aggregate = None           # 🆕 Running EmotionAggregate for the current session's video segments
+answer_summaries = {}            # 🆕 Per-answer summaries for the report: transcript timestamp -> Future[dict]
@@ -0,0 +1,282 @@
+"""
+Tracing and metrics for the hot paths of the API.
+
+- Spans: OpenTelemetry SDK. Exported over OTLP/gRPC when
+  OTEL_EXPORTER_OTLP_ENDPOINT is set, as JSON lines when TRACE_FILE is set,
+  otherwise tracing stays a no-op. Sampling follows the standard
+  OTEL_TRACES_SAMPLER / OTEL_TRACES_SAMPLER_ARG variables.
+- Metrics: a small lock-protected in-process registry (latency histograms,
+  in-flight gauges, counters) rendered in Prometheus text format for /metrics.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from opentelemetry import trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, SpanExporter, SpanExportResult
+from opentelemetry.trace import Status, StatusCode
+
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "nudge-api")
+TRACE_FILE = os.getenv("TRACE_FILE")
+OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT")
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds. Covers sub-millisecond CPU stages up to multi-minute transcriptions.
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+# --- Tracing ---
+class JsonLinesSpanExporter(SpanExporter):
+    """
+    Appends finished spans to a file, one JSON document per line.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        with self._lock:
+            for span in spans:
+                self._file.write(span.to_json(indent=None) + "\n")
+            self._file.flush()
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        with self._lock:
+            self._file.close()
+
+
+def _configure_tracing():
+    exporters = []
+    if OTLP_ENDPOINT:
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        exporters.append(OTLPSpanExporter())
+    if TRACE_FILE:
+        exporters.append(JsonLinesSpanExporter(TRACE_FILE))
+
+    if not exporters:
+        return trace.get_tracer(__name__)
+
+    provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+    for exporter in exporters:
+        # Batching keeps export off the request path
+        provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(provider)
+    return trace.get_tracer(__name__)
+
+
+tracer = _configure_tracing()
+
+
+# --- Metrics ---
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key: tuple, extra: tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[_label_key(labels)] = float(value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, description: str, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # key -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f"{self.name}_bucket{_format_labels(key, (('le', str(bound)),))} {count}")
+                lines.append(f"{self.name}_bucket{_format_labels(key, (('le', '+Inf'),))} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+_registry = []
+
+
+def counter(name: str, description: str) -> Counter:
+    metric = Counter(name, description)
+    _registry.append(metric)
+    return metric
+
+
+def gauge(name: str, description: str) -> Gauge:
+    metric = Gauge(name, description)
+    _registry.append(metric)
+    return metric
+
+
+def histogram(name: str, description: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+    metric = Histogram(name, description, buckets)
+    _registry.append(metric)
+    return metric
+
+
+def render_metrics() -> str:
+    """
+    Render every registered metric in Prometheus text exposition format.
+    """
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+stage_duration = histogram("nudge_stage_duration_seconds", "Latency of external calls and CPU stages.")
+stage_in_flight = gauge("nudge_stage_in_flight", "Stages currently executing.")
+stage_errors = counter("nudge_stage_errors_total", "Stages that raised an exception.")
+http_duration = histogram("nudge_http_request_duration_seconds", "Latency of HTTP requests by route.")
+http_in_flight = gauge("nudge_http_requests_in_flight", "HTTP requests currently being served.")
+
+
+@contextmanager
+def stage(name: str, kind: str = "external", **attributes):
+    """
+    Time a unit of work as both a span and a latency histogram sample.
+
+    Args:
+        name (str): Stage name, e.g. "groq.generate_report" or "video.decode".
+        kind (str): "external" for calls to another service, "cpu" for local work.
+        **attributes: Extra span attributes.
+    """
+    start = time.perf_counter()
+    # The span would record the exception and set its status again on the way out
+    with tracer.start_as_current_span(
+        name, attributes={"stage.kind": kind, **attributes},
+        record_exception=False, set_status_on_exception=False,
+    ) as span:
+        try:
+            # Inside the try so the finally always balances it
+            stage_in_flight.inc(stage=name)
+            yield span
+        except Exception as e:
+            stage_errors.inc(stage=name)
+            span.record_exception(e)
+            span.set_status(Status(StatusCode.ERROR, str(e)))
+            raise
+        finally:
+            stage_duration.observe(time.perf_counter() - start, stage=name, kind=kind)
+            stage_in_flight.dec(stage=name)
+
+
+def traced(name: str, kind: str = "external"):
+    """
+    Decorator form of `stage` for whole functions.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instrument_app(app):
+    """
+    Add a middleware that traces every request and records per-route latency.
+    """
+    @app.middleware("http")
+    async def _telemetry_middleware(request, call_next):
+        if request.url.path == "/metrics":
+            return await call_next(request)
+
+        method = request.method
+        http_in_flight.inc(method=method)
+        start = time.perf_counter()
+        status = 500
+        with tracer.start_as_current_span(f"{method} {request.url.path}", kind=trace.SpanKind.SERVER) as span:
+            try:
+                response = await call_next(request)
+                status = response.status_code
+                span.set_attribute("http.status_code", status)
+                return response
+            finally:
+                route = request.scope.get("route")
+                # Unmatched paths (404s, scanners) share one label to keep cardinality bounded
+                route_path = getattr(route, "path", "unmatched")
+                span.update_name(f"{method} {route_path}")
+                if route is None:
+                    span.set_attribute("http.target", request.url.path)
+                http_duration.observe(time.perf_counter() - start, method=method, route=route_path, status=status)
+                http_in_flight.dec(method=method)
+
+    return app
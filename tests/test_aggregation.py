@@ -0,0 +1,90 @@
+import pytest
+
+from VideoAnalyser.aggregation import EmotionAggregate
+
+
+def segment(*emotions, errors: int = 0, confidence: float = 0.5):
+    frames = [{"emotion": emotion, "confidence": confidence} for emotion in emotions]
+    frames += [{"error": "no face"} for _ in range(errors)]
+    return {"total_frames": len(frames), "emotion_analysis": frames}
+
+
+def test_empty_summary():
+    summary = EmotionAggregate().summary()
+    assert summary["segments_analyzed"] == 0
+    assert summary["dominant_emotion"] is None
+    assert summary["emotion_distribution"] == {}
+
+
+def test_folds_segments_across_questions():
+    aggregate = EmotionAggregate()
+    aggregate.add(segment("Happy", "Happy", "Neutral", errors=1), question_id=1, segment_index=0)
+    aggregate.add(segment("Sad", "Sad", "Sad", "Sad", "Happy", confidence=0.9), question_id=2, segment_index=0)
+
+    summary = aggregate.summary()
+    assert summary["segments_analyzed"] == 2
+    assert summary["total_frames"] == 9
+    assert summary["frames_analyzed"] == 8  # the error frame is not an emotion
+    assert summary["dominant_emotion"] == "Sad"
+    assert summary["emotion_distribution"]["Sad"]["share"] == pytest.approx(4 / 8, abs=1e-3)
+    assert summary["emotion_distribution"]["Happy"]["mean_confidence"] == pytest.approx((0.5 + 0.5 + 0.9) / 3, abs=1e-3)
+    assert summary["per_question_dominant_emotion"] == {1: "Happy", 2: "Sad"}
+
+
+def test_retried_segment_replaces_its_earlier_result():
+    aggregate = EmotionAggregate()
+    aggregate.add(segment("Happy", "Happy"), question_id=1, segment_index=0)
+    aggregate.add(segment("Neutral"), question_id=1, segment_index=1)
+    aggregate.add(segment("Sad", "Sad", "Sad"), question_id=1, segment_index=0)  # retry of segment 0
+
+    summary = aggregate.summary()
+    assert summary["segments_analyzed"] == 2
+    assert summary["total_frames"] == 4
+    assert summary["frames_analyzed"] == 4
+    assert set(summary["emotion_distribution"]) == {"Sad", "Neutral"}  # nothing left of the first attempt
+    assert summary["per_question_dominant_emotion"] == {1: "Sad"}
+
+
+def test_identical_retry_is_counted_once():
+    aggregate = EmotionAggregate()
+    for _ in range(3):
+        aggregate.add(segment("Happy", "Neutral"), question_id=4, segment_index=2)
+    once = EmotionAggregate()
+    once.add(segment("Happy", "Neutral"), question_id=4, segment_index=2)
+    assert aggregate.summary() == once.summary()
+
+
+def test_same_index_under_another_question_is_a_different_segment():
+    aggregate = EmotionAggregate()
+    aggregate.add(segment("Happy"), question_id=1, segment_index=0)
+    aggregate.add(segment("Happy"), question_id=2, segment_index=0)
+    assert aggregate.summary()["segments_analyzed"] == 2
+
+
+def test_unindexed_segments_always_add_up():
+    aggregate = EmotionAggregate()
+    aggregate.add(segment("Happy"))
+    aggregate.add(segment("Happy"))
+    summary = aggregate.summary()
+    assert summary["segments_analyzed"] == 2
+    assert summary["frames_analyzed"] == 2
+
+
+def test_full_recording_replaces_segments_and_earlier_recordings():
+    aggregate = EmotionAggregate()
+    aggregate.add(segment("Happy", "Happy"), question_id=1, segment_index=0)
+    aggregate.use_full_recording(segment("Sad", "Neutral", "Sad"))
+    aggregate.use_full_recording(segment("Sad", "Neutral", "Sad"))  # uploaded again
+
+    summary = aggregate.summary()
+    assert summary["segments_analyzed"] == 1
+    assert summary["frames_analyzed"] == 3
+    assert summary["dominant_emotion"] == "Sad"
+    assert summary["per_question_dominant_emotion"] == {}
+
+
+def test_segments_after_a_full_recording_are_ignored():
+    aggregate = EmotionAggregate()
+    aggregate.use_full_recording(segment("Neutral"))
+    assert aggregate.add(segment("Happy", "Happy"), question_id=1, segment_index=0) is False
+    assert aggregate.summary()["frames_analyzed"] == 1
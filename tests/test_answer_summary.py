@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+
+import shared_state
+from ReportGeneration import answer_summary
+from ReportGeneration.answer_summary import collect_answer_summaries, condense_locally, trim_to_sentence
+
+
+def test_short_text_is_kept_whole():
+    assert trim_to_sentence("  Short answer.  ", limit=50) == "Short answer."
+
+
+def test_trims_at_the_last_sentence_end():
+    text = "I used Kafka for ingestion. Then I tuned PostgreSQL. And afterwards a lot more happened"
+    assert trim_to_sentence(text, limit=60) == "I used Kafka for ingestion. Then I tuned PostgreSQL."
+
+
+def test_falls_back_to_a_word_boundary_with_an_ellipsis():
+    text = "No sentence ends anywhere in this rather long transcript of an answer"
+    trimmed = trim_to_sentence(text, limit=30)
+    assert trimmed == "No sentence ends anywhere in…"
+    assert len(trimmed) <= 30
+
+
+def test_ignores_a_sentence_end_too_close_to_the_start():
+    text = "Yes. " + "and then the rest of the answer goes on without stopping " * 3
+    assert trim_to_sentence(text, limit=60).endswith("…")
+
+
+@pytest.fixture
+def answers(monkeypatch):
+    monkeypatch.setattr(shared_state, "stored_audio_transcripts", {
+        "2024-01-01T10:00:00": {"question": "Q1", "transcription": "First answer.", "analysis": {
+            "overall_summary": "Clear", "actionable_suggestions": ["More depth"], "evaluation": [{"score": 6}, {"score": 8}],
+        }},
+        "2024-01-01T10:05:00": {"question": "Q2", "transcription": "Second answer.", "analysis": {}},
+    })
+    monkeypatch.setattr(shared_state, "answer_summaries", {})
+    return shared_state.stored_audio_transcripts
+
+
+def test_collect_falls_back_to_local_summary_on_timeout(answers, monkeypatch):
+    release = threading.Event()
+    ready = {"question": "Q1", "key_points": ["from the LLM"], "strengths": [], "weaknesses": [], "score": 9.0}
+
+    def summarize(question, transcript, analysis):
+        if question == "Q1":
+            return ready
+        release.wait(10)  # still waiting on the LLM
+        return {"question": question, "key_points": ["too late"]}
+
+    monkeypatch.setattr(answer_summary, "summarize_answer", summarize)
+    try:
+        for answer_id, entry in answers.items():
+            answer_summary.schedule_answer_summary(answer_id, entry["question"], entry["transcription"], entry["analysis"])
+        summaries = collect_answer_summaries(timeout=0.2)
+    finally:
+        release.set()
+
+    assert summaries[0] == ready
+    assert summaries[1] == condense_locally("Q2", "Second answer.", {})
+    assert summaries[1]["key_points"] == ["Second answer."]
+
+
+def test_collect_condenses_answers_that_were_never_scheduled_or_failed(answers, monkeypatch):
+    def failing(question, transcript, analysis):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(answer_summary, "summarize_answer", failing)
+    answer_summary.schedule_answer_summary("2024-01-01T10:00:00", "Q1", "First answer.", {})
+
+    summaries = collect_answer_summaries(timeout=1)
+    assert [s["question"] for s in summaries] == ["Q1", "Q2"]
+    first = summaries[0]
+    assert first["key_points"] == ["First answer."]
+    assert first["strengths"] == ["Clear"] and first["weaknesses"] == ["More depth"] and first["score"] == 7.0
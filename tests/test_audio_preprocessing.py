@@ -0,0 +1,81 @@
+import io
+import wave
+
+import numpy as np
+
+from AudioAnalyser.services import audio_preprocessing as ap
+
+SR = ap.TARGET_SAMPLE_RATE
+FRAME = int(SR * ap.FRAME_MS / 1000)
+
+
+def recording(*parts) -> np.ndarray:
+    """("speech" | "pause", seconds) parts over a faint background hiss."""
+    rng = np.random.default_rng(0)
+    chunks = []
+    for kind, seconds in parts:
+        n = int(seconds * SR)
+        if kind == "speech":
+            t = np.arange(n) / SR
+            chunks.append(0.3 * np.sin(2 * np.pi * 220 * t) * (1 + 0.5 * np.sin(2 * np.pi * 3 * t)))
+        else:
+            chunks.append(np.zeros(n))
+    samples = np.concatenate(chunks)
+    return (samples + rng.normal(0, 1e-3, len(samples))).astype(np.float32)
+
+
+def frames(seconds: float) -> int:
+    return int(seconds * 1000 / ap.FRAME_MS)
+
+
+def test_speech_mask_separates_speech_from_pauses():
+    mask = ap.speech_mask(recording(("pause", 1), ("speech", 2), ("pause", 2), ("speech", 2), ("pause", 1)))
+    assert mask[frames(1.5):frames(2.5)].all()
+    assert not mask[frames(3.5):frames(4.5)].any()
+    assert not mask[:frames(0.5)].any()
+    # The hangover pads speech on both sides
+    assert mask[frames(1) - 2] and mask[frames(3) + 2]
+
+
+def test_silence_runs():
+    mask = np.array([0, 0, 1, 1, 0, 1, 0, 0, 0], dtype=bool)
+    assert [(int(s), int(e)) for s, e in ap.silence_runs(mask)] == [(0, 2), (4, 5), (6, 9)]
+
+
+def test_trim_silence_drops_edges_and_compresses_long_pauses():
+    samples = recording(("pause", 1), ("speech", 3), ("pause", 3), ("speech", 3), ("pause", 0.5), ("speech", 2), ("pause", 1))
+    trimmed = ap.trim_silence(samples)
+
+    hangover = ap.HANGOVER_MS / 1000
+    # Speech and the short pause survive whole; the 3s pause shrinks to KEEP_SILENCE_MS plus
+    # the hangover on either side; of the leading and trailing second only the hangover is left
+    expected = 8 + 0.5 + ap.KEEP_SILENCE_MS / 1000 + 4 * hangover
+    assert abs(len(trimmed) / SR - expected) <= 2 * ap.FRAME_MS / 1000
+    assert len(trimmed) % FRAME == 0
+
+
+def test_short_pauses_are_kept_whole():
+    samples = recording(("speech", 2), ("pause", 0.6), ("speech", 2), ("pause", 2))
+    trimmed = ap.trim_silence(samples)
+    assert abs(len(trimmed) / SR - (4.6 + ap.HANGOVER_MS / 1000)) <= 2 * ap.FRAME_MS / 1000
+
+
+def test_silence_only_trims_to_nothing():
+    assert ap.trim_silence(recording(("pause", 3))).size == 0
+
+
+def test_decode_downmixes_and_resamples_wav():
+    rate = 44_100
+    t = np.arange(rate) / rate
+    stereo = np.stack([np.sin(2 * np.pi * 440 * t), np.zeros_like(t)], axis=1)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((stereo * 16_000).astype("<i2").tobytes())
+
+    samples = ap.decode_audio(buffer.getvalue())
+    assert samples.dtype == np.float32
+    assert abs(len(samples) - SR) <= 1
+    assert 0.2 < np.abs(samples).max() < 0.3  # the silent channel halves the peak
@@ -0,0 +1,50 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from VideoAnalyser.inference_pool import EmotionInferencePool, WorkerCrashedError
+
+
+def crashing_worker(shm_name, slots, tasks, results, max_batch, threads):
+    """
+    Stand-in for _worker_main that never loads a model: ready at once, dies on its first frame.
+    Module level so the spawned child can import it.
+    """
+    results.send("ready")
+    tasks.recv()
+    os._exit(3)
+
+
+def frame():
+    return np.zeros((64, 64, 3), dtype=np.uint8)
+
+
+@pytest.fixture
+def pool():
+    pool = EmotionInferencePool(workers=1, slots_per_worker=4, target=crashing_worker).start()
+    yield pool
+    pool.close()
+
+
+def wait_until(condition, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.05)
+
+
+def test_crashed_worker_fails_its_frames_and_frees_its_slots(pool):
+    worker = pool._workers[0]
+    wait_until(lambda: worker.ready)
+
+    future = pool.submit(frame())
+    assert isinstance(future.exception(timeout=30), WorkerCrashedError)
+    assert worker.in_flight == {}
+    assert sorted(worker.free) == list(range(4))
+
+    # The replacement comes up and takes frames again
+    wait_until(lambda: worker.tasks is not None and worker.ready)
+    assert isinstance(pool.submit(frame()).exception(timeout=30), WorkerCrashedError)
+    assert worker.startup_failures == 0
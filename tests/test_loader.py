@@ -0,0 +1,76 @@
+import os
+from concurrent.futures import Future
+
+import pytest
+
+from ReportGeneration.DocumentLoader import loader
+from ReportGeneration.DocumentLoader.loader import iter_documents, relative_source
+
+
+@pytest.fixture
+def knowledge_base(tmp_path):
+    for name in ("b.txt", "a.txt", "nested/c.txt", "nested/deeper/d.txt", "e.txt", "f.txt"):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(f"contents of {name}", encoding="utf-8")
+    (tmp_path / "notes.md").write_text("not a supported type", encoding="utf-8")
+    return tmp_path
+
+
+def test_relative_source(tmp_path):
+    path = os.path.join(str(tmp_path), "papers", "ann.pdf")
+    assert relative_source(path, str(tmp_path)) == "papers/ann.pdf"
+    assert relative_source(os.path.join(str(tmp_path), "x", "..", "top.txt"), str(tmp_path)) == "top.txt"
+
+
+def test_iter_documents_yields_every_file_once_with_relative_sources(knowledge_base):
+    docs = list(iter_documents(str(knowledge_base), max_workers=2))
+
+    sources = [doc.metadata["source"] for doc in docs]
+    # Completion order, not file order: compare as a set, but nothing missing or repeated
+    assert sorted(sources) == ["a.txt", "b.txt", "e.txt", "f.txt", "nested/c.txt", "nested/deeper/d.txt"]
+    assert all(doc.page_content == f"contents of {doc.metadata['source']}" for doc in docs)
+
+
+class InlineExecutor:
+    """
+    Runs each submitted load immediately and counts submissions, so the test can
+    see how far ahead of the consumer iter_documents reads.
+    """
+
+    def __init__(self, max_workers):
+        self.submitted = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def submit(self, fn, *args):
+        self.submitted += 1
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def test_iter_documents_bounds_files_in_flight(knowledge_base, monkeypatch):
+    executors = []
+
+    def make_executor(max_workers):
+        executors.append(InlineExecutor(max_workers))
+        return executors[-1]
+
+    monkeypatch.setattr(loader, "ProcessPoolExecutor", make_executor)
+
+    stream = iter_documents(str(knowledge_base), max_workers=1)
+    next(stream)
+    assert executors[0].submitted == 2  # 2 * max_workers, not all six files
+
+    rest = list(stream)
+    assert executors[0].submitted == 6
+    assert len(rest) == 5
+
+
+def test_iter_documents_on_an_empty_directory(tmp_path):
+    assert list(iter_documents(str(tmp_path))) == []
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+
+from ReportGeneration.Deduplication.minhash import MinHashDeduplicator, deduplicate_chunks, optimal_bands
+
+WORDS = ("latency index query cache shard replica queue stream batch schema partition "
+         "consumer producer offset commit rollback snapshot lock mutex thread").split()
+
+
+def text(n_words: int, seed: int) -> str:
+    rng = np.random.default_rng(seed)
+    return " ".join(rng.choice(WORDS, n_words))
+
+
+def shingle_jaccard(dedup: MinHashDeduplicator, a: str, b: str) -> float:
+    sa, sb = dedup._shingles(a), dedup._shingles(b)
+    return len(sa & sb) / len(sa | sb)
+
+
+def test_optimal_bands_fit_the_signature():
+    for threshold in (0.5, 0.7, 0.85, 0.95):
+        bands, rows = optimal_bands(threshold, 128)
+        assert bands * rows <= 128
+        # The S-curve turns just below the threshold
+        assert threshold - 0.2 < (1 / bands) ** (1 / rows) < threshold
+
+
+def test_signature_estimates_jaccard():
+    dedup = MinHashDeduplicator(num_perm=256)
+    base = text(300, seed=0).split()
+    edited = " ".join(base[:200] + text(100, seed=1).split())
+    estimate = np.mean(dedup.signature(" ".join(base)) == dedup.signature(edited))
+    assert estimate == pytest.approx(shingle_jaccard(dedup, " ".join(base), edited), abs=0.1)
+
+
+def test_exact_and_near_duplicates_are_dropped():
+    dedup = MinHashDeduplicator(threshold=0.8)
+    original = text(300, seed=0)
+    near = original.replace(original.split()[150], "typo", 1)
+    assert not dedup.is_duplicate(original)
+    assert dedup.is_duplicate(original)
+    assert dedup.is_duplicate(near.upper())  # case and punctuation do not matter
+    assert (dedup.seen, dedup.dropped) == (3, 2)
+
+
+def test_distinct_chunks_are_kept():
+    dedup = MinHashDeduplicator(threshold=0.8)
+    chunks = [text(300, seed=i) for i in range(50)]
+    assert list(dedup.filter(chunks)) == chunks
+    assert dedup.dropped == 0
+
+
+def test_partial_overlap_below_threshold_is_kept():
+    dedup = MinHashDeduplicator(threshold=0.85)
+    base = text(300, seed=0).split()
+    half = " ".join(base[:150] + text(150, seed=2).split())
+    assert not dedup.is_duplicate(" ".join(base))
+    assert not dedup.is_duplicate(half)
+
+
+def test_filter_keeps_first_occurrence_of_documents():
+    class Doc:
+        def __init__(self, page_content, page):
+            self.page_content = page_content
+            self.page = page
+
+    body = text(200, seed=3)
+    docs = [Doc(body, 1), Doc(text(200, seed=4), 2), Doc(body, 3)]
+    kept = list(MinHashDeduplicator().filter(docs))
+    assert [doc.page for doc in kept] == [1, 2]
+
+
+def test_short_chunks_become_a_single_shingle():
+    dedup = MinHashDeduplicator(shingle_words=5)
+    assert dedup._shingles("Hello, world!") == {"hello world"}
+
+
+def test_deduplicate_chunks_can_be_disabled():
+    chunks = ["same text here"] * 3
+    stream, dedup = deduplicate_chunks(chunks, threshold=0)
+    assert dedup is None and list(stream) == chunks
+
+    stream, dedup = deduplicate_chunks(chunks, threshold=0.9)
+    assert list(stream) == chunks[:1]
+    assert dedup.dropped == 2
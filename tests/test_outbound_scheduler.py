@@ -0,0 +1,126 @@
+import threading
+import time
+
+import pytest
+
+import resilience
+from outbound_scheduler import OutboundScheduler, Priority, RateLimitTimeout, TokenBucket, estimate_tokens
+
+
+def test_token_bucket_starts_full_and_refills():
+    bucket = TokenBucket(per_minute=60)  # 1 per second
+    now = bucket.updated
+    assert bucket.wait_time(60, now) == 0.0
+    bucket.consume(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 0.5) == pytest.approx(0.5)
+    assert bucket.wait_time(1, now + 1.0) == 0.0
+
+
+def test_token_bucket_caps_refill_and_oversized_requests():
+    bucket = TokenBucket(per_minute=60)
+    now = bucket.updated
+    bucket.wait_time(1, now + 3600)
+    assert bucket.tokens == 60  # never above capacity
+    # A request larger than the bucket waits for a full bucket, not forever
+    bucket.consume(500)
+    assert bucket.wait_time(500, now + 3600) == pytest.approx(60.0)
+
+
+def test_estimate_tokens():
+    assert estimate_tokens(None) == 0
+    assert estimate_tokens("x" * 40) == 10
+
+
+def drained_scheduler(rpm: float) -> OutboundScheduler:
+    scheduler = OutboundScheduler({"p": {"rpm": rpm}})
+    request_bucket, _ = scheduler._buckets_for("p")
+    request_bucket.tokens = 0
+    return scheduler
+
+
+def test_acquire_serves_higher_priority_first():
+    scheduler = drained_scheduler(rpm=600)  # a slot every 0.1s
+    served = []
+
+    def caller(priority):
+        scheduler.acquire("p", priority=priority, timeout=5)
+        served.append(priority)
+
+    threads = []
+    for priority in (Priority.BATCH, Priority.REPORT, Priority.STANDARD, Priority.INTERACTIVE):
+        threads.append(threading.Thread(target=caller, args=(priority,)))
+        threads[-1].start()
+        # Wait until it is queued, so arrival order is the reverse of priority order
+        while len(scheduler._queues.get("p", [])) < len(threads):
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+
+    assert served == [Priority.INTERACTIVE, Priority.STANDARD, Priority.REPORT, Priority.BATCH]
+
+
+def test_same_priority_is_first_come_first_served():
+    scheduler = drained_scheduler(rpm=1200)
+    served = []
+
+    def caller(index):
+        scheduler.acquire("p", timeout=5)
+        served.append(index)
+
+    threads = []
+    for index in range(4):
+        threads.append(threading.Thread(target=caller, args=(index,)))
+        threads[-1].start()
+        while len(scheduler._queues.get("p", [])) < len(threads):
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+
+    assert served == [0, 1, 2, 3]
+
+
+def test_acquire_times_out_and_leaves_the_queue():
+    scheduler = drained_scheduler(rpm=1)
+    with pytest.raises(RateLimitTimeout):
+        scheduler.acquire("p", timeout=0.05)
+    assert scheduler._queues["p"] == []
+
+
+def test_try_acquire_never_jumps_the_queue():
+    scheduler = drained_scheduler(rpm=600)
+    waiter = threading.Thread(target=scheduler.acquire, args=("p",), kwargs={"timeout": 5})
+    waiter.start()
+    while not scheduler._queues.get("p"):
+        time.sleep(0.001)
+    assert scheduler.try_acquire("p") is False
+    waiter.join()
+
+
+def test_unlimited_provider_never_waits():
+    scheduler = OutboundScheduler({})
+    start = time.monotonic()
+    for _ in range(100):
+        scheduler.acquire("anything", tokens=10_000, timeout=0.1)
+    assert time.monotonic() - start < 0.5
+
+
+def test_queue_wait_counts_against_the_deadline(monkeypatch):
+    deadlines = []
+
+    class SlowScheduler:
+        def acquire(self, *args, **kwargs):
+            time.sleep(0.2)
+
+    def attempt(provider, fn, args, kwargs, deadline, *rest):
+        deadlines.append(deadline)
+        return fn(*args, **kwargs)
+
+    monkeypatch.setattr(resilience, "scheduler", SlowScheduler())
+    monkeypatch.setattr(resilience, "_attempt", attempt)
+
+    assert resilience.resilient_call("test-queue", lambda: "ok", deadline=1.0) == "ok"
+    assert deadlines[0] == pytest.approx(0.8, abs=0.05)
+
+    with pytest.raises(resilience.DeadlineExceeded):
+        resilience.resilient_call("test-queue", lambda: "ok", deadline=0.1)
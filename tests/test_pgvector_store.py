@@ -0,0 +1,164 @@
+import struct
+
+import numpy as np
+import pytest
+
+from ReportGeneration.VectorStore import pgvector_store
+from ReportGeneration.VectorStore.pgvector_store import PgVectorStore, encode_copy_rows, to_vector_literal
+
+
+def decode_copy(data: bytes) -> list:
+    """
+    Minimal reader for the binary COPY format: header, tuples of length-prefixed fields, trailer.
+    """
+    assert data[:11] == b"PGCOPY\n\xff\r\n\x00"
+    flags, extension = struct.unpack("!ii", data[11:19])
+    assert (flags, extension) == (0, 0)
+    offset, rows = 19, []
+    while True:
+        (field_count,) = struct.unpack_from("!h", data, offset)
+        offset += 2
+        if field_count == -1:
+            assert offset == len(data)
+            return rows
+        fields = []
+        for _ in range(field_count):
+            (length,) = struct.unpack_from("!i", data, offset)
+            offset += 4
+            fields.append(None if length == -1 else data[offset:offset + length])
+            offset += max(length, 0)
+        rows.append(fields)
+
+
+def decode_vector(field: bytes) -> list:
+    dimensions, unused = struct.unpack_from("!hh", field)
+    assert unused == 0
+    assert len(field) == 4 + 4 * dimensions
+    return list(struct.unpack_from(f"!{dimensions}f", field, 4))
+
+
+def test_vector_literal():
+    assert to_vector_literal([0.1, -0.2, 3]) == "[0.100000, -0.200000, 3.000000]"
+    assert to_vector_literal(np.array([1e-7], dtype=np.float32)) == "[0.000000]"
+    assert to_vector_literal([]) == "[]"
+
+
+def test_copy_rows_round_trip():
+    rows = [
+        ("a:1:0", "hello", "docs/a.pdf", 1, [0.5, -1.0, 2.0]),
+        ("b:0:0", "nul\x00byte é", None, None, np.array([0.25, 0.0, 1.5])),
+    ]
+    decoded = decode_copy(encode_copy_rows(rows).getvalue())
+
+    assert len(decoded) == 2
+    row_id, text, source, page, embedding = decoded[0]
+    assert (row_id, text, source) == (b"a:1:0", b"hello", b"docs/a.pdf")
+    assert struct.unpack("!i", page) == (1,)
+    assert decode_vector(embedding) == [0.5, -1.0, 2.0]
+
+    row_id, text, source, page, embedding = decoded[1]
+    assert text.decode("utf-8") == "nulbyte é"
+    assert source is None and page is None
+    assert decode_vector(embedding) == [0.25, 0.0, 1.5]
+
+
+def test_copy_rows_encode_each_vector_with_its_own_dimension():
+    # pgvector rejects a mismatch against the column type, so write_batch filters first
+    decoded = decode_copy(encode_copy_rows([("x", "t", "s", 0, [1.0, 2.0])]).getvalue())
+    assert decode_vector(decoded[0][4]) == [1.0, 2.0]
+
+
+class FakeCursor:
+    def __init__(self, indexes=None, rows=0):
+        self.indexes = indexes or {}
+        self.rows = rows
+        self.statements = []
+        self.copied = None
+        self._result = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.statements.append(" ".join(sql.split()))
+        if "FROM pg_indexes" in sql:
+            self._result = list(self.indexes.items())
+        elif "count(*)" in sql:
+            self._result = [(self.rows,)]
+
+    def fetchall(self):
+        return self._result
+
+    def fetchone(self):
+        return self._result[0]
+
+    def copy_expert(self, sql, stream):
+        self.copied = stream.getvalue()
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.commits = 0
+
+    def cursor(self):
+        return self._cursor
+
+    def commit(self):
+        self.commits += 1
+
+
+def make_store(cursor, dimensions=3):
+    store = PgVectorStore(dimensions=dimensions, db_params={})
+    store.conn = FakeConnection(cursor)
+    return store
+
+
+def test_write_batch_skips_wrong_dimension_vectors():
+    cursor = FakeCursor()
+    written = make_store(cursor).write_batch(
+        ["ok", "short", "none", "ok"],
+        ["first", "bad", "missing", "second"],
+        [{"source": "a.pdf", "page": 0}] * 4,
+        [[1.0, 2.0, 3.0], [1.0, 2.0], None, [4.0, 5.0, 6.0]],
+    )
+
+    assert written == 1
+    decoded = decode_copy(cursor.copied)
+    # Duplicate IDs in one batch: last write wins
+    assert [(row[0], row[1]) for row in decoded] == [(b"ok", b"second")]
+    assert decode_vector(decoded[0][4]) == [4.0, 5.0, 6.0]
+
+
+IVFFLAT_INDEX = (
+    "CREATE INDEX pdf_embeddings_embedding_ivfflat_idx ON public.pdf_embeddings "
+    "USING ivfflat (embedding vector_l2_ops) WITH (lists='{lists}')"
+)
+
+
+def index_builds(cursor) -> list:
+    return [s for s in cursor.statements if s.startswith("CREATE INDEX")]
+
+
+@pytest.mark.parametrize("explicit, existing, rebuilt", [
+    ("100", 100, False),
+    ("150", 100, True),   # within 2x, but an explicit setting must match exactly
+    (None, 150, False),   # derived from 100k rows: 2x drift is tolerated
+    (None, 400, True),
+])
+def test_ivfflat_lists_rebuild(monkeypatch, explicit, existing, rebuilt):
+    monkeypatch.setattr(pgvector_store, "IVFFLAT_LISTS", explicit)
+    monkeypatch.setattr(pgvector_store, "MAINTENANCE_WORK_MEM", None)
+    cursor = FakeCursor(
+        indexes={"pdf_embeddings_embedding_ivfflat_idx": IVFFLAT_INDEX.format(lists=existing)},
+        rows=100_000,
+    )
+    make_store(cursor).ensure_index("ivfflat")
+
+    builds = index_builds(cursor)
+    assert bool(builds) == rebuilt
+    if rebuilt:
+        assert f"lists = {explicit or 100}" in builds[0]
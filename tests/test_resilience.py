@@ -0,0 +1,143 @@
+import time
+
+import pytest
+
+import resilience
+from outbound_scheduler import OutboundScheduler
+from resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded
+
+
+@pytest.fixture(autouse=True)
+def unlimited_scheduler(monkeypatch):
+    monkeypatch.setattr(resilience, "scheduler", OutboundScheduler({}))
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_s=60)
+    for _ in range(2):
+        breaker.record_failure()
+        assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_s=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.allow()
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_s=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()       # the probe
+    assert not breaker.allow()   # everyone else still fails fast
+
+
+def test_successful_probe_closes_the_circuit():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_s=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+    assert breaker.failures == 0
+
+
+def test_failed_probe_reopens_for_another_reset_period():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_s=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow()
+
+
+def test_released_probe_can_be_retaken():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_s=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release_probe()  # e.g. it timed out waiting for a rate-limit slot
+    assert breaker.allow()
+
+
+def failing():
+    raise ConnectionError("down")
+
+
+def test_resilient_call_fails_fast_once_open():
+    provider = "test-open"
+    for _ in range(resilience.CIRCUIT_FAILURE_THRESHOLD):
+        with pytest.raises(ConnectionError):
+            resilience.resilient_call(provider, failing, hedge=False)
+    with pytest.raises(CircuitOpenError):
+        resilience.resilient_call(provider, failing, hedge=False)
+
+
+def test_resilient_call_uses_fallback_when_open():
+    provider = "test-fallback"
+    for _ in range(resilience.CIRCUIT_FAILURE_THRESHOLD):
+        assert resilience.resilient_call(provider, failing, fallback=lambda: "backup", hedge=False) == "backup"
+    calls = []
+    primary = lambda: calls.append("primary")
+    assert resilience.resilient_call(provider, primary, fallback=lambda: "backup", hedge=False) == "backup"
+    assert calls == []  # the open circuit skipped the primary entirely
+
+
+def test_resilient_call_enforces_the_deadline():
+    with pytest.raises(DeadlineExceeded):
+        resilience.resilient_call("test-slow", time.sleep, 0.5, deadline=0.05, hedge=False)
+
+
+def test_hedging_is_opt_in(monkeypatch):
+    hedged = []
+    attempt = resilience._attempt
+    monkeypatch.setattr(resilience, "_attempt", lambda *args: hedged.append(args[5]) or attempt(*args))
+    resilience.resilient_call("test-hedge", lambda: "ok")
+    resilience.resilient_call("test-hedge", lambda: "ok", hedge=True)
+    assert hedged == [False, True]
+
+
+class RecordingScheduler(OutboundScheduler):
+    def __init__(self):
+        super().__init__({})
+        self.acquired = []
+
+    def acquire(self, provider, model=None, tokens=0, priority=None, timeout=None):
+        self.acquired.append((provider, model, timeout))
+
+
+def test_fallback_gets_the_remaining_deadline_and_its_own_rate_model(monkeypatch):
+    recording = RecordingScheduler()
+    monkeypatch.setattr(resilience, "scheduler", recording)
+
+    def slow_failure():
+        time.sleep(0.2)
+        raise ConnectionError("down")
+
+    result = resilience.resilient_call(
+        "test-remaining", slow_failure, fallback=lambda: "backup", deadline=1.0,
+        rate_model="big-model", fallback_rate_model="small-model",
+    )
+
+    assert result == "backup"
+    (primary, model, timeout), (fallback, fallback_model, fallback_timeout) = recording.acquired
+    assert (primary, model, timeout) == ("test", "big-model", 1.0)
+    assert (fallback, fallback_model) == ("test", "small-model")
+    assert fallback_timeout <= 0.8
+
+
+def test_no_fallback_once_the_deadline_is_spent(monkeypatch):
+    calls = []
+    with pytest.raises(DeadlineExceeded):
+        resilience.resilient_call(
+            "test-spent", time.sleep, 0.3, fallback=lambda seconds: calls.append(seconds), deadline=0.05,
+        )
+    assert calls == []
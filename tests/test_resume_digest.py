@@ -0,0 +1,127 @@
+from outbound_scheduler import estimate_tokens
+from QuestionGeneration.resume_digest import (
+    build_resume_digest, compress_job_description, keyword_weights, split_sections,
+)
+
+RESUME = """Jane Doe
+jane.doe@example.com | +1 555 123 4567 | github.com/janedoe
+
+Summary
+Backend engineer focused on distributed systems and data pipelines.
+
+Skills: Python, Go, Kubernetes, PostgreSQL, React, Figma, Photoshop, Kafka
+
+Experience
+Senior Engineer, Acme Corp (2020-2024)
+- Built a Kafka ingestion pipeline in Go handling 2M events per minute
+- Organised the office book club and team lunches
+- Tuned PostgreSQL indexes, cutting p95 query latency by 60%
+Engineer, Initech (2017-2020)
+- Designed the marketing website in Figma and Photoshop
+- Migrated batch jobs to Kubernetes CronJobs
+
+Projects
+Weather app
+- A React weather widget with animated icons
+Stream processor
+- Exactly-once stream processing in Python on Kafka
+
+Education
+B.Sc. Computer Science, State University
+"""
+
+JOB = """About us
+We are a fast-growing fintech on a mission to make payments simple.
+
+Requirements
+- 5+ years of backend development in Python or Go
+- Experience with Kafka and PostgreSQL at scale
+- Kubernetes in production
+
+Benefits
+- Health insurance, 401k and unlimited PTO
+
+Location: Remote
+We are an equal opportunity employer regardless of race or gender.
+"""
+
+
+def test_split_sections_handles_inline_headings():
+    sections = split_sections(RESUME)
+    assert sections["skills"] == ["Python, Go, Kubernetes, PostgreSQL, React, Figma, Photoshop, Kafka"]
+    assert sections["header"][0] == "Jane Doe"
+    assert sections["experience"][0] == "Senior Engineer, Acme Corp (2020-2024)"
+    assert sections["education"] == ["B.Sc. Computer Science, State University"]
+
+
+def test_prose_starting_with_a_heading_word_is_not_a_heading():
+    sections = split_sections(
+        "Jane Doe\nExperience\nExperience with Python at Acme\nProjects using React\nSkills summary: Go, Rust"
+    )
+    assert sections["experience"] == ["Experience with Python at Acme", "Projects using React"]
+    assert sections["skills"] == ["Go, Rust"]
+    assert "projects" not in sections
+
+
+def test_resume_without_headings_is_one_block_without_contact_lines():
+    sections = split_sections("Jane Doe\njane@example.com\nWrote Python services")
+    assert sections == {"other": ["Jane Doe", "Wrote Python services"]}
+
+
+def test_keyword_weights_are_sublinear():
+    weights = keyword_weights("kafka kafka kafka kafka python")
+    assert weights["python"] == 1.0
+    assert 1.0 < weights["kafka"] < 4.0
+    assert "and" not in keyword_weights("python and go")
+
+
+def test_small_resume_is_returned_whole():
+    assert build_resume_digest("Skills: Python\n\nBuilt things", JOB) == "Skills: Python\nBuilt things"
+    assert build_resume_digest("   ", JOB) == ""
+
+
+def test_digest_fits_the_budget_and_keeps_relevant_lines():
+    digest = build_resume_digest(RESUME, JOB, max_tokens=80)
+
+    assert estimate_tokens(digest) <= 80
+    assert "Kafka ingestion pipeline" in digest
+    assert "Exactly-once stream processing" in digest
+    for unrelated in ("book club", "marketing website", "React weather widget", "jane.doe@example.com"):
+        assert unrelated not in digest
+    # A kept bullet brings the job it belongs to
+    assert "Senior Engineer, Acme Corp" in digest
+
+
+def test_matched_skills_come_first():
+    digest = build_resume_digest(RESUME, JOB, max_tokens=80)
+    skills = next(line for line in digest.splitlines() if line.startswith("Skills: "))
+    listed = skills[len("Skills: "):].split(", ")
+    matched = {"Python", "Go", "Kubernetes", "PostgreSQL", "Kafka"}
+    assert set(listed[:len(matched)]) == matched
+
+
+def test_digest_keeps_resume_order():
+    digest = build_resume_digest(RESUME, JOB, max_tokens=150)
+    assert digest.index("Summary:") < digest.index("Experience:") < digest.index("Projects:")
+    assert digest.index("Kafka ingestion") < digest.index("PostgreSQL indexes")
+
+
+def test_job_description_loses_boilerplate():
+    compressed = compress_job_description(JOB)
+    assert "Kafka and PostgreSQL" in compressed
+    assert "Requirements" in compressed
+    for boilerplate in ("mission", "401k", "Location", "equal opportunity", "Benefits"):
+        assert boilerplate not in compressed
+
+
+def test_job_description_budget_prefers_requirements():
+    padding = "\n".join(f"Our culture value number {i} is about collaboration." for i in range(40))
+    job = padding + "\nRequirements\n- Deep experience with Kafka\n- Python services at scale"
+    compressed = compress_job_description(job, max_tokens=60)
+    assert estimate_tokens(compressed) <= 60
+    assert "Deep experience with Kafka" in compressed
+    assert "Python services at scale" in compressed
+
+
+def test_empty_job_description():
+    assert compress_job_description(None) == ""
@@ -0,0 +1,127 @@
+import itertools
+import threading
+import time
+
+import numpy as np
+
+from AudioAnalyser.services import segmented_transcription as st
+
+SR = 16_000
+
+
+def speech_with_pauses(segment_s: float, count: int, pause_s: float = 4.0) -> np.ndarray:
+    """`count` stretches of noise ("speech") of `segment_s` seconds separated by silent pauses."""
+    rng = np.random.default_rng(0)
+    parts = []
+    for i in range(count):
+        parts.append(rng.normal(0, 0.3, int(segment_s * SR)).astype(np.float32))
+        if i < count - 1:
+            parts.append(np.zeros(int(pause_s * SR), dtype=np.float32))
+    return np.concatenate(parts)
+
+
+def test_short_audio_is_one_segment():
+    samples = speech_with_pauses(30, 2)
+    assert st.split_points(samples, SR) == [0, len(samples)]
+
+
+def test_cuts_land_inside_pauses():
+    samples = speech_with_pauses(25, 8)  # ~228s with a pause every 29s
+    points = st.split_points(samples, SR)
+
+    assert points[0] == 0 and points[-1] == len(samples)
+    for start, end in zip(points[:-1], points[1:]):
+        assert end - start <= st.SEGMENT_MAX_S * SR
+    for cut in points[1:-1]:
+        assert samples[cut] == 0.0  # silent, i.e. inside a pause
+        assert cut - max(p for p in points if p < cut) >= st.SEGMENT_MIN_S * SR
+
+
+def test_hard_cut_without_pauses():
+    samples = np.random.default_rng(1).normal(0, 0.3, 200 * SR).astype(np.float32)
+    points = st.split_points(samples, SR)
+    assert points[:3] == [0, st.SEGMENT_TARGET_S * SR, 2 * st.SEGMENT_TARGET_S * SR]
+
+
+def words(*spans):
+    return [{"text": text, "start": start, "end": end} for text, start, end in spans]
+
+
+def test_own_words_keeps_words_centred_in_range():
+    # Segment 10s-20s transcribed from 9.5s; times are relative to 9.5s
+    heard = words(("overlap", 0, 400), ("first", 600, 900), ("last", 10_000, 10_400), ("next", 10_500, 10_900))
+    kept = st.own_words(heard, int(9.5 * SR), 10 * SR, 20 * SR, 60 * SR, SR)
+    assert kept == ["first", "last"]
+
+
+def test_boundary_word_goes_to_exactly_one_segment():
+    # A word spanning the 20s boundary, centred at 20.1s, as heard by both neighbours
+    left = st.own_words(words(("split", 10_400, 10_800)), int(9.5 * SR), 10 * SR, 20 * SR, 60 * SR, SR)
+    right = st.own_words(words(("split", 400, 800)), int(19.5 * SR), 20 * SR, 30 * SR, 60 * SR, SR)
+    assert left + right == ["split"]
+
+
+def test_last_segment_keeps_trailing_words():
+    kept = st.own_words(words(("end", 10_400, 10_700)), int(49.5 * SR), 50 * SR, 60 * SR, 60 * SR, SR)
+    assert kept == ["end"]
+
+
+def test_failed_segment_is_retried_then_falls_back_to_whole_file(monkeypatch):
+    attempts = []
+
+    def transcribe_result(audio_url, poll_interval=None):
+        attempts.append(audio_url)
+        return {"status": "error", "error": "boom"}
+
+    monkeypatch.setattr(st, "upload_to_assemblyai", lambda file: "url")
+    monkeypatch.setattr(st, "transcribe_result", transcribe_result)
+    monkeypatch.setattr(st, "transcribe_and_poll", lambda url: "whole answer")
+    monkeypatch.setattr(st, "SEGMENT_MAX_CONCURRENCY", 1)
+
+    samples = speech_with_pauses(25, 8)
+    assert st.transcribe_segmented(samples, SR) == "whole answer"
+    # The failing segment was retried; segments not started yet were cancelled
+    # (with one worker, at most the next segment had already begun)
+    segments = len(st.split_points(samples, SR)) - 1
+    assert st.SEGMENT_RETRIES + 1 <= len(attempts) <= 2 * (st.SEGMENT_RETRIES + 1) < segments * (st.SEGMENT_RETRIES + 1)
+
+
+def test_fallback_does_not_wait_for_running_segments(monkeypatch):
+    release = threading.Event()
+    uploads = itertools.count()
+
+    def transcribe_result(audio_url, poll_interval=None):
+        if audio_url == "url-0":
+            release.wait(10)  # a segment still polling AssemblyAI
+            return {"status": "completed", "text": "slow", "words": None}
+        return {"status": "error", "error": "boom"}
+
+    monkeypatch.setattr(st, "upload_to_assemblyai", lambda file: f"url-{next(uploads)}")
+    monkeypatch.setattr(st, "transcribe_result", transcribe_result)
+    monkeypatch.setattr(st, "transcribe_and_poll", lambda url: "whole answer")
+    monkeypatch.setattr(st, "SEGMENT_MAX_CONCURRENCY", 2)
+
+    start = time.monotonic()
+    try:
+        assert st.transcribe_segmented(speech_with_pauses(25, 8), SR) == "whole answer"
+        assert time.monotonic() - start < 5
+        assert not release.is_set()
+    finally:
+        release.set()
+
+
+def test_segment_succeeds_on_retry(monkeypatch):
+    failures = iter([True])
+
+    def transcribe_result(audio_url, poll_interval=None):
+        if next(failures, False):
+            return {"status": "error", "error": "flaky"}
+        return {"status": "completed", "text": "part", "words": None}
+
+    monkeypatch.setattr(st, "upload_to_assemblyai", lambda file: "url")
+    monkeypatch.setattr(st, "transcribe_result", transcribe_result)
+    monkeypatch.setattr(st, "SEGMENT_MAX_CONCURRENCY", 1)
+
+    samples = speech_with_pauses(25, 8)
+    segments = len(st.split_points(samples, SR)) - 1
+    assert st.transcribe_segmented(samples, SR) == " ".join(["part"] * segments)
@@ -0,0 +1,51 @@
+import asyncio
+import os
+
+# context_generation refuses to import without a key; no request is ever sent here
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+import shared_state
+from QuestionGeneration import speculative
+
+
+def run(coro):
+    shared_state.question_generation_task = None
+    shared_state.question_generation_key = None
+    return asyncio.run(coro)
+
+
+def test_waiter_follows_the_task_that_replaced_its_own(monkeypatch):
+    async def fake_generate(job_info):
+        await asyncio.sleep(0.05)
+        return {"questions": [job_info["job_role"]]}
+
+    monkeypatch.setattr(speculative, "_generate_and_presynthesize", fake_generate)
+
+    async def scenario():
+        waiter = asyncio.create_task(speculative.get_generated_questions({"job_role": "first"}))
+        await asyncio.sleep(0)
+        # A new /start-interview with different inputs cancels the first generation
+        speculative.start_question_generation({"job_role": "second"})
+        return await waiter
+
+    assert run(scenario()) == {"questions": ["second"]}
+
+
+def test_cancelling_the_waiter_leaves_generation_running(monkeypatch):
+    async def fake_generate(job_info):
+        await asyncio.sleep(0.05)
+        return {"questions": ["q"]}
+
+    monkeypatch.setattr(speculative, "_generate_and_presynthesize", fake_generate)
+
+    async def scenario():
+        waiter = asyncio.create_task(speculative.get_generated_questions({"job_role": "dev"}))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            pass
+        return await shared_state.question_generation_task
+
+    assert run(scenario()) == {"questions": ["q"]}
@@ -0,0 +1,54 @@
+import hashlib
+
+from langchain_core.documents import Document
+
+from ReportGeneration.TextSpliter.spliter import batched, chunk_id, split_documents_stream, text_spliting
+
+LONG_TEXT = " ".join(f"Sentence number {i} about vector search and PostgreSQL." for i in range(200))
+
+
+def test_chunk_id_is_stable_across_platforms():
+    expected = hashlib.sha1("papers/ann.pdf|3|0".encode("utf-8")).hexdigest()
+    assert chunk_id("papers/ann.pdf", 3, 0) == expected
+    assert chunk_id("papers\\ann.pdf", 3, 0) == expected  # Windows separators
+
+
+def test_chunk_id_changes_with_page_and_index():
+    ids = {chunk_id("a.pdf", page, index) for page in (None, 0, 1) for index in (0, 1)}
+    assert len(ids) == 6
+
+
+def test_stream_matches_text_spliting():
+    docs = [
+        Document(page_content=LONG_TEXT, metadata={"source": "a.pdf", "page": 0}),
+        Document(page_content="short page", metadata={"source": "a.pdf", "page": 1}),
+        Document(page_content=LONG_TEXT[::-1], metadata={}),
+    ]
+    chunks = list(split_documents_stream(docs))
+
+    assert [chunk.page_content for chunk in chunks] == text_spliting(docs)
+    assert len(chunks) > len(docs)
+    for chunk in chunks:
+        meta = chunk.metadata
+        assert meta["id"] == chunk_id(meta["source"], meta["page"], meta["chunk_index"])
+    assert chunks[-1].metadata["source"] == "unknown"
+    # Re-splitting gives the same IDs, so re-ingestion overwrites
+    assert [c.metadata["id"] for c in split_documents_stream(docs)] == [c.metadata["id"] for c in chunks]
+
+
+def test_stream_is_lazy():
+    pulled = []
+
+    def documents():
+        for page in range(3):
+            pulled.append(page)
+            yield Document(page_content=f"page {page}", metadata={"source": "b.txt", "page": page})
+
+    stream = split_documents_stream(documents())
+    next(stream)
+    assert pulled == [0]
+
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(batched([], 2)) == []
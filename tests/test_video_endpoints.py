@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+# main refuses to import without API keys; no request is ever sent here
+for _key in ("GROQ_API_KEY", "GOOGLE_API_KEY", "ASSEMBLYAI_API_KEY", "ELEVENLABS_API_KEY"):
+    os.environ.setdefault(_key, "test")
+
+from fastapi.testclient import TestClient
+
+import main
+import shared_state
+
+
+def fake_analysis(*emotions):
+    frames = [{"emotion": emotion, "confidence": 0.5} for emotion in emotions]
+    return {"total_frames": len(frames), "frames_analyzed": len(frames), "emotion_analysis": frames}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(shared_state, "video_aggregate", None)
+    monkeypatch.setattr(shared_state, "stored_video_analysis", {})
+    return TestClient(main.app)
+
+
+def upload(client, url, analysis, monkeypatch, **data):
+    monkeypatch.setattr(main, "process_video", lambda *args, **kwargs: analysis)
+    return client.post(url, files={"video": ("clip.mp4", b"video", "video/mp4")}, data=data)
+
+
+def test_full_video_does_not_double_count_segments(client, monkeypatch):
+    upload(client, "/analyze-video-segment", fake_analysis("Happy", "Happy"), monkeypatch,
+           question_id="1", segment_index="0")
+    for _ in range(2):
+        response = upload(client, "/analyze-video", fake_analysis("Happy", "Happy", "Sad"), monkeypatch)
+        assert response.status_code == 200
+
+    assert shared_state.stored_video_analysis["frames_analyzed"] == 3
+    assert shared_state.stored_video_analysis["segments_analyzed"] == 1
+
+
+def test_segment_errors_are_json(client, monkeypatch):
+    response = upload(client, "/analyze-video-segment", {"error": "Could not open video"}, monkeypatch)
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Could not open video"}
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("decoder crashed")
+
+    monkeypatch.setattr(main, "process_video", broken)
+    response = client.post("/analyze-video-segment", files={"video": ("clip.mp4", b"video", "video/mp4")})
+    assert response.status_code == 500
+    assert response.json() == {"detail": "decoder crashed"}